@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+LinkSync Importer Benchmark
+
+Measures the throughput of inseart_browser_auth.py without a real PocketBase
+instance or live websites. The benchmark:
+
+    1. Generates synthetic phpMyAdmin dumps in the links.sql format
+    2. Runs a local stub PocketBase (records, batch, list and health endpoints)
+       with latency and error injection
+    3. Runs local fake websites serving HTML pages and favicons, reached
+       through a stub DNS resolver (*.bench.test -> 127.0.0.1)
+    4. Reports links/sec, p50/p99 per-record latency and peak RSS for
+       parse_sql_file, fetch_favicon and insert_link end to end
+
+Each phase runs in its own subprocess so peak RSS is measured per phase.
+
+Usage:
+    python benchmark_importer.py [--sizes 1000,100000,1000000] [--e2e-rows 500]
+
+Example:
+    python benchmark_importer.py --sizes 1000,100000 --pb-latency 5 --pb-error-rate 0.01
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import inseart_browser_auth as importer
+
+BENCH_DOMAIN = "bench.test"
+TAG_VOCABULARY = ["AI", "PDF", "Chat", "Design", "Graphics", "Writing", "Video", "Code", "Tools", "Productivity"]
+DUMP_HEADER = """-- phpMyAdmin SQL Dump
+-- version 4.9.0.1
+-- https://www.phpmyadmin.net/
+--
+-- Synthetic dump generated by benchmark_importer.py
+
+SET SQL_MODE = "NO_AUTO_VALUE_ON_ZERO";
+SET AUTOCOMMIT = 0;
+START TRANSACTION;
+SET time_zone = "+00:00";
+
+CREATE TABLE `links` (
+  `id` int(11) NOT NULL,
+  `url` varchar(255) NOT NULL,
+  `name` varchar(255) NOT NULL,
+  `description` text DEFAULT NULL,
+  `tags` varchar(255) DEFAULT NULL,
+  `username` varchar(255) DEFAULT NULL,
+  `email` varchar(255) DEFAULT NULL,
+  `added_date` timestamp NOT NULL DEFAULT current_timestamp(),
+  `visibility` enum('public','private') NOT NULL DEFAULT 'public',
+  `clicks` int(11) DEFAULT 0
+) ENGINE=MyISAM DEFAULT CHARSET=latin1 COLLATE=latin1_swedish_ci;
+
+"""
+INSERT_HEADER = "INSERT INTO `links` (`id`, `url`, `name`, `description`, `tags`, `username`, `email`, `added_date`, `visibility`, `clicks`) VALUES\n"
+
+# Function to write a synthetic phpMyAdmin dump
+def generate_dump(path, rows, domains=200, site_port=None, rows_per_insert=250, seed=1):
+    """
+    Write `rows` link rows split into INSERT statements of rows_per_insert
+    rows, like phpMyAdmin's extended inserts. URLs point at fake sites
+    site-N.bench.test (with site_port when given) spread over `domains` hosts.
+    """
+    rng = random.Random(seed)
+    port = f":{site_port}" if site_port else ""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(DUMP_HEADER)
+        for start in range(1, rows + 1, rows_per_insert):
+            end = min(rows, start + rows_per_insert - 1)
+            f.write(INSERT_HEADER)
+            for row_id in range(start, end + 1):
+                site = rng.randrange(domains)
+                tags = ", ".join(rng.sample(TAG_VOCABULARY, rng.randint(0, 3)))
+                # Mix in the escape styles phpMyAdmin and mysqldump produce
+                description = rng.choice([
+                    "A useful tool for everyday work",
+                    "Explore the site\\'s features; it\\'s free",
+                    "Notes with ''quotes'' and (parentheses), commas",
+                    "",
+                ])
+                user = "NULL, NULL" if row_id % 2 else "'bench', 'bench@example.com'"
+                visibility = "public" if row_id % 5 else "private"
+                sep = ";" if row_id == end else ","
+                f.write(
+                    f"({row_id}, 'http://site-{site}.{BENCH_DOMAIN}{port}/page/{row_id}', 'Link {row_id}', "
+                    f"'{description}', '{tags}', {user}, '2024-04-14 10:55:15', '{visibility}', {rng.randint(0, 50)}){sep}\n"
+                )
+            f.write("\n")
+        f.write("COMMIT;\n")
+
+# HTTP server that does not report clients hanging up mid-response
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+# Stub PocketBase server
+class StubPocketBaseHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, data, extra_headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def injected_error(self):
+        """Sleep for the configured latency and maybe answer with an injected error"""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        roll = server.rng.random()
+        if roll < server.error_rate:
+            self.send_json(500, {"status": 500, "message": "Injected failure."})
+            return True
+        if roll < server.error_rate + server.throttle_rate:
+            self.send_json(429, {"status": 429, "message": "Too many requests."}, {"Retry-After": "0.1"})
+            return True
+        return False
+
+    def create_record(self, payload):
+        """Return (status, body) for creating one record"""
+        server = self.server
+        with server.lock:
+            if payload.get('url') in server.urls:
+                return 400, {"status": 400, "message": "Failed to create record.",
+                             "data": {"url": {"code": "validation_not_unique", "message": "Value must be unique."}}}
+            server.urls.add(payload.get('url'))
+            server.next_id += 1
+            record_id = f"{server.next_id:015d}"
+        return 200, dict(payload, id=record_id, collectionName="links")
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/api/health':
+            return self.send_json(200, {"code": 200, "message": "API is healthy."})
+        if parsed.path == '/api/collections/links/records':
+            if self.injected_error():
+                return
+            query = parse_qs(parsed.query)
+            per_page = int(query.get('perPage', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            with self.server.lock:
+                urls = sorted(self.server.urls)
+            items = [{"url": url} for url in urls[(page - 1) * per_page:page * per_page]]
+            return self.send_json(200, {
+                "page": page, "perPage": per_page, "totalItems": len(urls),
+                "totalPages": max(1, -(-len(urls) // per_page)), "items": items
+            })
+        self.send_json(404, {"status": 404, "message": "The requested resource wasn't found."})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        parsed = urlparse(self.path)
+
+        if parsed.path == '/api/collections/links/records':
+            if self.injected_error():
+                return
+            return self.send_json(*self.create_record(payload))
+
+        if parsed.path == '/api/batch':
+            if not self.server.batch_enabled:
+                return self.send_json(403, {"status": 403, "message": "Batch requests are not allowed."})
+            if self.injected_error():
+                return
+            requests = payload.get('requests', [])
+            with self.server.lock:
+                failed = {
+                    str(i): {"code": "batch_request_failed", "message": "Batch request failed.",
+                             "response": {"status": 400, "message": "Failed to create record.",
+                                          "data": {"url": {"code": "validation_not_unique", "message": "Value must be unique."}}}}
+                    for i, request in enumerate(requests) if request.get('body', {}).get('url') in self.server.urls
+                }
+            if failed:
+                return self.send_json(400, {"status": 400, "message": "Batch transaction failed.", "data": {"requests": failed}})
+            results = []
+            for request in requests:
+                status, body = self.create_record(request.get('body', {}))
+                results.append({"status": status, "body": body})
+            return self.send_json(200, results)
+
+        self.send_json(404, {"status": 404, "message": "The requested resource wasn't found."})
+
+def start_stub_pocketbase(latency=0.0, error_rate=0.0, throttle_rate=0.0, batch_enabled=True):
+    server = QuietHTTPServer(('127.0.0.1', 0), StubPocketBaseHandler)
+    server.latency = latency
+    server.error_rate = error_rate
+    server.throttle_rate = throttle_rate
+    server.batch_enabled = batch_enabled
+    server.rng = random.Random(2)
+    server.lock = threading.Lock()
+    server.urls = set()
+    server.next_id = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Fake websites (one server, virtual hosts site-N.bench.test)
+class FakeSiteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, include_body):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        host = self.headers.get('Host', '').split(':')[0]
+        try:
+            site = int(host.split('.')[0].split('-')[1])
+        except (IndexError, ValueError):
+            site = 0
+        path = urlparse(self.path).path
+        kind = site % 3  # 0: icon in HTML, 1: /favicon.ico only, 2: no favicon at all
+
+        status, content_type, body = 404, 'text/plain', b'Not found'
+        if path.startswith('/page/') or path == '/':
+            icon = '<link rel="icon" href="/static/icon.png">' if kind == 0 else ''
+            head = f'<html><head><title>Site {site}</title><meta name="description" content="Fake site {site}">{icon}</head>'
+            status, content_type = 200, 'text/html; charset=utf-8'
+            body = (head + '<body>' + 'x' * server.page_bytes + '</body></html>').encode('utf-8')
+        elif path == '/static/icon.png' and kind == 0:
+            status, content_type, body = 200, 'image/png', b'\x89PNG fake icon'
+        elif path == '/favicon.ico' and kind == 1:
+            status, content_type, body = 200, 'image/x-icon', b'\x00\x00\x01\x00 fake icon'
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if include_body:
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The importer stops reading pages after </head>
+
+    def do_GET(self):
+        self.respond(True)
+
+    def do_HEAD(self):
+        self.respond(False)
+
+def start_fake_sites(latency=0.0, page_bytes=50000):
+    server = QuietHTTPServer(('127.0.0.1', 0), FakeSiteHandler)
+    server.latency = latency
+    server.page_bytes = page_bytes
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Function used as the importer's DNS resolver during benchmarks
+def stub_resolver(host, port):
+    if host.endswith('.' + BENCH_DOMAIN):
+        return '127.0.0.1'
+    # Anything else (e.g. the Google favicon fallback) must not leave the machine
+    raise OSError(f"{host} is not resolvable in the benchmark")
+
+# Function to summarize a list of latencies
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def phase_result(phase, rows, elapsed, latencies):
+    return {
+        'phase': phase,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'links_per_sec': round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+# Benchmark phases (each runs in a fresh subprocess)
+def run_parse_phase(args):
+    latencies = []
+    started = time.perf_counter()
+    last = started
+    rows = 0
+    for _ in importer.parse_sql_file(args.dump):
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+        rows += 1
+    return phase_result('parse_sql_file', rows, time.perf_counter() - started, latencies)
+
+def configure_importer(args):
+    importer.POCKETBASE_URL = f"http://127.0.0.1:{args.pb_port}"
+    importer.PB_CLIENT = importer.PocketBaseClient(importer.POCKETBASE_URL, max_connections=args.writers)
+    importer.FETCH_SCHEDULER = importer.HostScheduler(min_delay=0.0, resolver=stub_resolver)
+
+def run_favicon_phase(args):
+    configure_importer(args)
+    links = list(itertools.islice(importer.parse_sql_file(args.dump), args.e2e_rows))
+
+    def timed_fetch(link):
+        started = time.perf_counter()
+        importer.fetch_favicon(link.url)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = [latency for _, latency in importer.iter_ordered_results(timed_fetch, links, args.writers)]
+    return phase_result('fetch_favicon', len(links), time.perf_counter() - started, latencies)
+
+def run_insert_phase(args):
+    configure_importer(args)
+    links = list(itertools.islice(importer.parse_sql_file(args.dump), args.e2e_rows))
+
+    def timed_insert(link):
+        started = time.perf_counter()
+        importer.insert_link(link, "bench-token", "bench-user", args.skip_favicons)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = [latency for _, latency in importer.iter_ordered_results(timed_insert, links, args.writers)]
+    return phase_result('insert_link', len(links), time.perf_counter() - started, latencies)
+
+PHASES = {
+    'parse': run_parse_phase,
+    'favicon': run_favicon_phase,
+    'insert': run_insert_phase,
+}
+
+def run_phase_subprocess(phase, dump, args, pb_port):
+    command = [
+        sys.executable, os.path.abspath(__file__), '--phase', phase, '--dump', dump,
+        '--pb-port', str(pb_port), '--e2e-rows', str(args.e2e_rows), '--writers', str(args.writers),
+    ]
+    if args.skip_favicons:
+        command.append('--skip-favicons')
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def print_table(results):
+    columns = ['rows', 'phase', 'links_per_sec', 'p50_ms', 'p99_ms', 'peak_rss_mb', 'seconds']
+    print(f"{'dump rows':>10} {'phase':<15} {'links/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>8} {'seconds':>9}")
+    for result in results:
+        row = [result.get(column) for column in columns]
+        print(f"{result['dump_rows']:>10} {row[1]:<15} {row[2]:>10} {row[3]:>9} {row[4]:>9} {row[5]:>8} {row[6]:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the LinkSync importer offline against local stand-ins')
+    parser.add_argument('--sizes', default='1000,100000,1000000', help='Comma separated dump sizes in rows (default: 1000,100000,1000000)')
+    parser.add_argument('--e2e-rows', type=int, default=500, metavar='N', help='Rows used for the favicon and insert phases (default: 500)')
+    parser.add_argument('--phases', default='parse,favicon,insert', help='Phases to run (default: parse,favicon,insert)')
+    parser.add_argument('--writers', type=int, default=1, metavar='N', help='Concurrent workers for the favicon and insert phases (default: 1)')
+    parser.add_argument('--skip-favicons', action='store_true', help='Measure insert_link without favicon lookups')
+    parser.add_argument('--domains', type=int, default=200, metavar='N', help='Number of distinct fake sites in generated dumps (default: 200)')
+    parser.add_argument('--pb-latency', type=float, default=0.0, metavar='MS', help='Latency added to every stub PocketBase response')
+    parser.add_argument('--pb-error-rate', type=float, default=0.0, metavar='FRACTION', help='Fraction of stub PocketBase writes failing with 500')
+    parser.add_argument('--pb-429-rate', type=float, default=0.0, metavar='FRACTION', help='Fraction of stub PocketBase writes rejected with 429')
+    parser.add_argument('--no-batch', action='store_true', help='Make the stub PocketBase refuse /api/batch')
+    parser.add_argument('--site-latency', type=float, default=0.0, metavar='MS', help='Latency added to every fake site response')
+    parser.add_argument('--page-kb', type=int, default=50, metavar='KB', help='Size of fake page bodies after </head> (default: 50)')
+    parser.add_argument('--json-out', metavar='PATH', help='Also write the results as JSON (for regression tracking)')
+    parser.add_argument('--keep-dumps', metavar='DIR', help='Write generated dumps to DIR instead of a temporary directory')
+    # Internal options used when a phase runs in its own subprocess
+    parser.add_argument('--phase', choices=sorted(PHASES), help=argparse.SUPPRESS)
+    parser.add_argument('--dump', help=argparse.SUPPRESS)
+    parser.add_argument('--pb-port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        # Keep the importer's per-link console output out of the measurement
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = PHASES[args.phase](args)
+        print(json.dumps(result))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    phases = [phase.strip() for phase in args.phases.split(',') if phase.strip()]
+    unknown = [phase for phase in phases if phase not in PHASES]
+    if unknown:
+        parser.error(f"Unknown phases: {', '.join(unknown)}")
+
+    pocketbase = start_stub_pocketbase(
+        latency=args.pb_latency / 1000, error_rate=args.pb_error_rate,
+        throttle_rate=args.pb_429_rate, batch_enabled=not args.no_batch
+    )
+    sites = start_fake_sites(latency=args.site_latency / 1000, page_bytes=args.page_kb * 1024)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dump_dir = args.keep_dumps or tmp_dir
+        os.makedirs(dump_dir, exist_ok=True)
+        for size in sizes:
+            dump = os.path.join(dump_dir, f"links_{size}.sql")
+            print(f"Generating {size} row dump: {dump}", file=sys.stderr)
+            generate_dump(dump, size, domains=args.domains, site_port=sites.server_port)
+            for phase in phases:
+                print(f"  running {phase}...", file=sys.stderr)
+                # Every size starts from an empty collection so inserts are not duplicates
+                with pocketbase.lock:
+                    pocketbase.urls.clear()
+                result = run_phase_subprocess(phase, dump, args, pocketbase.server_port)
+                result['dump_rows'] = size
+                results.append(result)
+
+    print_table(results)
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,11 @@ using the authentication token from the browser's localStorage.
 Usage:
     1. First, log into your LinkSync app in the browser
     2. Run this script: python inseart_browser_auth.py [--sql-file SQL_FILE_PATH]
+    3. To back up or migrate, export the links again: python inseart_browser_auth.py export OUTPUT
 
 Example:
     python inseart_browser_auth.py --sql-file links.sql
+    python inseart_browser_auth.py export links-backup.sql.gz
 
 Note: 
     - Make sure you're logged into the LinkSync app in your browser first
@@ -19,27 +21,61 @@ Note:
 """
 import re
 import json
-from datetime import datetime
+import html as html_lib
+from datetime import datetime, timezone
 import sys
 import os
 import urllib.request
 import urllib.error
 import urllib.parse
 import base64
+import codecs
+import cProfile
+import pstats
+import email.utils
+import io
 import http.client
 import time
 import argparse
 import ssl
 import glob
+import gzip
+import csv
+import queue
+import hashlib
+import itertools
+from enum import Enum
+import secrets
+import mmap
 from urllib.parse import urlparse
+from html.parser import HTMLParser
 from http.client import HTTPSConnection, HTTPConnection
 import socket
 import sqlite3
 from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import atexit
 
 # Configuration - Global variables
 POCKETBASE_URL = "http://localhost:8090"  # Update with your PocketBase URL
 API_COLLECTION = "links"
+FAVICON_CACHE = None  # Set in main() when --favicon-cache is given
+PB_CLIENT = None  # Shared keep-alive connection pool, see get_pocketbase_client()
+FETCH_SCHEDULER = None  # HostScheduler for favicon requests, see get_fetch_scheduler()
+THROTTLE = None  # RateController pacing PocketBase writes, set in main()
+MAX_RETRIES = 3  # Retries for 429/503 responses
+
+# Errors that mean a reused keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
 
 # Colors for terminal output
 class Colors:
@@ -50,26 +86,751 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
-def print_success(message):
-    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+# Console output: colored text, JSON lines or errors only (see --log-format)
+class Logger:
+    """
+    Buffered sink behind the print_* helpers. Messages are collected and
+    written in chunks instead of one flushed print per call, the progress
+    line is only drawn on a terminal and at most `progress_hz` times a
+    second, and per-link chatter (detail=True) is dropped outside pretty
+    mode so output stays constant per row. In jsonl mode every message and
+    every row outcome is one JSON object per line on stdout.
+    """
+    
+    FORMATS = ('pretty', 'jsonl', 'quiet')
+    LEVEL_STYLES = {
+        'success': (Colors.GREEN, '✓'),
+        'warning': (Colors.YELLOW, '⚠'),
+        'error': (Colors.RED, '✗'),
+        'info': (Colors.BLUE, 'ℹ'),
+    }
+    
+    def __init__(self, log_format='pretty', progress_hz=10, flush_lines=256, flush_interval=1.0, stream=None):
+        self.format = log_format
+        self.stream = stream  # None follows sys.stdout (which may be redirected)
+        self.progress_interval = 1.0 / progress_hz
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._last_progress = 0.0
+        self._progress_drawn = False
+    
+    def output(self):
+        return self.stream or sys.stdout
+    
+    def is_tty(self):
+        try:
+            return self.output().isatty()
+        except (AttributeError, ValueError):
+            return False
+    
+    def _write(self, line, urgent=False):
+        with self._lock:
+            if self._progress_drawn:
+                # Start below the progress line instead of appending to it
+                self._buffer.append('\n')
+                self._progress_drawn = False
+            self._buffer.append(line + '\n')
+            now = time.monotonic()
+            # A terminal is watched by a person; anywhere else only throughput matters
+            interval = self.progress_interval if self.is_tty() else self.flush_interval
+            if urgent or len(self._buffer) >= self.flush_lines or now - self._last_flush >= interval:
+                self._flush_locked(now)
+    
+    def _flush_locked(self, now=None):
+        stream = self.output()
+        if self._buffer:
+            stream.write(''.join(self._buffer))
+            self._buffer.clear()
+        stream.flush()
+        self._last_flush = now or time.monotonic()
+    
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+    
+    def message(self, level, text, detail=False):
+        if self.format == 'pretty':
+            color, icon = self.LEVEL_STYLES[level]
+            self._write(f"{color}{icon} {text}{Colors.END}", urgent=level == 'error')
+        elif detail:
+            # Per-link messages are summarized by the row records instead
+            if self.format == 'jsonl' and level == 'error':
+                self.record('log', level=level, message=text.strip())
+        elif self.format == 'jsonl':
+            self.record('log', level=level, message=text.strip())
+        elif level in ('warning', 'error'):
+            self._write(f"{level}: {text.strip()}", urgent=level == 'error')
+    
+    def header(self, text):
+        if self.format == 'pretty':
+            self._write(f"\n{Colors.BOLD}{text}{Colors.END}\n" + "-" * len(text))
+        elif self.format == 'jsonl':
+            self.record('step', message=text)
+    
+    def text(self, line):
+        """Write a free-form line in pretty mode only"""
+        if self.format == 'pretty':
+            self._write(line)
+    
+    def record(self, record_type, **fields):
+        """Write one JSON line in jsonl mode"""
+        if self.format == 'jsonl':
+            self._write(json.dumps(dict(type=record_type, ts=round(time.time(), 3), **fields), ensure_ascii=False))
+    
+    def row(self, link, status, has_favicon=False):
+        """Report the outcome of one link"""
+        self.record('row', id=link.original_id, url=link.url, status=status,
+                    record_id=link.record_id or None, favicon=has_favicon)
+    
+    def progress(self, line):
+        """Redraw the progress line, at most progress_hz times a second and only on a terminal"""
+        if self.format != 'pretty' or not self.is_tty():
+            return
+        now = time.monotonic()
+        if now - self._last_progress < self.progress_interval:
+            return
+        with self._lock:
+            self._last_progress = now
+            self._buffer.append(f"\r{line}   ")
+            self._flush_locked(now)
+            self._progress_drawn = True
+    
+    def end_progress(self):
+        """Clear the progress line"""
+        with self._lock:
+            if self._progress_drawn:
+                self._buffer.append("\r" + " " * 80 + "\r")
+                self._progress_drawn = False
+            self._flush_locked()
 
-def print_warning(message):
-    print(f"{Colors.YELLOW}⚠ {message}{Colors.END}")
+LOG = Logger()  # Replaced in main() according to --log-format
 
-def print_error(message):
-    print(f"{Colors.RED}✗ {message}{Colors.END}")
+def print_success(message, detail=False):
+    LOG.message('success', message, detail)
 
-def print_info(message):
-    print(f"{Colors.BLUE}ℹ {message}{Colors.END}")
+def print_warning(message, detail=False):
+    LOG.message('warning', message, detail)
+
+def print_error(message, detail=False):
+    LOG.message('error', message, detail)
+
+def print_info(message, detail=False):
+    LOG.message('info', message, detail)
 
 def print_header(message):
-    print(f"\n{Colors.BOLD}{message}{Colors.END}")
-    print("-" * len(message))
+    LOG.header(message)
+
+# Run instrumentation: per-phase timing histograms, counters and gauges
+class Metrics:
+    """
+    Thread-safe metrics registry for an import run. Phase timings (SQL parse,
+    HTML fetch, favicon probe, POST, throttle sleep, ...) are kept as
+    histograms, HTTP status codes and cache lookups as labelled counters.
+    Everything can be exported as JSON or Prometheus text format.
+    """
+    
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+    
+    def observe(self, phase, seconds):
+        with self._lock:
+            hist = self.histograms.get(phase)
+            if hist is None:
+                hist = {'count': 0, 'sum': 0.0, 'min': seconds, 'max': seconds, 'buckets': [0] * len(self.BUCKETS)}
+                self.histograms[phase] = hist
+            hist['count'] += 1
+            hist['sum'] += seconds
+            hist['min'] = min(hist['min'], seconds)
+            hist['max'] = max(hist['max'], seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    hist['buckets'][i] += 1
+                    break
+    
+    def timer(self, phase):
+        """Context manager that observes the time spent in its block"""
+        return _MetricsTimer(self, phase)
+    
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, tuple(sorted((k, str(v)) for k, v in labels.items())))] = value
+    
+    def to_json(self):
+        with self._lock:
+            histograms = {}
+            for phase, hist in self.histograms.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.BUCKETS, hist['buckets']):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                buckets['+Inf'] = hist['count']
+                histograms[phase] = {
+                    'count': hist['count'], 'sum': round(hist['sum'], 6),
+                    'min': round(hist['min'], 6), 'max': round(hist['max'], 6), 'buckets': buckets
+                }
+            return {
+                'phases': histograms,
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                'gauges': [{'name': name, 'labels': dict(labels), 'value': value}
+                           for (name, labels), value in sorted(self.gauges.items())],
+            }
+    
+    def to_prometheus(self, prefix='linksync_import'):
+        def format_labels(labels):
+            if not labels:
+                return ''
+            escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels)
+            return '{' + ','.join(escaped) + '}'
+        
+        data = self.to_json()
+        lines = [f"# TYPE {prefix}_phase_seconds histogram"]
+        for phase, hist in sorted(data['phases'].items()):
+            for bound, count in hist['buckets'].items():
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {hist["sum"]}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{phase}"}} {hist["count"]}')
+        
+        seen = set()
+        for counter in data['counters']:
+            name = f"{prefix}_{counter['name']}_total"
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{format_labels(sorted(counter['labels'].items()))} {counter['value']}")
+        for gauge in data['gauges']:
+            name = f"{prefix}_{gauge['name']}"
+            if name not in seen:
+                lines.append(f"# TYPE {name} gauge")
+                seen.add(name)
+            lines.append(f"{name}{format_labels(sorted(gauge['labels'].items()))} {gauge['value']}")
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path, fmt=None):
+        """Write metrics to path; fmt is 'json' or 'prometheus' (guessed from the extension if omitted)"""
+        if fmt is None:
+            fmt = 'prometheus' if path.endswith(('.prom', '.txt')) else 'json'
+        with open(path, 'w', encoding='utf-8') as f:
+            if fmt == 'prometheus':
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_json(), f, indent=2)
+
+class _MetricsTimer:
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.phase, time.perf_counter() - self.started)
+        return False
+
+METRICS = Metrics()
+
+class RunProfiler:
+    """
+    cProfile for the whole run, including the pipeline stage and pool
+    threads started after start(). Before Python 3.12 a profiler only sees
+    the thread that enabled it, so every new thread gets its own and they
+    are merged into one stats file by dump(); from 3.12 on one profiler
+    already covers all threads.
+    """
+    
+    PER_THREAD = sys.version_info < (3, 12)
+    
+    def __init__(self):
+        self.profilers = [cProfile.Profile()]
+        self._lock = threading.Lock()
+    
+    def _start_thread(self, *args):
+        # Runs once as the new thread's first profile event; enable() replaces this hook
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.profilers.append(profiler)
+        profiler.enable()
+    
+    def start(self):
+        if self.PER_THREAD:
+            threading.setprofile(self._start_thread)
+        self.profilers[0].enable()
+    
+    def dump(self, path):
+        """Stop profiling and write the merged stats of every thread to path"""
+        self.profilers[0].disable()
+        if self.PER_THREAD:
+            threading.setprofile(None)
+        with self._lock:
+            profilers = list(self.profilers)
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        return len(profilers)
+
+# HTML scanning used for favicon discovery
+HTML_MAX_BYTES = 256 * 1024  # Stop reading a page after this many bytes (see --html-max-bytes)
+HTML_READ_CHUNK_SIZE = 16 * 1024
+HTML_TAG_RE = re.compile(r'<(meta|link)\b([^>]*)>', re.IGNORECASE)
+HTML_TITLE_RE = re.compile(r'<title\b[^>]*>(.*?)</title', re.IGNORECASE | re.DOTALL)
+HTML_ATTR_RE = re.compile(r'''([^\s=/>]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''')
+
+# Function to read a page only up to the end of its <head>
+def read_html_head(response, max_bytes=None):
+    """
+    Read from an HTTP response until </head> (or <body>) appears or max_bytes
+    have been read, so heavy pages are not downloaded in full.
+    """
+    max_bytes = max_bytes or HTML_MAX_BYTES
+    chunks = []
+    size = 0
+    tail = b''
+    while size < max_bytes:
+        chunk = response.read(min(HTML_READ_CHUNK_SIZE, max_bytes - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        # Search the new chunk plus a little overlap in case the tag straddles chunks
+        window = (tail + chunk).lower()
+        if b'</head' in window or b'<body' in window:
+            break
+        tail = chunk[-8:]
+    return b''.join(chunks).decode('utf-8', errors='ignore')
+
+# Function to find favicon/logo candidates in a page with one pass over its tags
+def extract_icon_candidates(html):
+    """
+    Return icon URLs (as written in the page) in priority order: og:image,
+    apple-touch-icon, rel="icon", then rel="shortcut icon". Within each group
+    the document order is kept and duplicates are dropped.
+    """
+    og_images, touch_icons, icons, shortcut_icons = [], [], [], []
+    
+    for match in HTML_TAG_RE.finditer(html):
+        attrs = {}
+        for attr in HTML_ATTR_RE.finditer(match.group(2)):
+            value = next(v for v in attr.groups()[1:] if v is not None)
+            attrs.setdefault(attr.group(1).lower(), value)
+        
+        if match.group(1).lower() == 'meta':
+            if attrs.get('property', '').lower() == 'og:image' and attrs.get('content'):
+                og_images.append(attrs['content'])
+            continue
+        
+        rel = attrs.get('rel', '').lower()
+        href = attrs.get('href')
+        if not href:
+            continue
+        if 'apple-touch-icon' in rel:
+            touch_icons.append(href)
+        elif rel == 'icon':
+            icons.append(href)
+        elif rel == 'shortcut icon':
+            shortcut_icons.append(href)
+    
+    candidates = []
+    for href in og_images + touch_icons + icons + shortcut_icons:
+        if href not in candidates:
+            candidates.append(href)
+    return candidates
+
+# Function to read title and description from the same page head as the icons
+def extract_page_metadata(html):
+    """
+    Return {'title': ..., 'description': ...} from a page head, preferring
+    og: tags, then twitter: tags, then <title> and meta description (like
+    the app's metadata service). Missing values are left out.
+    """
+    found = {}
+    for match in HTML_TAG_RE.finditer(html):
+        if match.group(1).lower() != 'meta':
+            continue
+        attrs = {}
+        for attr in HTML_ATTR_RE.finditer(match.group(2)):
+            value = next(v for v in attr.groups()[1:] if v is not None)
+            attrs.setdefault(attr.group(1).lower(), value)
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        content = html_lib.unescape(attrs.get('content', '')).strip()
+        if key and content:
+            found.setdefault(key, content)
+    
+    title_match = HTML_TITLE_RE.search(html)
+    if title_match:
+        found.setdefault('<title>', ' '.join(html_lib.unescape(title_match.group(1)).split()))
+    
+    metadata = {}
+    for field, keys in (('title', ('og:title', 'twitter:title', '<title>')),
+                        ('description', ('og:description', 'twitter:description', 'description'))):
+        value = next((found[key] for key in keys if found.get(key)), None)
+        if value:
+            metadata[field] = value
+    return metadata
+
+# HTTP connection that connects to an already resolved address
+class ResolvedHTTPConnection(HTTPConnection):
+    def __init__(self, host, port, address, timeout):
+        super().__init__(host, port, timeout=timeout)
+        self.address = address
+    
+    def connect(self):
+        self.sock = socket.create_connection((self.address, self.port), self.timeout)
+
+# HTTPS connection that connects to an already resolved address (SNI still uses the hostname)
+class ResolvedHTTPSConnection(HTTPSConnection):
+    def __init__(self, host, port, address, timeout, context):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self.address = address
+        self.ssl_context = context
+    
+    def connect(self):
+        sock = socket.create_connection((self.address, self.port), self.timeout)
+        self.sock = self.ssl_context.wrap_socket(sock, server_hostname=self.host)
+
+# Scheduler for outbound metadata requests (page fetches and favicon probes)
+class HostScheduler:
+    """
+    Sends favicon/metadata requests with an in-process DNS cache, at most
+    max_per_host concurrent requests and min_delay seconds between request
+    starts for each host, and idle keep-alive connections kept per host so
+    the probes for one domain reuse a socket. Different hosts proceed in
+    parallel. resolver(host, port) -> address can be replaced, e.g. in tests.
+    A request given a deadline (a time.monotonic() value) gives up waiting
+    for a host slot at the deadline and never uses a socket timeout that
+    runs past it.
+    """
+    
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+    
+    def __init__(self, max_per_host=2, min_delay=0.1, dns_ttl=300, negative_dns_ttl=60, resolver=None):
+        self.max_per_host = max_per_host
+        self.min_delay = min_delay
+        self.dns_ttl = dns_ttl
+        self.negative_dns_ttl = negative_dns_ttl
+        self.resolver = resolver or self.system_resolve
+        self.dns_hits = 0
+        self.dns_misses = 0
+        self._dns = {}
+        self._hosts = {}
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._verified_context = ssl.create_default_context()
+        self._unverified_context = ssl._create_unverified_context()
+    
+    @staticmethod
+    def system_resolve(host, port):
+        return socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+    
+    def resolve(self, host, port):
+        """Return the address for host, caching successes and failures"""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._dns.get(key)
+            if entry and entry[1] > now:
+                self.dns_hits += 1
+                METRICS.increment('dns_cache_lookups', result='hit')
+                address = entry[0]
+                if isinstance(address, Exception):
+                    raise address
+                return address
+            self.dns_misses += 1
+            METRICS.increment('dns_cache_lookups', result='miss')
+        try:
+            address = self.resolver(host, port)
+        except OSError as e:
+            with self._lock:
+                self._dns[key] = (e, now + self.negative_dns_ttl)
+            raise
+        with self._lock:
+            self._dns[key] = (address, now + self.dns_ttl)
+        return address
+    
+    def _host_state(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = {
+                    'slots': threading.BoundedSemaphore(self.max_per_host),
+                    'lock': threading.Lock(),
+                    'next_start': 0.0,
+                }
+                self._hosts[host] = state
+            return state
+    
+    def _wait_turn(self, state):
+        with state['lock']:
+            now = time.monotonic()
+            start = max(now, state['next_start'])
+            state['next_start'] = start + self.min_delay
+        if start > now:
+            time.sleep(start - now)
+            METRICS.observe('host_delay_sleep', start - now)
+    
+    @contextmanager
+    def _host_slot(self, state, host, deadline):
+        """Hold one of the host's request slots, waiting no longer than deadline"""
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not state['slots'].acquire(timeout=timeout):
+            raise TimeoutError(f"Deadline passed waiting for a connection to {host}")
+        try:
+            yield
+        finally:
+            state['slots'].release()
+    
+    def _acquire(self, key, timeout):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._new_connection(key, timeout), False
+    
+    def _new_connection(self, key, timeout):
+        scheme, host, port, verify = key
+        address = self.resolve(host, port)
+        if scheme == 'https':
+            context = self._verified_context if verify else self._unverified_context
+            return ResolvedHTTPSConnection(host, port, address, timeout, context)
+        return ResolvedHTTPConnection(host, port, address, timeout)
+    
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+    
+    def _request_once(self, method, url, headers, timeout, verify, body_reader, deadline):
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or '').lower()
+        if scheme not in ('http', 'https') or not host:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parsed.port or (443 if scheme == 'https' else 80)
+        path = (parsed.path or '/') + (f"?{parsed.query}" if parsed.query else '')
+        key = (scheme, host, port, verify)
+        
+        state = self._host_state(host)
+        with self._host_slot(state, host, deadline):
+            self._wait_turn(state)
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    raise TimeoutError(f"Deadline passed before requesting {url}")
+            conn, reused = self._acquire(key, timeout)
+            while True:
+                try:
+                    conn.request(method, path, headers=headers)
+                    response = conn.getresponse()
+                    if method == 'HEAD':
+                        body = response.read()
+                    elif response.status == 200 and body_reader is not None:
+                        body = body_reader(response)
+                    else:
+                        # Small bodies (redirects, errors) are drained so the socket can be reused
+                        body = response.read(65536)
+                    break
+                except STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    # The server dropped an idle connection; retry once on a fresh one
+                    conn, reused = self._new_connection(key, timeout), False
+                except Exception:
+                    conn.close()
+                    raise
+            
+            if response.isclosed() and not response.will_close:
+                self._release(key, conn)
+            else:
+                # Body only partially read (or server closing): the socket cannot be reused
+                conn.close()
+            METRICS.increment('http_responses', target='sites', method=method, status=response.status)
+            return response.status, response.headers, body
+    
+    def request(self, method, url, headers=None, timeout=10, verify=True, body_reader=None, max_redirects=5, deadline=None):
+        """
+        Send a request following redirects. Returns (status, headers, body,
+        final_url). body_reader(response) can limit how much of a 200 GET
+        response is read; otherwise the whole body is returned. With a
+        deadline, timeout is shortened to the time left before it.
+        """
+        for _ in range(max_redirects + 1):
+            status, response_headers, body = self._request_once(method, url, headers or {}, timeout, verify, body_reader, deadline)
+            location = response_headers.get('Location')
+            if status not in self.REDIRECT_STATUSES or not location:
+                return status, response_headers, body, url
+            url = urllib.parse.urljoin(url, location)
+            if status == 303 and method != 'HEAD':
+                method = 'GET'
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+    
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+# Function to get the shared scheduler for favicon/metadata requests
+def get_fetch_scheduler():
+    global FETCH_SCHEDULER
+    if FETCH_SCHEDULER is None:
+        FETCH_SCHEDULER = HostScheduler()
+    return FETCH_SCHEDULER
+
+# Function to check whether a URL serves an image
+def probe_image(url, headers, timeout=5, verify=False, deadline=None):
+    """HEAD url through the fetch scheduler; return (ok, status, content_type)"""
+    with METRICS.timer('favicon_probe'):
+        status, response_headers, _, _ = get_fetch_scheduler().request('HEAD', url, headers, timeout=timeout, verify=verify, deadline=deadline)
+    content_type = response_headers.get('Content-Type', '')
+    ok = status == 200 and any(img_type in content_type.lower() for img_type in ['image/', 'application/octet-stream'])
+    return ok, status, content_type
+
+# Favicon candidates are probed concurrently; see fetch_favicon()
+FAVICON_COMMON_PATHS = [
+    '/favicon.ico',
+    '/favicon.png',
+    '/apple-touch-icon.png',
+    '/apple-touch-icon-precomposed.png',
+    '/apple-touch-icon-120x120.png',
+    '/apple-touch-icon-152x152.png',
+    '/apple-touch-icon-180x180.png',
+]
+FAVICON_DEADLINE = 12.0  # Overall time budget per link (see --favicon-deadline)
+FAVICON_GOOGLE_HEDGE_DELAY = 2.0  # Start the Google fallback early if nothing has been decided by then
+FAVICON_PROBES_PER_LINK = 16  # Probe threads per concurrently resolved link
+FAVICON_PROBE_WORKERS = FAVICON_PROBES_PER_LINK  # Set from --favicon-workers in main()
+PROBE_EXECUTOR = None  # Thread pool shared by all favicon probes, see get_probe_executor()
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+PROBE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Function to get the shared pool that runs favicon probes
+def get_probe_executor():
+    global PROBE_EXECUTOR
+    if PROBE_EXECUTOR is None:
+        PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=FAVICON_PROBE_WORKERS, thread_name_prefix='favicon-probe')
+    return PROBE_EXECUTOR
+
+# Function to find the icon URLs a page declares, made absolute
+def fetch_page_icon_candidates(url, base_url, scheme, metadata=None, deadline=None):
+    """
+    GET the page head and return its icon/logo URLs in priority order ([] if
+    the page has none or is not a 200 response, None if it could not be
+    fetched at all). When a metadata dict is given it is filled from the same
+    response (see extract_page_metadata()).
+    """
+    candidates = []
+    try:
+        with METRICS.timer('html_fetch'):
+            status, _, html, _ = get_fetch_scheduler().request('GET', url, PAGE_HEADERS, timeout=10, verify=False,
+                                                               body_reader=read_html_head, deadline=deadline)
+        if status != 200:
+            print_warning(f"Non-200 response {status} for {url}", detail=True)
+            return candidates
+        if metadata is not None:
+            metadata.update(extract_page_metadata(html))
+        
+        # Look for various logo/icon patterns in HTML (similar to metascraper-logo)
+        for favicon_url in extract_icon_candidates(html):
+            favicon_url = favicon_url.strip()
+            if not favicon_url:
+                continue
+            
+            # Handle relative URLs
+            if favicon_url.startswith('//'):
+                favicon_url = f"{scheme}:{favicon_url}"
+            elif favicon_url.startswith('/'):
+                favicon_url = f"{base_url}{favicon_url}"
+            elif not favicon_url.startswith(('http://', 'https://')):
+                favicon_url = f"{base_url}/{favicon_url}"
+            
+            # Validate the URL format
+            try:
+                if not urlparse(favicon_url).netloc:
+                    continue
+            except ValueError:
+                continue
+            if favicon_url not in candidates:
+                candidates.append(favicon_url)
+    except Exception as e:
+        print_warning(f"Error fetching HTML from {url}: {e}", detail=True)
+        return None
+    return candidates
+
+# Function to check one favicon candidate
+def probe_favicon_candidate(kind, favicon_url, deadline=None):
+    """
+    Return True if the candidate is usable, False if the server answered that
+    it is not, or None if there was no definite answer (network error,
+    timeout, 429 or 5xx). kind is 'html', 'common' or 'google'.
+    """
+    try:
+        if kind == 'google':
+            # Verify Google's service responds
+            with METRICS.timer('favicon_probe'):
+                status, _, _, _ = get_fetch_scheduler().request('HEAD', favicon_url, PROBE_HEADERS, timeout=5, verify=True, deadline=deadline)
+            if status == 200:
+                return True
+            print_warning(f"Google favicon service failed: HTTP {status}", detail=True)
+        else:
+            ok, status, content_type = probe_image(favicon_url, PAGE_HEADERS if kind == 'html' else PROBE_HEADERS, deadline=deadline)
+            if ok:
+                return True
+            if kind == 'html' and status == 200:
+                print_warning(f"Favicon URL returned non-image content: {content_type}", detail=True)
+            else:
+                print_warning(f"Favicon check failed for {favicon_url}: HTTP {status}", detail=True)
+        return None if status == 429 or status >= 500 else False
+    except Exception as e:
+        print_warning(f"Favicon check failed for {favicon_url}: {e}", detail=True)
+        return None
 
 # Function to extract favicon URL from a website (improved version matching Svelte app)
-def fetch_favicon(url):
+def fetch_favicon(url, deadline=None, metadata=None):
     """
-    Fetch favicon URL using the same logic as the Svelte app's metadata service
+    Fetch favicon URL using the same logic as the Svelte app's metadata service.
+    The candidates keep their priority (icons declared in the page, then the
+    common locations, then Google's favicon service), but are probed
+    concurrently: the common locations start together with the page fetch,
+    the page's own icons as soon as it arrives, and Google's service once
+    the rest have failed or FAVICON_GOOGLE_HEDGE_DELAY has passed. The first
+    candidate that works and has no better one still pending wins; the rest
+    are cancelled. After `deadline` seconds (default FAVICON_DEADLINE) the
+    best candidate confirmed so far is used, and no probe waits for a host
+    slot or a socket past it, so abandoned probes do not hold up the next
+    link. A metadata dict, when given, is filled with the page's title and
+    description from the same fetch.
+    Returns "" only when every probe was answered and none found an icon,
+    and None when there was no definite answer (deadline, network errors),
+    so callers can tell a site without a favicon from a transient failure.
     """
     try:
         # Parse the URL to get the domain
@@ -79,263 +840,1384 @@ def fetch_favicon(url):
         parsed_url = urlparse(url)
         domain = parsed_url.hostname
         if not domain:
-            print_error(f"Could not parse domain from URL: {url}")
+            print_error(f"Could not parse domain from URL: {url}", detail=True)
             return ""
         
-        base_url = f"{parsed_url.scheme}://{domain}"
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        google_favicon = f"https://www.google.com/s2/favicons?domain={domain}&sz=64"
+        executor = get_probe_executor()
+        started = time.monotonic()
+        deadline_at = started + (deadline or FAVICON_DEADLINE)
+        hedge_at = started + FAVICON_GOOGLE_HEDGE_DELAY
         
-        print_info(f"Fetching favicon for: {domain}")
+        print_info(f"Fetching favicon for: {domain}", detail=True)
         
-        # First try to fetch the page's HTML to find favicon/logo links (like metascraper)
-        try:
-            context = ssl._create_unverified_context()
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            req = urllib.request.Request(url, headers=headers)
-            
-            with urllib.request.urlopen(req, timeout=10, context=context) as response:
-                if response.status != 200:
-                    print_warning(f"Non-200 response {response.status} for {url}")
-                else:
-                    html = response.read().decode('utf-8', errors='ignore')
-                    
-                    # Look for various logo/icon patterns in HTML (similar to metascraper-logo)
-                    logo_patterns = [
-                        # Open Graph image (prioritized)
-                        r'<meta[^>]*property=["\']og:image["\'][^>]*content=["\']([^"\']+)["\']',
-                        r'<meta[^>]*content=["\']([^"\']+)["\'][^>]*property=["\']og:image["\']',
-                        # Apple touch icons (high quality)
-                        r'<link[^>]*rel=["\'][^"\']*apple-touch-icon[^"\']*["\'][^>]*href=["\']([^"\']+)["\']',
-                        r'<link[^>]*href=["\']([^"\']+)["\'][^>]*rel=["\'][^"\']*apple-touch-icon[^"\']*["\']',
-                        # Standard favicon links
-                        r'<link[^>]*rel=["\']icon["\'][^>]*href=["\']([^"\']+)["\']',
-                        r'<link[^>]*href=["\']([^"\']+)["\'][^>]*rel=["\']icon["\']',
-                        r'<link[^>]*rel=["\']shortcut icon["\'][^>]*href=["\']([^"\']+)["\']',
-                        r'<link[^>]*href=["\']([^"\']+)["\'][^>]*rel=["\']shortcut icon["\']',
-                    ]
-                    
-                    for pattern in logo_patterns:
-                        matches = re.findall(pattern, html, re.IGNORECASE)
-                        if matches:
-                            for favicon_url in matches:
-                                # Clean up the URL
-                                favicon_url = favicon_url.strip()
-                                if not favicon_url:
-                                    continue
-                                
-                                # Handle relative URLs
-                                if favicon_url.startswith('//'):
-                                    favicon_url = f"{parsed_url.scheme}:{favicon_url}"
-                                elif favicon_url.startswith('/'):
-                                    favicon_url = f"{base_url}{favicon_url}"
-                                elif not favicon_url.startswith(('http://', 'https://')):
-                                    favicon_url = f"{base_url}/{favicon_url}"
-                                
-                                # Validate the URL format
-                                try:
-                                    parsed_favicon = urlparse(favicon_url)
-                                    if not parsed_favicon.netloc:
-                                        continue
-                                except:
-                                    continue
-                                
-                                # Check if favicon exists and is accessible
-                                try:
-                                    favicon_req = urllib.request.Request(favicon_url, headers=headers)
-                                    favicon_req.get_method = lambda: 'HEAD'
-                                    with urllib.request.urlopen(favicon_req, timeout=5, context=context) as favicon_response:
-                                        if favicon_response.status == 200:
-                                            # Check content type to ensure it's an image
-                                            content_type = favicon_response.headers.get('Content-Type', '')
-                                            if any(img_type in content_type.lower() for img_type in ['image/', 'application/octet-stream']):
-                                                print_success(f"Found valid favicon: {favicon_url}")
-                                                return favicon_url
-                                            else:
-                                                print_warning(f"Favicon URL returned non-image content: {content_type}")
-                                except Exception as e:
-                                    print_warning(f"Favicon check failed for {favicon_url}: {e}")
-                                    continue
-        except Exception as e:
-            print_warning(f"Error fetching HTML from {url}: {e}")
-        
-        # Try common favicon locations if no favicon found in HTML
-        favicon_locations = [
-            f"{base_url}/favicon.ico",
-            f"{base_url}/favicon.png",
-            f"{base_url}/apple-touch-icon.png",
-            f"{base_url}/apple-touch-icon-precomposed.png",
-            f"{base_url}/apple-touch-icon-120x120.png",
-            f"{base_url}/apple-touch-icon-152x152.png",
-            f"{base_url}/apple-touch-icon-180x180.png"
+        # (kind, url, future) in priority order; the page entry is replaced by its icons once fetched
+        page_future = executor.submit(fetch_page_icon_candidates, url, base_url, parsed_url.scheme, metadata, deadline_at)
+        candidates = [('page', url, page_future)] + [
+            ('common', f"{base_url}{path}", executor.submit(probe_favicon_candidate, 'common', f"{base_url}{path}", deadline_at))
+            for path in FAVICON_COMMON_PATHS
         ]
+        google_started = False
+        page_answered = False
         
-        print_info(f"Trying common favicon locations for {domain}...")
-        for favicon_url in favicon_locations:
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                req = urllib.request.Request(favicon_url, headers=headers)
-                req.get_method = lambda: 'HEAD'
-                with urllib.request.urlopen(req, timeout=5, context=ssl._create_unverified_context()) as response:
-                    if response.status == 200:
-                        content_type = response.headers.get('Content-Type', '')
-                        if any(img_type in content_type.lower() for img_type in ['image/', 'application/octet-stream']):
-                            print_success(f"Found favicon at common location: {favicon_url}")
-                            return favicon_url
-            except Exception as e:
-                print_warning(f"Failed to check {favicon_url}: {e}")
-                continue
-        
-        # Fallback to Google's favicon service (same as Svelte app)
-        google_favicon = f"https://www.google.com/s2/favicons?domain={domain}&sz=64"
-        print_info(f"Using Google favicon service as fallback: {google_favicon}")
-        
-        # Verify Google's service responds
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            req = urllib.request.Request(google_favicon, headers=headers)
-            req.get_method = lambda: 'HEAD'
-            with urllib.request.urlopen(req, timeout=5) as response:
-                if response.status == 200:
-                    print_success(f"Google favicon service is accessible: {google_favicon}")
-                    return google_favicon
-        except Exception as e:
-            print_warning(f"Google favicon service failed: {e}")
+            while True:
+                if page_future is not None and page_future.done():
+                    page_candidates = page_future.result()
+                    page_answered = page_candidates is not None
+                    html_candidates = [
+                        ('html', favicon_url, executor.submit(probe_favicon_candidate, 'html', favicon_url, deadline_at))
+                        for favicon_url in page_candidates or []
+                    ]
+                    candidates = html_candidates + candidates[1:]
+                    page_future = None
+                
+                # Stop at the first candidate still pending; anything before it has failed
+                for kind, favicon_url, future in candidates:
+                    if kind == 'page' or not future.done():
+                        break
+                    if future.result():
+                        return found_favicon(kind, favicon_url)
+                else:
+                    if google_started:
+                        break
+                    candidates.append(('google', google_favicon, executor.submit(probe_favicon_candidate, 'google', google_favicon, deadline_at)))
+                    google_started = True
+                    continue
+                
+                now = time.monotonic()
+                if now >= deadline_at:
+                    # Out of time: take the best candidate that has already been confirmed
+                    print_warning(f"Favicon deadline reached for {domain}", detail=True)
+                    for kind, favicon_url, future in candidates:
+                        if kind != 'page' and future.done() and future.result():
+                            return found_favicon(kind, favicon_url)
+                    break
+                if not google_started and now >= hedge_at:
+                    candidates.append(('google', google_favicon, executor.submit(probe_favicon_candidate, 'google', google_favicon, deadline_at)))
+                    google_started = True
+                
+                wake_at = deadline_at if google_started else min(deadline_at, hedge_at)
+                wait([future for _, _, future in candidates if not future.done()],
+                     timeout=max(0, wake_at - now), return_when=FIRST_COMPLETED)
+        finally:
+            # Probes that have not started yet are dropped; running ones stop by the deadline
+            for _, _, future in candidates:
+                future.cancel()
+            if page_future is not None:
+                page_future.cancel()
         
-        print_warning(f"No favicon found for {domain}")
+        answered = page_answered and all(
+            future.done() and not future.cancelled() and future.result() is not None
+            for _, _, future in candidates
+        )
+        if not answered:
+            print_warning(f"No favicon found for {domain} (some probes got no answer)", detail=True)
+            return None
+        print_warning(f"No favicon found for {domain}", detail=True)
         return ""
     
     except Exception as e:
-        print_error(f"Error fetching favicon for {url}: {e}")
-        return ""
+        print_error(f"Error fetching favicon for {url}: {e}", detail=True)
+        return None
+
+def found_favicon(kind, favicon_url):
+    if kind == 'html':
+        print_success(f"Found valid favicon: {favicon_url}", detail=True)
+    elif kind == 'common':
+        print_success(f"Found favicon at common location: {favicon_url}", detail=True)
+    else:
+        print_success(f"Google favicon service is accessible: {favicon_url}", detail=True)
+    return favicon_url
+
+# Persistent per-domain favicon cache backed by SQLite
+class FaviconCache:
+    """
+    Remembers the favicon resolved for each domain between runs. Hits and
+    misses (empty favicon) expire after separate TTLs, and the least recently
+    used domains are evicted once the cache grows past max_entries.
+    """
+    
+    def __init__(self, path, hit_ttl=30 * 86400, miss_ttl=86400, max_entries=10000):
+        self.path = path
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._domain_locks = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS favicons (
+                domain TEXT PRIMARY KEY,
+                favicon TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS favicons_last_used ON favicons (last_used)")
+        self._conn.commit()
+    
+    def domain_lock(self, domain):
+        """Lock that serializes lookups for one domain so it is only probed once"""
+        with self._lock:
+            return self._domain_locks.setdefault(domain, threading.Lock())
+    
+    def get(self, domain):
+        """Return the cached favicon ('' for a cached miss) or None if absent/expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT favicon, fetched_at FROM favicons WHERE domain = ?", (domain,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                METRICS.increment('favicon_cache_lookups', result='miss')
+                return None
+            favicon, fetched_at = row
+            ttl = self.hit_ttl if favicon else self.miss_ttl
+            if now - fetched_at > ttl:
+                self.misses += 1
+                METRICS.increment('favicon_cache_lookups', result='expired')
+                return None
+            self._conn.execute("UPDATE favicons SET last_used = ? WHERE domain = ?", (now, domain))
+            self._conn.commit()
+            self.hits += 1
+            METRICS.increment('favicon_cache_lookups', result='hit' if favicon else 'negative_hit')
+            return favicon
+    
+    def set(self, domain, favicon):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO favicons (domain, favicon, fetched_at, last_used) VALUES (?, ?, ?, ?)",
+                (domain, favicon or "", now, now)
+            )
+            # Evict least recently used domains beyond the size cap
+            self._conn.execute(
+                "DELETE FROM favicons WHERE domain IN ("
+                "SELECT domain FROM favicons ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Function to get a favicon through the per-domain cache when one is configured
+def cached_fetch_favicon(url, metadata=None):
+    """
+    Same as fetch_favicon() but consults FAVICON_CACHE before hitting the
+    network, and always returns a string ("" when nothing was found). Only
+    definite misses are cached; a lookup that failed for lack of an answer
+    is tried again for the next link. On a cache hit the page is still
+    fetched if metadata is wanted.
+    """
+    if FAVICON_CACHE is None:
+        return fetch_favicon(url, metadata=metadata) or ""
+    
+    full_url = url if url.startswith(('http://', 'https://')) else 'https://' + url
+    domain = (urlparse(full_url).hostname or "").lower()
+    if not domain:
+        return fetch_favicon(url, metadata=metadata) or ""
+    
+    with FAVICON_CACHE.domain_lock(domain):
+        favicon = FAVICON_CACHE.get(domain)
+        if favicon is None:
+            favicon = fetch_favicon(url, metadata=metadata)
+            if favicon is None:
+                METRICS.increment('favicon_lookup_errors')
+                return ""
+            FAVICON_CACHE.set(domain, favicon)
+            return favicon
+    print_info(f"Favicon cache hit for {domain}: {favicon or 'None'}", detail=True)
+    if metadata is not None:
+        fetch_page_metadata(full_url, metadata)
+    return favicon
+
+def fetch_page_metadata(url, metadata):
+    """Fill metadata from the page at url without probing any icons"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed_url = urlparse(url)
+    fetch_page_icon_candidates(url, f"{parsed_url.scheme}://{parsed_url.netloc}", parsed_url.scheme, metadata)
+
+# Filling in missing link names and descriptions (see --fill-metadata)
+FILL_METADATA = False  # Set in main()
+
+def has_placeholder_name(link):
+    """True when the link's name is empty or just its URL or host name"""
+    name = link.name.strip()
+    if not name:
+        return True
+    host = (urlparse(normalize_url(link.url)).hostname or '').lower()
+    return normalize_url(name) == normalize_url(link.url) or name.lower() in (host, host.removeprefix('www.'))
+
+def link_needs_metadata(link):
+    return has_placeholder_name(link) or not link.description.strip()
+
+def apply_link_metadata(link, metadata):
+    """
+    Replace a placeholder name and fill an empty description from page
+    metadata. The source values are kept in link.source_values so the
+    journal's field hashes still describe the source row (see
+    link_field_hashes()) and a later --sync does not see them as changed.
+    """
+    if metadata.get('title') and has_placeholder_name(link):
+        link.source_values = dict(link.source_values or {}, name=link.name)
+        link.name = metadata['title']
+        METRICS.increment('metadata_filled', field='name')
+    if metadata.get('description') and not link.description.strip():
+        link.source_values = dict(link.source_values or {}, description=link.description)
+        link.description = metadata['description']
+        METRICS.increment('metadata_filled', field='description')
+
+def fetch_link_favicon(link):
+    """
+    cached_fetch_favicon() for a link. With FILL_METADATA a placeholder name
+    or empty description is filled from the same page fetch.
+    """
+    metadata = {} if FILL_METADATA and link_needs_metadata(link) else None
+    favicon = cached_fetch_favicon(link.url, metadata)
+    if metadata:
+        apply_link_metadata(link, metadata)
+    return favicon
+
+def fill_link_metadata(link):
+    """Fetch only the page metadata for a link (used with --skip-favicons)"""
+    if FILL_METADATA and link_needs_metadata(link):
+        metadata = {}
+        fetch_page_metadata(link.url, metadata)
+        apply_link_metadata(link, metadata)
 
-# Function to parse the SQL file
-def parse_sql_file(file_path):
+# Self-hosted favicons: download once, dedupe by content, upload once (see --self-host-icons)
+ICON_COLLECTION = "icons"
+ICON_MAX_BYTES = 512 * 1024  # Larger downloads are not icons; the link keeps the external URL
+ICON_STORE = None  # IconStore, set in main() when --self-host-icons is given
+ICON_EXTENSIONS = {
+    'image/png': '.png',
+    'image/x-icon': '.ico',
+    'image/vnd.microsoft.icon': '.ico',
+    'image/svg+xml': '.svg',
+    'image/gif': '.gif',
+    'image/jpeg': '.jpg',
+    'image/webp': '.webp',
+}
+
+# Function to build a multipart/form-data body for a PocketBase file upload
+def encode_multipart(fields, files):
+    """
+    fields maps names to strings, files maps names to (filename, content_type,
+    data). Returns (body bytes, Content-Type header value).
+    """
+    boundary = 'linksync' + secrets.token_hex(16)
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8'))
+    for name, (filename, content_type, data) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode('utf-8') + data + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+# Function to download a favicon for self-hosting
+def download_icon(url):
+    """Return (data, content_type) for an image at url, or None if it is not one"""
+    def read_limited(response):
+        return response.read(ICON_MAX_BYTES + 1)
+    
+    with METRICS.timer('icon_download'):
+        status, headers, body, _ = get_fetch_scheduler().request(
+            'GET', url, PROBE_HEADERS, timeout=10, verify=False, body_reader=read_limited
+        )
+    content_type = headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if status != 200 or not body or len(body) > ICON_MAX_BYTES:
+        return None
+    if not content_type.startswith('image/'):
+        # Servers often send .ico files as octet-stream; PocketBase sniffs the real type
+        if content_type != 'application/octet-stream':
+            return None
+        content_type = 'image/x-icon'
+    return body, content_type
+
+class IconStore:
+    """
+    Uploads favicons to the icons collection so links point at one origin.
+    Each external favicon URL is downloaded once per run, identical bytes
+    (by SHA-256) are uploaded once ever, and every link using them gets the
+    URL of the shared PocketBase file. Concurrent lookups of the same URL or
+    content wait for the first one instead of repeating the work. When an
+    icon cannot be downloaded or uploaded the external URL is kept.
+    """
+    
+    def __init__(self, auth_token, base_url=None, collection=ICON_COLLECTION):
+        self.auth_token = auth_token
+        self.base_url = (base_url or POCKETBASE_URL).rstrip('/')
+        self.collection = collection
+        self.downloads = 0
+        self.uploads = 0
+        self.reused = 0
+        self._by_url = {}
+        self._by_hash = {}
+        self._lock = threading.Lock()
+    
+    def file_url(self, record):
+        return f"{self.base_url}/api/files/{self.collection}/{record['id']}/{record['file']}"
+    
+    def _claim(self, table, key):
+        """Return (future, owner); the owner computes the value, everyone else waits on it"""
+        with self._lock:
+            future = table.get(key)
+            if future is not None:
+                return future, False
+            future = table[key] = Future()
+            return future, True
+    
+    def _list(self, query):
+        path = f"/api/collections/{self.collection}/records?" + urllib.parse.urlencode(query)
+        _, body = pocketbase_request('GET', path, auth_token=self.auth_token)
+        return json.loads(body.decode('utf-8'))
+    
+    def load_existing(self, per_page=500):
+        """Index icons uploaded by earlier runs by hash; returns how many were found"""
+        page, total_pages = 1, 1
+        while page <= total_pages:
+            data = self._list({'fields': 'id,hash,file', 'perPage': per_page, 'page': page})
+            total_pages = data.get('totalPages', 1)
+            for record in data.get('items', []):
+                if record.get('hash') and record.get('file'):
+                    future = Future()
+                    future.set_result(self.file_url(record))
+                    self._by_hash.setdefault(record['hash'], future)
+            page += 1
+        return len(self._by_hash)
+    
+    def host(self, favicon_url):
+        """Return the self-hosted URL for favicon_url (or favicon_url itself on failure)"""
+        future, owner = self._claim(self._by_url, favicon_url)
+        if not owner:
+            return future.result()
+        local_url = favicon_url
+        try:
+            local_url = self._host(favicon_url)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            print_warning(f"Could not self-host favicon {favicon_url}: {e}", detail=True)
+        finally:
+            future.set_result(local_url)
+        return local_url
+    
+    def _host(self, favicon_url):
+        icon = download_icon(favicon_url)
+        with self._lock:
+            self.downloads += 1
+        if icon is None:
+            return favicon_url
+        data, content_type = icon
+        digest = hashlib.sha256(data).hexdigest()
+        
+        future, owner = self._claim(self._by_hash, digest)
+        if not owner:
+            with self._lock:
+                self.reused += 1
+            METRICS.increment('self_hosted_icons', result='reused')
+            return future.result()
+        local_url = favicon_url
+        try:
+            local_url = self._upload(digest, data, content_type)
+        finally:
+            future.set_result(local_url)
+        return local_url
+    
+    def _upload(self, digest, data, content_type):
+        filename = digest[:16] + ICON_EXTENSIONS.get(content_type, '.ico')
+        body, multipart_type = encode_multipart({'hash': digest}, {'file': (filename, content_type, data)})
+        path = f"/api/collections/{self.collection}/records"
+        try:
+            _, response = pocketbase_request('POST', path, body, self.auth_token, content_type=multipart_type)
+        except urllib.error.HTTPError as e:
+            if e.code != 400:
+                raise
+            # Another importer uploaded the same icon since load_existing()
+            existing = self._list({'filter': f'hash = "{digest}"', 'fields': 'id,hash,file', 'perPage': 1}).get('items')
+            if not existing:
+                raise
+            METRICS.increment('self_hosted_icons', result='reused')
+            return self.file_url(existing[0])
+        with self._lock:
+            self.uploads += 1
+        METRICS.increment('self_hosted_icons', result='uploaded')
+        return self.file_url(json.loads(response.decode('utf-8')))
+
+# Streaming SQL dump parsing
+SQL_READ_CHUNK_SIZE = 1024 * 1024
+SQL_MAX_TUPLE_SIZE = 4 * 1024 * 1024  # Larger unmatched tuples are treated as malformed
+LINKS_COLUMNS = ['id', 'url', 'name', 'description', 'tags', 'username', 'email', 'added_date', 'visibility', 'clicks']
+
+# Start of an INSERT statement for any table (group 1: table, group 2: column list, optional)
+SQL_INSERT_RE = re.compile(
+    r"INSERT\s+(?:IGNORE\s+)?INTO\s+`?(\w+)`?\s*(?:\(([^)]*)\))?\s*VALUES\s*",
+    re.IGNORECASE
+)
+# Body of an INSERT statement up to its ';', stepping over string literals (which
+# may contain ';' or 'INSERT INTO'); stops early at a string cut off by the text end
+SQL_STATEMENT_BODY_RE = re.compile(r"(?:[^';]+|'[^'\\]*(?:(?:\\.|'')[^'\\]*)*')*", re.DOTALL)
+# One complete row tuple followed by the ',' or ';' that terminates it
+SQL_VALUE_PATTERN = r"(?:'(?:[^'\\]|\\.|'')*'|[^,'()\s]+)"
+SQL_TUPLE_RE = re.compile(
+    r"\s*\((\s*(?:%s\s*(?:,\s*%s\s*)*)?)\)\s*([,;])" % (SQL_VALUE_PATTERN, SQL_VALUE_PATTERN),
+    re.DOTALL
+)
+# Where scanning resumes after a malformed tuple: the next row or the end of
+# the statement outside of string literals (matched strings are passed over)
+SQL_RESUME_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\)\s*,\s*(?=\()|;", re.DOTALL)
+# A single value inside a row tuple
+SQL_VALUE_RE = re.compile(r"\s*(%s)\s*,?" % SQL_VALUE_PATTERN, re.DOTALL)
+SQL_ESCAPE_RE = re.compile(r"\\(.)|''", re.DOTALL)
+SQL_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+def unescape_sql_string(value):
+    """Decode a MySQL/MariaDB string literal body (handles \\' and '' escapes)"""
+    if '\\' not in value and "''" not in value:
+        return value
+    return SQL_ESCAPE_RE.sub(
+        lambda m: "'" if m.group(1) is None else SQL_ESCAPES.get(m.group(1), m.group(1)),
+        value
+    )
+
+def split_sql_values(tuple_body):
+    """Split the inside of a row tuple into Python values (str, None or raw literal)"""
+    values = []
+    pos = 0
+    length = len(tuple_body)
+    while pos < length:
+        match = SQL_VALUE_RE.match(tuple_body, pos)
+        if not match or match.end() == pos:
+            break
+        token = match.group(1)
+        if token.startswith("'"):
+            values.append(unescape_sql_string(token[1:-1]))
+        elif token.upper() == 'NULL':
+            values.append(None)
+        else:
+            values.append(token)
+        pos = match.end()
+    return values
+
+def iter_sql_text_chunks(file_path, stats=None, chunk_size=None):
+    """
+    Yield the dump (gunzipped on the fly for .gz) as decoded text chunks of
+    about chunk_size bytes. If a stats dict is given, 'bytes_read' and
+    'total_bytes' are kept up to date.
+    """
+    chunk_size = chunk_size or SQL_READ_CHUNK_SIZE
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    raw, file = open_source_file(file_path)
+    with raw, file:
+        if stats is not None:
+            stats['total_bytes'] = os.fstat(raw.fileno()).st_size
+            stats['bytes_read'] = 0
+        while True:
+            chunk = file.read(chunk_size)
+            if stats is not None:
+                # Progress is measured on the file itself, compressed or not
+                stats['bytes_read'] = raw.tell()
+            if not chunk:
+                tail = decoder.decode(b'', final=True)
+                if tail:
+                    yield tail
+                return
+            yield decoder.decode(chunk)
+
+def find_sql_resume(text, pos):
+    """Match of the next row or statement boundary after pos, or None"""
+    for match in SQL_RESUME_RE.finditer(text, pos):
+        if not match.group().startswith("'"):
+            return match
+    return None
+
+def skip_sql_statement(text, pos, endpos=None):
+    """
+    Step over the rest of an INSERT statement's body from pos. Returns
+    (new_pos, ended): ended is True when its ';' was consumed; otherwise
+    new_pos is where more text is needed to continue.
+    """
+    pos = SQL_STATEMENT_BODY_RE.match(text, pos, len(text) if endpos is None else endpos).end()
+    if pos < len(text) and text[pos] == ';' and (endpos is None or pos < endpos):
+        return pos + 1, True
+    return pos, False
+
+def scan_sql_tuples(chunks, columns=None, stats=None, other_table=False):
+    """
+    Yield (columns, values) for every row of every INSERT INTO `links`
+    statement found in an iterable of text chunks. Pass the column list as
+    `columns` when the text starts in the middle of a links INSERT statement,
+    or other_table=True when it starts inside another table's INSERT (whose
+    rows are stepped over without looking inside their strings). Rows that
+    cannot be tokenized are skipped and counted in stats['skipped_rows']
+    when a stats dict is given.
+    """
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    eof = False
+    # columns is None while outside of a links INSERT statement
+    
+    while True:
+        if other_table:
+            pos, ended = skip_sql_statement(buffer, pos)
+            if ended:
+                other_table = False
+                continue
+            if eof:
+                return
+        elif columns is None:
+            match = SQL_INSERT_RE.search(buffer, pos)
+            if match:
+                if match.group(1).lower() == 'links':
+                    columns = parse_sql_columns(match.group(2))
+                else:
+                    other_table = True
+                pos = match.end()
+                continue
+            if eof:
+                return
+            # Keep a tail in case a statement header straddles the chunk boundary
+            pos = max(pos, len(buffer) - 512)
+        else:
+            match = SQL_TUPLE_RE.match(buffer, pos)
+            if match:
+                pos = match.end()
+                if match.group(2) == ';':
+                    current_columns, columns = columns, None
+                else:
+                    current_columns = columns
+                yield current_columns, split_sql_values(match.group(1))
+                continue
+            # The next tuple is incomplete (or malformed); read more before deciding.
+            # Give up on it at EOF or once far more data than any real row still
+            # does not match, and carry on from the next row or statement
+            if eof or len(buffer) - pos > SQL_MAX_TUPLE_SIZE:
+                resume = find_sql_resume(buffer, pos)
+                if resume or eof:
+                    if buffer[pos:].strip():
+                        print_warning(f"Skipping malformed row data near: {buffer[pos:pos + 80].strip()}")
+                        if stats is not None:
+                            stats['skipped_rows'] = stats.get('skipped_rows', 0) + 1
+                    if resume is None:
+                        return
+                    if resume.group() == ';':
+                        columns = None
+                    pos = resume.end()
+                    continue
+        
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer = buffer[pos:]
+        else:
+            buffer = buffer[pos:] + chunk
+        pos = 0
+
+def parse_sql_columns(column_list):
+    """Column names from an INSERT column list (the default layout when it is omitted)"""
+    if not column_list:
+        return LINKS_COLUMNS
+    return [c.strip().strip('`') for c in column_list.split(',')]
+
+def iter_sql_tuples(file_path, stats=None):
+    """
+    Yield (columns, values) for every row of every INSERT INTO `links` statement,
+    reading the dump in fixed-size chunks so memory does not grow with its size.
+    """
+    return scan_sql_tuples(iter_sql_text_chunks(file_path, stats), stats=stats)
+
+# Parallel parsing: the dump is cut into blocks at boundaries where no string
+# literal can be open and each block is tokenized in a worker process
+SQL_PARALLEL_BLOCK_SIZE = 4 * 1024 * 1024
+# phpMyAdmin writes one row per line and escapes newlines inside strings, so
+# "),<newline>(" only occurs between rows; ";<newline>INSERT" between statements
+SQL_ROW_BOUNDARIES = ('),\n(', '),\r\n(')
+SQL_STATEMENT_BOUNDARIES = (';\nINSERT', ';\r\nINSERT')
+
+def find_sql_block_cut(text):
+    """Return the offset of the last safe cut in text, or -1"""
+    best = -1
+    for marker in SQL_ROW_BOUNDARIES:
+        index = text.rfind(marker)
+        if index != -1:
+            best = max(best, index + len(marker) - 1)
+    for marker in SQL_STATEMENT_BOUNDARIES:
+        index = text.rfind(marker)
+        if index != -1:
+            best = max(best, index + len(marker) - len('INSERT'))
+    return best
+
+def follow_sql_statements(text, end, columns, other_table):
+    """
+    Return the (columns, other_table) state of scan_sql_tuples() at offset
+    end of text, given its state at the start. Statements are followed the
+    same way, so 'INSERT' inside a string literal is not taken for a header,
+    but rows are stepped over without being tokenized.
+    """
+    pos = 0
+    while pos < end:
+        if columns is not None or other_table:
+            pos, ended = skip_sql_statement(text, pos, end)
+            if not ended:
+                break
+            columns, other_table = None, False
+        else:
+            match = SQL_INSERT_RE.search(text, pos, end)
+            if not match:
+                break
+            if match.group(1).lower() == 'links':
+                columns = parse_sql_columns(match.group(2))
+            else:
+                other_table = True
+            pos = match.end()
+    return columns, other_table
+
+def iter_sql_blocks(file_path, stats=None):
+    """
+    Yield (text, columns, other_table) blocks of roughly SQL_PARALLEL_BLOCK_SIZE,
+    cut only between rows or statements, with the scanner state at the start
+    of each block: columns is the links column list when the block starts
+    inside a links INSERT statement, and other_table is True when it starts
+    inside another table's.
+    """
+    columns = None
+    other_table = False
+    carry = ''
+    for chunk in iter_sql_text_chunks(file_path, stats, SQL_PARALLEL_BLOCK_SIZE):
+        text = carry + chunk
+        cut = find_sql_block_cut(text)
+        if cut <= 0:
+            carry = text
+            continue
+        
+        yield text[:cut], columns, other_table
+        columns, other_table = follow_sql_statements(text, cut, columns, other_table)
+        carry = text[cut:]
+    
+    if carry:
+        yield carry, columns, other_table
+
+def parse_sql_block(text, columns, other_table=False):
+    """
+    Process-pool worker: tokenize one block and return it in a compact form,
+    (segments, skipped_rows) where segments is a list of (columns, flat_values)
+    with len(columns) values per row, instead of a list of per-row dicts.
+    """
+    segments = []
+    segment_columns = None
+    flat_values = None
+    stats = {'skipped_rows': 0}
+    for row_columns, values in scan_sql_tuples([text], columns, stats, other_table):
+        if len(values) != len(row_columns):
+            print_warning(f"Skipping row with {len(values)} values (expected {len(row_columns)})", detail=True)
+            stats['skipped_rows'] += 1
+            continue
+        if row_columns != segment_columns:
+            segment_columns = row_columns
+            flat_values = []
+            segments.append((tuple(row_columns), flat_values))
+        flat_values.extend(values)
+    LOG.flush()
+    return segments, stats['skipped_rows']
+
+def init_parse_worker(log_format):
+    """Process-pool initializer: start with an empty log buffer rather than a copy of the parent's"""
+    global LOG
+    LOG = Logger(log_format)
+
+def iter_sql_tuples_parallel(file_path, stats=None, workers=2, ordered=True):
+    """
+    Same rows as iter_sql_tuples(), tokenized by `workers` processes. Blocks
+    are yielded in file order unless ordered is False, in which case each
+    block's rows are yielded as soon as it is parsed. At most 2 * workers
+    blocks are in flight so memory stays bounded.
+    """
+    window = workers * 2
+    blocks = iter_sql_blocks(file_path, stats)
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_parse_worker, initargs=(LOG.format,))
+    try:
+        pending = deque()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                block = next(blocks, None)
+                if block is None:
+                    exhausted = True
+                    break
+                pending.append(executor.submit(parse_sql_block, *block))
+            if not pending:
+                return
+            
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(f for f in pending if f in done)
+                pending.remove(future)
+            
+            segments, skipped_rows = future.result()
+            if skipped_rows and stats is not None:
+                stats['skipped_rows'] = stats.get('skipped_rows', 0) + skipped_rows
+            for columns, flat_values in segments:
+                width = len(columns)
+                for i in range(0, len(flat_values), width):
+                    yield columns, flat_values[i:i + width]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def parse_sql_file(file_path, stats=None, workers=1, ordered=True):
+    """
+    Lazily yield LinkRecords from every `links` INSERT statement in a SQL dump.
+    Rows are produced as the file is read, so any number of statements and
+    arbitrarily large dumps can be processed with flat memory use. With
+    workers > 1 the dump is tokenized in a process pool; ordered=False lets
+    rows from blocks that finish early come out first.
+    """
     print_info(f"Reading SQL file: {file_path}")
+    count = 0
+    last_columns = None
+    # Time spent producing each row (reading, tokenizing, building the dict)
+    started = time.perf_counter()
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            sql_content = file.read()
+        if workers > 1:
+            rows = iter_sql_tuples_parallel(file_path, stats, workers, ordered)
+        else:
+            rows = iter_sql_tuples(file_path, stats)
+        for columns, values in rows:
+            if len(values) != len(columns):
+                print_warning(f"Skipping row with {len(values)} values (expected {len(columns)})", detail=True)
+                if stats is not None:
+                    stats['skipped_rows'] = stats.get('skipped_rows', 0) + 1
+                continue
+            if columns is not last_columns:
+                # Column positions only change between INSERT statements
+                last_columns = columns
+                index = {SOURCE_COLUMN_ALIASES.get(column, column): i for i, column in enumerate(columns)}
+                positions = [index.get(column) for column in LINKS_COLUMNS]
+            count += 1
+            link = link_from_values(values, positions)
+            METRICS.observe('sql_parse', time.perf_counter() - started)
+            yield link
+            started = time.perf_counter()
     except FileNotFoundError:
         print_error(f"File not found: {file_path}")
-        return []
+        return
     except Exception as e:
         print_error(f"Error reading file: {e}")
-        return []
+        return
     
-    # Extract INSERT statements
-    insert_pattern = r"INSERT INTO `links` \(`id`, `url`, `name`, `description`, `tags`, `username`, `email`, `added_date`, `visibility`, `clicks`\) VALUES\s*([^;]+);"
-    insert_match = re.search(insert_pattern, sql_content, re.DOTALL)
+    if stats is not None:
+        # Only when every row was read are rows missing from the dump really removed
+        stats['complete'] = not stats.get('skipped_rows')
+    if count:
+        print_success(f"Successfully parsed {count} links from SQL file")
+    else:
+        print_warning("No link entries found in the SQL file.")
+
+# Other input formats. Every reader takes (file_path, stats=None), yields the
+# same LinkRecords as parse_sql_file() and keeps stats['bytes_read'] /
+# stats['total_bytes'] / stats['skipped_rows'] / stats['complete'] up to
+# date like it does.
+SOURCE_STATS_EVERY = 1000
+# Column names other exports use for the links table fields
+SOURCE_COLUMN_ALIASES = {'title': 'name', 'link': 'url', 'href': 'url', 'note': 'description', 'notes': 'description'}
+
+def open_source_file(file_path):
+    """
+    Return (raw, stream): the underlying file, for progress, and a binary
+    stream over its contents, decompressed on the fly for .gz files.
+    """
+    raw = open(file_path, 'rb')
+    if file_path.lower().endswith('.gz'):
+        return raw, gzip.GzipFile(fileobj=raw, mode='rb')
+    return raw, raw
+
+class Visibility(str, Enum):
+    """Link visibility; every record shares these members instead of holding its own string"""
+    PUBLIC = 'public'
+    PRIVATE = 'private'
     
-    if not insert_match:
-        print_warning("No INSERT statements found in the SQL file.")
-        return []
+    def __str__(self):
+        return self.value
     
-    values_content = insert_match.group(1)
+    @classmethod
+    def parse(cls, value):
+        """Map a source value to a member; empty means public, unknown values are kept (interned)"""
+        if not value:
+            return cls.PUBLIC
+        try:
+            return cls(value)
+        except ValueError:
+            return sys.intern(str(value))
+
+class LinkRecord:
+    """
+    One source row. Fixed __slots__ instead of a per-row dict, tags as a
+    tuple of interned strings so the tag vocabulary is stored once for all
+    rows, and visibility as a Visibility member. added_date is kept as the
+    source string. The API payload is only built at write time (see
+    build_link_payload()); record_id is filled in once the link is created.
+    source_values holds the source name/description of fields replaced by
+    --fill-metadata (None when nothing was filled).
+    """
     
-    # Extract individual rows
-    rows_pattern = r"\((\d+),\s*'([^']*)',\s*'([^']*)',\s*'([^']*)',\s*'([^']*)',\s*([^,]*),\s*([^,]*),\s*'([^']*)',\s*'([^']*)',\s*(\d+)\)"
-    rows = re.findall(rows_pattern, values_content)
+    __slots__ = ('original_id', 'url', 'name', 'description', 'tags', 'username', 'email',
+                 'added_date', 'visibility', 'clicks', 'record_id', 'source_values')
     
-    if not rows:
-        print_warning("No link entries found in the SQL file.")
-        return []
-    
-    links = []
-    for row in rows:
-        id_val, url, name, description, tags_str, username, email, added_date, visibility, clicks = row
-        
-        # Convert tags string to array
-        tags = [tag.strip() for tag in tags_str.split(',')]
-        
-        links.append({
-            'original_id': id_val,
-            'url': url,
-            'name': name,
-            'description': description,
-            'tags': tags,
-            'username': None if username == 'NULL' else username.strip("'"),
-            'email': None if email == 'NULL' else email.strip("'"),
-            'added_date': added_date,
-            'visibility': visibility,
-            'clicks': int(clicks)
-        })
-    
-    print_success(f"Successfully parsed {len(links)} links from SQL file")
-    return links
+    def __init__(self, original_id, url, name, description, tags, username=None, email=None,
+                 added_date=None, visibility=Visibility.PUBLIC, clicks=0):
+        self.original_id = original_id
+        self.url = url
+        self.name = name
+        self.description = description
+        self.tags = tags
+        self.username = username
+        self.email = email
+        self.added_date = added_date
+        self.visibility = visibility
+        self.clicks = clicks
+        self.record_id = ''
+        self.source_values = None
+    
+    @classmethod
+    def from_source(cls, original_id, url, name, description, tags, username=None, email=None,
+                    added_date=None, visibility=None, clicks=None):
+        """Normalize raw source values (None/'' defaults, tag splitting, click count)"""
+        if tags and isinstance(tags, (list, tuple)):
+            tags = tuple(sys.intern(str(tag)) for tag in tags)
+        else:
+            # Convert tags string to a tuple of shared strings
+            tags = tuple(sys.intern(tag.strip()) for tag in str(tags or '').split(','))
+        try:
+            clicks = int(clicks or 0)
+        except (TypeError, ValueError):
+            clicks = 0
+        return cls(original_id, url or '', name or '', description or '', tags, username, email,
+                   added_date, Visibility.parse(visibility), clicks)
+    
+    def __repr__(self):
+        return f"LinkRecord(original_id={self.original_id!r}, url={self.url!r}, name={self.name!r})"
 
-# Function to get Chrome's localStorage data
-def get_chrome_localStorage():
-    """Get localStorage data from Chrome's Local Storage leveldb"""
+def link_from_row(row, default_id=None):
+    """Build a LinkRecord from a source row keyed by links column names"""
+    row = {SOURCE_COLUMN_ALIASES.get(key, key): value for key, value in row.items()}
+    return LinkRecord.from_source(
+        row.get('id', default_id), row.get('url'), row.get('name'), row.get('description'),
+        row.get('tags'), row.get('username'), row.get('email'), row.get('added_date'),
+        row.get('visibility'), row.get('clicks')
+    )
+
+def link_from_values(values, positions):
+    """Build a LinkRecord from a row tuple; positions maps each LINKS_COLUMNS entry to its index (or None)"""
+    return LinkRecord.from_source(*[values[i] if i is not None else None for i in positions])
+
+def iter_source_lines(file_path, stats=None):
+    """Yield (line_number, text line) from a possibly gzipped UTF-8 file, tracking progress in stats"""
+    raw, stream = open_source_file(file_path)
+    with raw, stream:
+        if stats is not None:
+            stats['total_bytes'] = os.fstat(raw.fileno()).st_size
+            stats['bytes_read'] = 0
+        text = io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='')
+        for line_number, line in enumerate(text, 1):
+            if stats is not None and line_number % SOURCE_STATS_EVERY == 0:
+                stats['bytes_read'] = raw.tell()
+            yield line_number, line
+        if stats is not None:
+            stats['bytes_read'] = stats['total_bytes']
+
+def read_source_rows(file_path, stats, label, rows):
+    """Shared wrapper for the non-SQL readers: metrics, error handling and the summary line"""
+    print_info(f"Reading {label} file: {file_path}")
+    count = 0
+    started = time.perf_counter()
     try:
-        # Chrome's localStorage path on Windows
-        chrome_user_data = os.path.expanduser(r'~\AppData\Local\Google\Chrome\User Data\Default')
-        local_storage_path = os.path.join(chrome_user_data, 'Local Storage', 'leveldb')
-        
-        if not os.path.exists(local_storage_path):
-            print_warning("Chrome localStorage path not found")
-            return None
-        
-        print_info(f"Looking for localStorage data in: {local_storage_path}")
-        
-        # Try to find localStorage files
-        import glob
-        ldb_files = glob.glob(os.path.join(local_storage_path, '*.ldb'))
-        
-        if not ldb_files:
-            print_warning("No .ldb files found in Chrome localStorage")
-            return None
-        
-        # Search for our auth key in the files
-        auth_key = "pocketbase_auth_v2"
-        localhost_key = f"_http://localhost:8090\x00\x01{auth_key}"
-        
-        for ldb_file in ldb_files:
+        for link in rows:
+            count += 1
+            METRICS.observe('source_parse', time.perf_counter() - started)
+            yield link
+            started = time.perf_counter()
+    except FileNotFoundError:
+        print_error(f"File not found: {file_path}")
+        return
+    except Exception as e:
+        print_error(f"Error reading file: {e}")
+        return
+    
+    if stats is not None:
+        stats['complete'] = not stats.get('skipped_rows')
+    if count:
+        print_success(f"Successfully parsed {count} links from {label} file {file_path}")
+    else:
+        print_warning(f"No link entries found in {file_path}.")
+
+def parse_csv_file(file_path, stats=None):
+    """Lazily yield LinkRecords from a CSV export whose header names the links columns"""
+    def rows():
+        reader = csv.DictReader(line for _, line in iter_source_lines(file_path, stats))
+        for row_number, row in enumerate(reader, 1):
+            row = {(key or '').strip().lower(): value for key, value in row.items()}
+            yield link_from_row(row, default_id=row_number)
+    return read_source_rows(file_path, stats, 'CSV', rows())
+
+def parse_jsonl_file(file_path, stats=None):
+    """Lazily yield LinkRecords from a JSON Lines export (one object per line)"""
+    def rows():
+        for line_number, line in iter_source_lines(file_path, stats):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                print_warning(f"Skipping invalid JSON on line {line_number}: {e}", detail=True)
+                if stats is not None:
+                    stats['skipped_rows'] = stats.get('skipped_rows', 0) + 1
+                continue
+            if isinstance(row, dict):
+                yield link_from_row(row, default_id=line_number)
+    return read_source_rows(file_path, stats, 'JSONL', rows())
+
+class BookmarkParser(HTMLParser):
+    """
+    Incremental parser for the Netscape bookmark HTML that browsers export.
+    Finished bookmarks collect in `links`; a bookmark's tags are its TAGS
+    attribute or else the folders it is in, and a following <DD> is its
+    description.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.count = 0
+        self._folders = []
+        self._folder_title = None
+        self._in_folder_title = False
+        self._current = None
+        self._text = []
+        self._in_description = False
+    
+    def _finish_current(self):
+        if self._current is not None:
+            if self._in_description:
+                self._current['description'] = ''.join(self._text).strip()
+            self.links.append(link_from_row(self._current))
+        self._current = None
+        self._in_description = False
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._finish_current()
+            attrs = dict(attrs)
+            self.count += 1
+            tags = attrs.get('tags') or [folder for folder in self._folders if folder]
+            added = attrs.get('add_date')
+            try:
+                added = datetime.fromtimestamp(int(added), timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if added else None
+            except (ValueError, OverflowError, OSError):
+                added = None
+            self._current = {'id': self.count, 'url': attrs.get('href') or '', 'tags': tags, 'added_date': added}
+            self._text = []
+        elif tag == 'h3':
+            self._finish_current()
+            self._in_folder_title = True
+            self._text = []
+        elif tag == 'dd' and self._current is not None:
+            self._in_description = True
+            self._text = []
+        elif tag in ('dt', 'dl'):
+            self._finish_current()
+            if tag == 'dl':
+                self._folders.append(self._folder_title)
+                self._folder_title = None
+    
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._current is not None:
+            self._current['name'] = ''.join(self._text).strip() or self._current['url']
+            self._text = []
+        elif tag == 'h3':
+            self._folder_title = ''.join(self._text).strip()
+            self._in_folder_title = False
+        elif tag == 'dl':
+            self._finish_current()
+            if self._folders:
+                self._folders.pop()
+    
+    def handle_data(self, data):
+        self._text.append(data)
+    
+    def close(self):
+        super().close()
+        self._finish_current()
+
+def parse_bookmarks_file(file_path, stats=None):
+    """Lazily yield LinkRecords from a browser bookmark export (Netscape bookmark HTML)"""
+    def rows():
+        parser = BookmarkParser()
+        for _, line in iter_source_lines(file_path, stats):
+            parser.feed(line)
+            yield from parser.links
+            parser.links.clear()
+        parser.close()
+        yield from parser.links
+    return read_source_rows(file_path, stats, 'bookmark', rows())
+
+# Readers by file extension (a trailing .gz is allowed on any of them)
+SOURCE_READERS = {
+    '.sql': parse_sql_file,
+    '.csv': parse_csv_file,
+    '.jsonl': parse_jsonl_file,
+    '.ndjson': parse_jsonl_file,
+    '.html': parse_bookmarks_file,
+    '.htm': parse_bookmarks_file,
+}
+
+def get_source_reader(file_path):
+    name = file_path[:-3] if file_path.lower().endswith('.gz') else file_path
+    return SOURCE_READERS.get(os.path.splitext(name)[1].lower())
+
+def expand_input_patterns(patterns):
+    """Expand glob patterns into a sorted, de-duplicated list of paths (plain paths are kept as given)"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print_warning(f"No files match {pattern}")
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+def source_name(file_path):
+    """
+    Name that keys an input's rows in the journal: its file name without a
+    .gz suffix, so it does not depend on the working directory, how the
+    path was spelled or globbed, or on compression
+    """
+    name = os.path.basename(file_path)
+    return name[:-3] if name.lower().endswith('.gz') else name
+
+def source_row_prefixes(paths):
+    """Journal key prefixes of the rows that come from paths"""
+    return tuple(f"{source_name(path)}:" for path in paths)
+
+def read_source(file_path, stats=None, parse_workers=1, ordered=True):
+    """Yield LinkRecords from one input with the reader for its format"""
+    reader = get_source_reader(file_path)
+    if reader is parse_sql_file:
+        return parse_sql_file(file_path, stats, parse_workers, ordered)
+    return reader(file_path, stats)
+
+# Function to read several inputs into a single stream of links
+def iter_sources(paths, stats_list, workers=1, parse_workers=1, ordered=True, queue_size=1000):
+    """
+    Yield LinkRecords from every path, filling stats_list[i] for paths[i].
+    Original ids are prefixed with source_name() of their file so they stay
+    unique and stable in the journal, and up to `workers` files are read at
+    once by background threads feeding a bounded queue (gzip decompression
+    and file IO overlap; rows from different files interleave).
+    """
+    def tagged(index):
+        path = paths[index]
+        prefix = f"{source_name(path)}:"
+        for link in read_source(path, stats_list[index], parse_workers, ordered):
+            link.original_id = f"{prefix}{link.original_id}"
+            yield link
+    
+    if workers <= 1 or len(paths) == 1:
+        for index in range(len(paths)):
+            yield from tagged(index)
+        return
+    
+    next_index = itertools.count()
+    
+    def read_remaining_files():
+        # Each thread takes the next unread file until none are left
+        for index in next_index:
+            if index >= len(paths):
+                return
             try:
-                with open(ldb_file, 'rb') as f:
-                    content = f.read()
-                    
-                # Look for our key in the binary data
-                if localhost_key.encode() in content:
-                    # Found our key, now try to extract the JSON data
-                    start_idx = content.find(localhost_key.encode())
-                    if start_idx != -1:
-                        # Look for JSON data after the key
-                        json_start = content.find(b'{', start_idx)
-                        if json_start != -1:
-                            # Find the end of JSON (this is tricky with binary data)
-                            brace_count = 0
-                            json_end = json_start
-                            for i in range(json_start, len(content)):
-                                if content[i:i+1] == b'{':
-                                    brace_count += 1
-                                elif content[i:i+1] == b'}':
-                                    brace_count -= 1
-                                    if brace_count == 0:
-                                        json_end = i + 1
-                                        break
-                            
-                            try:
-                                json_data = content[json_start:json_end].decode('utf-8')
-                                auth_data = json.loads(json_data)
-                                print_success("Found authentication data in Chrome localStorage")
-                                return auth_data
-                            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                                print_warning(f"Failed to parse JSON from localStorage: {e}")
-                                continue
+                yield from tagged(index)
             except Exception as e:
-                print_warning(f"Error reading {ldb_file}: {e}")
+                print_error(f"Error reading {paths[index]}: {e}")
+    
+    yield from iter_buffered([read_remaining_files] * min(workers, len(paths)), queue_size, 'read')
+
+# Chrome keeps localStorage in a LevelDB database inside each browser profile
+CHROME_PROFILE_DIRS = [
+    r'~\AppData\Local\Google\Chrome\User Data\Default',
+    r'~\AppData\Local\Chromium\User Data\Default',
+    '~/Library/Application Support/Google/Chrome/Default',
+    '~/Library/Application Support/Chromium/Default',
+    '~/.config/google-chrome/Default',
+    '~/.config/chromium/Default',
+    '~/snap/chromium/common/chromium/Default',
+]
+LOCAL_STORAGE_ORIGIN = 'http://localhost:8090'
+LOCAL_STORAGE_AUTH_KEY = 'pocketbase_auth_v2'
+
+LEVELDB_LOG_BLOCK_SIZE = 32 * 1024
+LEVELDB_LOG_HEADER_SIZE = 7  # crc32c (4), length (2), record type (1)
+LEVELDB_FULL, LEVELDB_FIRST, LEVELDB_MIDDLE, LEVELDB_LAST = 1, 2, 3, 4
+LEVELDB_TYPE_DELETION, LEVELDB_TYPE_VALUE = 0, 1
+LEVELDB_TABLE_MAGIC = (0xdb4775248b80fb57).to_bytes(8, 'little')
+LEVELDB_FOOTER_SIZE = 48
+
+def read_varint(data, pos):
+    """Decode a LevelDB/protobuf varint at pos, returning (value, new_pos)"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("varint too long")
+
+def snappy_decompress(data):
+    """Decompress a raw snappy block (used by Chrome for LevelDB table blocks)"""
+    length, pos = read_varint(data, 0)
+    out = bytearray()
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        kind = tag & 3
+        if kind == 0:
+            # Literal run; lengths over 60 are stored in the following 1-4 bytes
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos:pos + extra], 'little')
+                pos += extra
+            size += 1
+            out += data[pos:pos + size]
+            pos += size
+            continue
+        if kind == 1:
+            size = ((tag >> 2) & 7) + 4
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif kind == 2:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 2], 'little')
+            pos += 2
+        else:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 4], 'little')
+            pos += 4
+        if offset == 0 or offset > len(out):
+            raise ValueError("invalid snappy copy offset")
+        start = len(out) - offset
+        if size <= offset:
+            out += out[start:start + size]
+        else:
+            # Overlapping copy repeats the last `offset` bytes
+            for i in range(size):
+                out.append(out[start + i])
+    if len(out) != length:
+        raise ValueError("snappy length mismatch")
+    return bytes(out)
+
+def iter_leveldb_log_records(data):
+    """
+    Yield the reassembled records of a LevelDB write-ahead log (.log). Records
+    are framed in 32KiB blocks and may be split into FIRST/MIDDLE/LAST
+    fragments. Checksums are not verified; torn tails are dropped.
+    """
+    size = len(data)
+    pos = 0
+    fragments = None
+    while pos + LEVELDB_LOG_HEADER_SIZE <= size:
+        block_left = LEVELDB_LOG_BLOCK_SIZE - pos % LEVELDB_LOG_BLOCK_SIZE
+        if block_left < LEVELDB_LOG_HEADER_SIZE:
+            # Trailer too small for a header is zero padding
+            pos += block_left
+            continue
+        length = int.from_bytes(data[pos + 4:pos + 6], 'little')
+        record_type = data[pos + 6]
+        start = pos + LEVELDB_LOG_HEADER_SIZE
+        if record_type == 0 or start + length > size:
+            # Preallocated (zeroed) space or a torn write: skip the rest of the block
+            pos += block_left
+            fragments = None
+            continue
+        pos = start + length
+        fragment = data[start:pos]
+        if record_type == LEVELDB_FULL:
+            fragments = None
+            yield fragment
+        elif record_type == LEVELDB_FIRST:
+            fragments = [fragment]
+        elif record_type == LEVELDB_MIDDLE and fragments is not None:
+            fragments.append(fragment)
+        elif record_type == LEVELDB_LAST and fragments is not None:
+            fragments.append(fragment)
+            yield b''.join(fragments)
+            fragments = None
+
+def iter_leveldb_log_entries(data, user_key):
+    """Yield (sequence, type, value) for user_key from the write batches of a .log file"""
+    for record in iter_leveldb_log_records(data):
+        # Only decode batches that mention the key at all
+        if len(record) < 12 or record.find(user_key) == -1:
+            continue
+        sequence = int.from_bytes(record[:8], 'little')
+        count = int.from_bytes(record[8:12], 'little')
+        pos = 12
+        for i in range(count):
+            value_type = record[pos]
+            key_length, pos = read_varint(record, pos + 1)
+            key = record[pos:pos + key_length]
+            pos += key_length
+            value = None
+            if value_type == LEVELDB_TYPE_VALUE:
+                value_length, pos = read_varint(record, pos)
+                value = record[pos:pos + value_length]
+                pos += value_length
+            if key == user_key:
+                yield sequence + i, value_type, value
+
+def read_leveldb_block(data, handle):
+    """Read the table block at an encoded (offset, size) handle, decompressing if needed"""
+    offset, pos = read_varint(handle, 0)
+    size, _ = read_varint(handle, pos)
+    block = data[offset:offset + size]
+    compression = data[offset + size]
+    if compression == 0:
+        return block
+    if compression == 1:
+        return snappy_decompress(block)
+    raise ValueError(f"unsupported block compression {compression}")
+
+def iter_leveldb_block(block):
+    """Yield (key, value) from a table block (prefix-compressed keys, restart array at the end)"""
+    restarts = int.from_bytes(block[-4:], 'little')
+    end = len(block) - 4 - 4 * restarts
+    pos = 0
+    key = b''
+    while pos < end:
+        shared, pos = read_varint(block, pos)
+        non_shared, pos = read_varint(block, pos)
+        value_length, pos = read_varint(block, pos)
+        key = key[:shared] + block[pos:pos + non_shared]
+        pos += non_shared
+        yield key, block[pos:pos + value_length]
+        pos += value_length
+
+def iter_leveldb_table_entries(data, user_key):
+    """
+    Yield (sequence, type, value) for user_key from a table file (.ldb/.sst).
+    The index block is used to jump straight to the data block that can hold
+    the key instead of decoding the whole table.
+    """
+    if len(data) < LEVELDB_FOOTER_SIZE:
+        return
+    footer = data[-LEVELDB_FOOTER_SIZE:]
+    if footer[-8:] != LEVELDB_TABLE_MAGIC:
+        raise ValueError("not a LevelDB table")
+    # Footer: metaindex handle, index handle, padding, magic
+    _, pos = read_varint(footer, 0)
+    _, pos = read_varint(footer, pos)
+    index_handle = footer[pos:]
+    
+    # Index entries map a separator key (>= every key in the block) to its block
+    for separator, block_handle in iter_leveldb_block(read_leveldb_block(data, index_handle)):
+        if separator[:-8] < user_key:
+            continue
+        for internal_key, value in iter_leveldb_block(read_leveldb_block(data, block_handle)):
+            key = internal_key[:-8]
+            if key < user_key:
                 continue
+            if key > user_key:
+                return
+            # Internal keys end with (sequence << 8 | type), little-endian
+            tag = int.from_bytes(internal_key[-8:], 'little')
+            yield tag >> 8, tag & 0xff, value
+
+def find_leveldb_value(db_path, user_key):
+    """
+    Return the newest value stored for user_key in a LevelDB directory, or
+    None if it is missing or was deleted. Files are memory-mapped; the entry
+    with the highest sequence number across all logs and tables wins.
+    """
+    newest_sequence, newest_type, newest_value = -1, LEVELDB_TYPE_DELETION, None
+    paths = glob.glob(os.path.join(db_path, '*.log'))
+    paths += glob.glob(os.path.join(db_path, '*.ldb')) + glob.glob(os.path.join(db_path, '*.sst'))
+    
+    for path in sorted(paths):
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if path.endswith('.log'):
+                        entries = iter_leveldb_log_entries(data, user_key)
+                    else:
+                        entries = iter_leveldb_table_entries(data, user_key)
+                    for sequence, value_type, value in entries:
+                        if sequence > newest_sequence:
+                            newest_sequence, newest_type, newest_value = sequence, value_type, value
+        except (OSError, ValueError, IndexError) as e:
+            print_warning(f"Error reading {path}: {e}")
+    
+    return newest_value if newest_type == LEVELDB_TYPE_VALUE else None
+
+def decode_local_storage_value(value):
+    """Chrome prefixes localStorage values with 0 (UTF-16LE) or 1 (Latin-1)"""
+    if value[:1] == b'\x00':
+        return value[1:].decode('utf-16-le')
+    if value[:1] == b'\x01':
+        return value[1:].decode('latin-1')
+    return value.decode('utf-8')
+
+# Function to get Chrome's localStorage data
+def get_chrome_localStorage(profile_dirs=None):
+    """
+    Get localStorage data from Chrome's Local Storage leveldb. profile_dirs
+    overrides the default Chrome/Chromium profile locations; each entry may
+    be a profile directory or a leveldb directory itself.
+    """
+    if not profile_dirs:
+        profile_dirs = [os.path.expanduser(p) for p in CHROME_PROFILE_DIRS]
+    user_key = f"_{LOCAL_STORAGE_ORIGIN}\x00\x01{LOCAL_STORAGE_AUTH_KEY}".encode()
+    
+    found_storage = False
+    for profile_dir in profile_dirs:
+        local_storage_path = os.path.join(profile_dir, 'Local Storage', 'leveldb')
+        if not os.path.isdir(local_storage_path):
+            local_storage_path = profile_dir
+        if not glob.glob(os.path.join(local_storage_path, '*.l[do][bg]')):
+            continue
+        found_storage = True
         
-        print_warning("Authentication data not found in Chrome localStorage")
-        return None
+        print_info(f"Looking for localStorage data in: {local_storage_path}")
+        value = find_leveldb_value(local_storage_path, user_key)
+        if value is None:
+            continue
         
-    except Exception as e:
-        print_error(f"Error accessing Chrome localStorage: {e}")
-        return None
+        try:
+            auth_data = json.loads(decode_local_storage_value(value))
+            print_success("Found authentication data in Chrome localStorage")
+            return auth_data
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print_warning(f"Failed to parse JSON from localStorage: {e}")
+    
+    if not found_storage:
+        print_warning("Chrome localStorage path not found")
+    else:
+        print_warning("Authentication data not found in Chrome localStorage")
+    return None
 
 # Alternative method: Manual token input
 def get_manual_token():
@@ -349,6 +2231,7 @@ def get_manual_token():
     print_info("6. Copy the entire JSON value OR just the token value")
     
     try:
+        LOG.flush()
         token_input = input("\nPaste the authentication data here: ").strip()
         if not token_input:
             return None
@@ -416,12 +2299,12 @@ def get_manual_token():
         return None
 
 # Function to get browser authentication
-def get_browser_auth():
+def get_browser_auth(profile_dirs=None):
     """Get authentication token from browser localStorage"""
     print_info("Attempting to get authentication from browser...")
     
     # First try Chrome localStorage
-    auth_data = get_chrome_localStorage()
+    auth_data = get_chrome_localStorage(profile_dirs)
     
     if not auth_data:
         print_warning("Could not automatically extract authentication from browser")
@@ -431,190 +2314,1612 @@ def get_browser_auth():
     if not auth_data:
         return None, None
     
-    # Validate token structure
-    if 'token' not in auth_data or ('model' not in auth_data and 'record' not in auth_data):
-        print_error("Invalid authentication data structure")
-        return None, None
+    # Validate token structure
+    if 'token' not in auth_data or ('model' not in auth_data and 'record' not in auth_data):
+        print_error("Invalid authentication data structure")
+        return None, None
+    
+    # Normalize the structure - some versions use 'record' instead of 'model'
+    if 'record' in auth_data and 'model' not in auth_data:
+        auth_data['model'] = auth_data['record']
+    
+    # Check if token is expired
+    try:
+        token = auth_data['token']
+        payload = decode_jwt_payload(token)
+        if payload and payload.get('exp', 0) < int(time.time()):
+            print_error("Authentication token is expired. Please log in again in the browser.")
+            return None, None
+        
+        user_model = auth_data.get('model', {})
+        if isinstance(user_model, dict):
+            user_id = user_model.get('id')
+            user_email = user_model.get('email', 'Unknown')
+        else:
+            print_error("Invalid user model structure")
+            return None, None
+        
+        if not user_id:
+            print_error("User ID not found in authentication data")
+            return None, None
+            
+        print_success(f"Using authentication for user: {user_email} (ID: {user_id})")
+        
+        return token, user_id
+        
+    except Exception as e:
+        print_error(f"Error validating token: {e}")
+        return None, None
+
+# Where the validated token is cached between runs, and how early it is refreshed
+AUTH_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.linksync_auth.json')
+AUTH_REFRESH_MARGIN = 300
+AUTH_RETRY_DELAY = 30
+
+# Function to decode the payload of a PocketBase JWT (without verifying it)
+def decode_jwt_payload(token):
+    """Return the JWT payload as a dict, or {} if the token is not a JWT"""
+    token_parts = token.split('.') if isinstance(token, str) else []
+    if len(token_parts) != 3:
+        return {}
+    payload_b64 = token_parts[1]
+    padding = len(payload_b64) % 4
+    if padding:
+        payload_b64 += '=' * (4 - padding)
+    try:
+        return json.loads(base64.urlsafe_b64decode(payload_b64).decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return {}
+
+# Function to load a previously validated token from the auth cache
+def load_cached_auth(cache_path, min_validity=AUTH_REFRESH_MARGIN):
+    """
+    Return (token, user_id) from the cache if it was saved for POCKETBASE_URL
+    and stays valid for at least min_validity seconds, else (None, None).
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(cached, dict) or cached.get('url') != POCKETBASE_URL.rstrip('/'):
+        return None, None
+    if cached.get('expires_at', 0) - time.time() < min_validity:
+        return None, None
+    return cached.get('token'), cached.get('user_id')
+
+class AuthSession:
+    """
+    The auth token shared by every writer. Requests read `token` each time
+    they are sent, and refresh() replaces it with a single assignment, so a
+    refresh is picked up by all in-flight writers without locking them.
+    """
+    
+    def __init__(self, token, user_id, cache_path=None, margin=AUTH_REFRESH_MARGIN):
+        self.token = token
+        self.user_id = user_id
+        self.cache_path = cache_path
+        self.margin = margin
+        self.expires_at = decode_jwt_payload(token).get('exp', 0)
+        self.refreshes = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def save(self):
+        """Write the current token to the cache file (owner-readable only)"""
+        if not self.cache_path:
+            return
+        cached = {
+            'url': POCKETBASE_URL.rstrip('/'),
+            'token': self.token,
+            'user_id': self.user_id,
+            'expires_at': self.expires_at,
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print_warning(f"Could not write auth cache {self.cache_path}: {e}")
+    
+    def refresh(self, stale_token=None):
+        """
+        Exchange the current token for a new one via auth-refresh. When
+        stale_token is given and another thread has already replaced it,
+        nothing is sent. Returns True if a usable token is in place.
+        """
+        with self._lock:
+            if stale_token is not None and self.token != stale_token:
+                return True
+            collection = decode_jwt_payload(self.token).get('collectionId') or 'users'
+            try:
+                _, body = pocketbase_request('POST', f"/api/collections/{collection}/auth-refresh", auth_token=self.token)
+                token = json.loads(body).get('token')
+            except (urllib.error.URLError, ValueError) as e:
+                print_warning(f"Could not refresh authentication token: {e}")
+                return False
+            if not token:
+                print_warning("Auth refresh response did not contain a token")
+                return False
+            
+            self.expires_at = decode_jwt_payload(token).get('exp', 0)
+            self.token = token
+            self.refreshes += 1
+            METRICS.increment('auth_refreshes')
+        self.save()
+        return True
+    
+    def start_refresher(self):
+        """Refresh the token in a background thread margin seconds before it expires"""
+        if not self.expires_at or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name='auth-refresh', daemon=True)
+        self._thread.start()
+    
+    def _refresh_loop(self):
+        while True:
+            delay = self.expires_at - self.margin - time.time()
+            if self._stop.wait(max(0, delay)):
+                return
+            if not self.refresh() and self._stop.wait(AUTH_RETRY_DELAY):
+                return
+    
+    def stop(self):
+        self._stop.set()
+
+# Function to run a function over items in a bounded thread pool
+def iter_ordered_results(func, items, workers, window=None):
+    """
+    Yield (item, func(item)) in the original order while up to `workers`
+    calls run concurrently. At most `window` (default 2 * workers) items are
+    submitted ahead of the consumer so memory stays bounded on large inputs.
+    Closing the generator drops the calls that have not started yet and
+    waits for the running ones.
+    """
+    window = window or max(1, workers * 2)
+    pending = deque()
+    item_iter = iter(items)
+    
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for item in item_iter:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= window:
+                break
+        
+        while pending:
+            item, future = pending.popleft()
+            # Top up the window before blocking on the oldest call
+            next_item = next(item_iter, None)
+            if next_item is not None:
+                pending.append((next_item, executor.submit(func, next_item)))
+            yield item, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+# Function to run a pipeline stage in its own thread(s) behind a bounded queue
+def iter_buffered(producers, maxsize=1000, stage='stage'):
+    """
+    Run each producer (a callable returning an iterable) in its own thread
+    and yield everything they produce through one queue of at most maxsize
+    items. A full queue blocks the producers, so a slow consumer applies
+    backpressure instead of letting memory grow; time blocked on either side
+    is added to the stage_blocked_seconds counter to show the bottleneck. A
+    producer's exception is re-raised in the consumer, and closing this
+    generator stops the producers (no item is queued after that), closes
+    their iterables in turn and returns once their threads have finished,
+    so whatever they write to can be closed right after.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+    errors = []
+    
+    def put(item):
+        if stop.is_set():
+            return False
+        try:
+            items.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        started = time.monotonic()
+        try:
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            METRICS.increment('stage_blocked_seconds', time.monotonic() - started, stage=stage, waiting='downstream')
+    
+    def run(producer):
+        iterator = iter(producer())
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            put(done)
+    
+    threads = [
+        threading.Thread(target=run, args=(producer,), name=f"{stage}-{i}", daemon=True)
+        for i, producer in enumerate(producers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        remaining = len(threads)
+        while remaining:
+            try:
+                item = items.get_nowait()
+            except queue.Empty:
+                started = time.monotonic()
+                item = items.get()
+                METRICS.increment('stage_blocked_seconds', time.monotonic() - started, stage=stage, waiting='upstream')
+            if item is done:
+                remaining -= 1
+                if errors:
+                    raise errors[0]
+                continue
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+# Function to resolve favicons ahead of the writer using a thread pool
+def iter_links_with_favicons(links, workers):
+    """
+    Yield (link, favicon) pairs in the original order while favicons for the
+    next links are resolved concurrently.
+    """
+    def safe_fetch(link):
+        try:
+            return fetch_link_favicon(link)
+        except Exception as e:
+            print_warning(f"Failed to fetch favicon for {link.name}: {e}", detail=True)
+            return ""
+    
+    for link, favicon in iter_ordered_results(safe_fetch, links, workers):
+        yield link, favicon or ""
+
+# Keep-alive connection pool for PocketBase API requests
+class PocketBaseClient:
+    """
+    Thread-safe pool of persistent HTTP(S) connections to one PocketBase
+    server. At most max_connections requests are in flight at once; idle
+    connections are reused so each write does not pay TCP/TLS setup again.
+    """
+    
+    def __init__(self, base_url, max_connections=4, timeout=30):
+        parsed = urlparse(base_url)
+        self.base_url = base_url.rstrip('/')
+        self.scheme = parsed.scheme or 'http'
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle = []
+        self._lock = threading.Lock()
+    
+    def _new_connection(self):
+        if self.scheme == 'https':
+            return HTTPSConnection(self.host, self.port, timeout=self.timeout, context=ssl.create_default_context())
+        return HTTPConnection(self.host, self.port, timeout=self.timeout)
+    
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+    
+    def _release(self, conn):
+        with self._lock:
+            self._idle.append(conn)
+    
+    def request(self, method, path, payload=None, headers=None):
+        """Send a request and return (status, headers, body bytes); bytes payloads are sent as they are"""
+        if isinstance(payload, bytes):
+            body = payload
+        else:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request_headers = {"Connection": "keep-alive"}
+        if body is not None:
+            request_headers["Content-Type"] = "application/json"
+        request_headers.update(headers or {})
+        
+        with self._slots:
+            conn, reused = self._acquire()
+            while True:
+                try:
+                    conn.request(method, self.base_path + path, body=body, headers=request_headers)
+                    response = conn.getresponse()
+                    data = response.read()
+                except STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    # The server dropped an idle connection; retry once on a fresh one
+                    conn, reused = self._new_connection(), False
+                    continue
+                except Exception:
+                    conn.close()
+                    raise
+                
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._release(conn)
+                return response.status, response.headers, data
+    
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+# Adaptive send-rate control for PocketBase writes
+class RateController:
+    """
+    AIMD pacing shared by all writers. The allowed request rate grows
+    additively while responses are 2xx and latency stays near its baseline,
+    and is halved on 429/5xx, connection errors or rising latency. A
+    Retry-After header pauses all sends until the server asks us to resume.
+    """
+    
+    def __init__(self, min_rps=1.0, max_rps=50.0, initial_rps=5.0, increase_per_sec=2.0, latency_factor=2.0):
+        self.min_rps = min_rps
+        self.max_rps = max_rps
+        self.rate = min(max(initial_rps, min_rps), max_rps)
+        self.increase_per_sec = increase_per_sec
+        self.latency_factor = latency_factor
+        self.latency_ewma = None
+        self.base_latency = None
+        self.requests = 0
+        self.backoffs = 0
+        self.started = time.monotonic()
+        self._next_send = self.started
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until the next request may be sent"""
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_send, self._paused_until)
+            self._next_send = send_at + 1.0 / self.rate
+        if send_at > now:
+            time.sleep(send_at - now)
+            METRICS.observe('throttle_sleep', send_at - now)
     
-    # Normalize the structure - some versions use 'record' instead of 'model'
-    if 'record' in auth_data and 'model' not in auth_data:
-        auth_data['model'] = auth_data['record']
+    def record(self, status, latency, retry_after=None):
+        """Feed back the outcome of a request (status 0 for connection errors)"""
+        with self._lock:
+            now = time.monotonic()
+            self.requests += 1
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            
+            if status == 0 or status == 429 or status >= 500:
+                self._decrease(now)
+                return
+            
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            self.base_latency = latency if self.base_latency is None else min(self.base_latency, latency)
+            if self.latency_ewma > self.base_latency * self.latency_factor + 0.05:
+                self._decrease(now)
+            else:
+                # Adds roughly increase_per_sec requests/sec for every second of healthy responses
+                self.rate = min(self.max_rps, self.rate + self.increase_per_sec / self.rate)
     
-    # Check if token is expired
+    def _decrease(self, now):
+        # Responses to requests sent before the last decrease should not halve the rate again
+        if now - self._last_decrease < (self.latency_ewma or 0.0) + 1.0 / self.rate:
+            return
+        self._last_decrease = now
+        self.backoffs += 1
+        self.rate = max(self.min_rps, self.rate / 2)
+    
+    def achieved_rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.requests / elapsed if elapsed > 0 else 0.0
+
+# Function to parse a Retry-After header (seconds or HTTP date)
+def parse_retry_after(value):
+    if not value:
+        return None
     try:
-        token = auth_data['token']
-        if isinstance(token, str):
-            token_parts = token.split('.')
-            if len(token_parts) == 3:
-                # Add padding if needed
-                payload_b64 = token_parts[1]
-                padding = len(payload_b64) % 4
-                if padding:
-                    payload_b64 += '=' * (4 - padding)
-                
-                payload = json.loads(base64.b64decode(payload_b64).decode('utf-8'))
-                exp = payload.get('exp', 0)
-                current_time = int(time.time())
-                
-                if exp < current_time:
-                    print_error("Authentication token is expired. Please log in again in the browser.")
-                    return None, None
-        
-        user_model = auth_data.get('model', {})
-        if isinstance(user_model, dict):
-            user_id = user_model.get('id')
-            user_email = user_model.get('email', 'Unknown')
-        else:
-            print_error("Invalid user model structure")
-            return None, None
-        
-        if not user_id:
-            print_error("User ID not found in authentication data")
-            return None, None
-            
-        print_success(f"Using authentication for user: {user_email} (ID: {user_id})")
-        
-        return token, user_id
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# Function to get the shared PocketBase client for POCKETBASE_URL
+def get_pocketbase_client():
+    global PB_CLIENT
+    if PB_CLIENT is None or PB_CLIENT.base_url != POCKETBASE_URL.rstrip('/'):
+        PB_CLIENT = PocketBaseClient(POCKETBASE_URL)
+    return PB_CLIENT
+
+# Function to send a request to PocketBase over the shared keep-alive pool
+def pocketbase_request(method, path, payload=None, auth_token=None, content_type=None):
+    """
+    Return (status, body bytes) for a PocketBase API call. Error statuses are
+    raised as urllib.error.HTTPError and connection problems as URLError so
+    callers can keep handling them the same way as urllib.request.urlopen().
+    Requests are paced by THROTTLE when set, and 429/503 responses are retried
+    after the server's Retry-After delay. auth_token may be a token string or
+    an AuthSession, whose token is refreshed and the request retried once on 401.
+    A bytes payload is sent as is with content_type (e.g. a multipart upload).
+    """
+    client = get_pocketbase_client()
+    session = auth_token if isinstance(auth_token, AuthSession) else None
+    refreshed = False
+    for attempt in range(MAX_RETRIES + 1):
+        # Read the token per attempt so a refresh applies to requests already queued
+        token = session.token if session is not None else auth_token
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        if content_type:
+            headers["Content-Type"] = content_type
+        if THROTTLE is not None:
+            THROTTLE.acquire()
+        started = time.monotonic()
+        try:
+            status, response_headers, body = client.request(method, path, payload, headers)
+        except (OSError, http.client.HTTPException) as e:
+            METRICS.increment('http_responses', target='pocketbase', method=method, status='error')
+            if THROTTLE is not None:
+                THROTTLE.record(0, time.monotonic() - started)
+            raise urllib.error.URLError(e)
         
-    except Exception as e:
-        print_error(f"Error validating token: {e}")
-        return None, None
+        METRICS.observe('post' if method == 'POST' else 'pocketbase_' + method.lower(), time.monotonic() - started)
+        METRICS.increment('http_responses', target='pocketbase', method=method, status=status)
+        retry_after = parse_retry_after(response_headers.get('Retry-After'))
+        if THROTTLE is not None:
+            THROTTLE.record(status, time.monotonic() - started, retry_after)
+        if status == 401 and session is not None and not refreshed and attempt < MAX_RETRIES:
+            refreshed = True
+            if session.refresh(token):
+                continue
+        if status not in (429, 503) or attempt == MAX_RETRIES:
+            break
+        print_warning(f"PocketBase returned {status}, retrying in {retry_after or 1:.1f}s", detail=True)
+        if THROTTLE is None:
+            time.sleep(retry_after or 1)
+    
+    if status >= 400:
+        raise urllib.error.HTTPError(
+            client.base_url + path, status, http.client.responses.get(status, ''),
+            response_headers, io.BytesIO(body)
+        )
+    return status, body
 
-# Function to insert a link into PocketBase using browser auth
-def insert_link(link_data, auth_token, user_id, skip_favicons=False):
-    url = f"{POCKETBASE_URL}/api/collections/{API_COLLECTION}/records"
-    headers = {
-        "Authorization": f"Bearer {auth_token}",
-        "Content-Type": "application/json"
-    }
+# Function to resolve the favicon for a link (matching Svelte app behavior)
+def resolve_link_favicon(link_data, skip_favicons=False, favicon=None):
+    """Return (favicon, favicon_found), using an already resolved favicon when given"""
+    if skip_favicons:
+        fill_link_metadata(link_data)
+        return "", False
     
-    # Fetch favicon for the link (matching Svelte app behavior)
-    favicon = ""
-    favicon_found = False
-    if not skip_favicons:
+    if favicon is None:
         try:
-            favicon = fetch_favicon(link_data['url'])
-            if favicon and favicon.strip():
-                favicon_found = True
-                print_success(f"Favicon found for {link_data['name']}: {favicon}")
-            else:
-                print_warning(f"No valid favicon found for: {link_data['name']}")
-                favicon = ""  # Ensure it's empty string, not None
+            favicon = fetch_link_favicon(link_data)
         except Exception as e:
-            print_warning(f"Failed to fetch favicon for {link_data['name']}: {e}")
-            favicon = ""
+            print_warning(f"Failed to fetch favicon for {link_data.name}: {e}", detail=True)
+            return "", False
     
+    if favicon and favicon.strip():
+        if ICON_STORE is not None:
+            favicon = ICON_STORE.host(favicon)
+        print_success(f"Favicon found for {link_data.name}: {favicon}", detail=True)
+        return favicon, True
+    
+    print_warning(f"No valid favicon found for: {link_data.name}", detail=True)
+    return "", False  # Ensure it's empty string, not None
+
+# Function to build the PocketBase record for a link
+def build_link_payload(link_data, user_id, favicon):
     # Prepare data for PocketBase format (exactly matching Svelte app structure)
-    pb_data = {
-        "url": link_data['url'],
-        "name": link_data['name'],
-        "description": link_data['description'],
-        "tags": link_data['tags'],
-        "visibility": link_data['visibility'],
+    return {
+        "url": link_data.url,
+        "name": link_data.name,
+        "description": link_data.description,
+        "tags": list(link_data.tags),
+        "visibility": str(link_data.visibility),
         "user": user_id,
         "favicon": favicon,  # This should match the 'favicon' field from the model
-        "clicks": link_data.get('clicks', 0)  # Default to 0 if not provided
+        "clicks": link_data.clicks
     }
+
+# Function to check whether a failed create was caused by a unique constraint
+def is_duplicate_error(status, error_msg, error_data):
+    if status != 400:
+        return False
+    data = error_data.get('data', {}) if isinstance(error_data, dict) else {}
+    return ("not unique" in error_msg.lower() or
+            "already exists" in error_msg.lower() or
+            any("unique" in str(v).lower() for v in data.values()))
+
+# Function to report the outcome of a successful create
+def handle_saved_link(response_data, favicon, link_data=None):
+    if link_data is not None:
+        # Remember the created record id for the import journal
+        link_data.record_id = response_data.get('id', '')
+    
+    # Verify favicon was actually saved
+    saved_favicon = response_data.get('favicon', '')
+    
+    if saved_favicon and saved_favicon.strip():
+        favicon_display = saved_favicon[:50] + '...' if len(saved_favicon) > 50 else saved_favicon
+        print_success(f"✓ Link saved with favicon: {favicon_display}", detail=True)
+        return (True, True)  # Success with favicon
+    elif favicon and favicon.strip():
+        print_warning(f"✓ Link saved but favicon was not stored (sent: {favicon[:50]}...)", detail=True)
+        return (True, False)  # Success but no favicon stored
+    else:
+        print_info(f"✓ Link saved without favicon (none provided)", detail=True)
+        return (True, False)  # Success, no favicon attempted
+
+# Function to report a failed create, treating unique violations as success
+def handle_insert_error(link_data, status, error_msg, error_data, favicon_found):
+    if is_duplicate_error(status, error_msg, error_data):
+        print_warning(f"Link already exists: {link_data.name} ({link_data.url})", detail=True)
+        return (True, favicon_found)  # Consider it successful since the link exists
+    
+    print_error(f"Failed to insert link '{link_data.name}': {error_msg}", detail=True)
+    # Print detailed error for debugging
+    if isinstance(error_data, dict) and isinstance(error_data.get('data'), dict):
+        for field, error_info in error_data['data'].items():
+            if isinstance(error_info, dict) and 'message' in error_info:
+                print_error(f"  {field}: {error_info['message']}", detail=True)
+            else:
+                print_error(f"  {field}: {error_info}", detail=True)
+    return (False, False)
+
+# Function to insert a link into PocketBase using browser auth
+def insert_link(link_data, auth_token, user_id, skip_favicons=False, favicon=None):
+    path = f"/api/collections/{API_COLLECTION}/records"
+    
+    favicon, favicon_found = resolve_link_favicon(link_data, skip_favicons, favicon)
+    pb_data = build_link_payload(link_data, user_id, favicon)
     
     # Debug: Print the data being sent (truncate long URLs)
     favicon_display = favicon[:50] + '...' if len(favicon) > 50 else favicon
-    print_info(f"Inserting: {pb_data['name']} | Favicon: {favicon_display if favicon else 'None'}")
-    
-    data = json.dumps(pb_data).encode('utf-8')
-    req = urllib.request.Request(url, data=data, headers=headers, method='POST')
+    print_info(f"Inserting: {pb_data['name']} | Favicon: {favicon_display if favicon else 'None'}", detail=True)
     
     try:
-        with urllib.request.urlopen(req) as response:
-            if response.status in [200, 201]:
-                response_data = json.loads(response.read().decode('utf-8'))
-                # Verify favicon was actually saved
-                saved_favicon = response_data.get('favicon', '')
-                
-                if saved_favicon and saved_favicon.strip():
-                    favicon_display = saved_favicon[:50] + '...' if len(saved_favicon) > 50 else saved_favicon
-                    print_success(f"✓ Link saved with favicon: {favicon_display}")
-                    return (True, True)  # Success with favicon
-                elif favicon and favicon.strip():
-                    print_warning(f"✓ Link saved but favicon was not stored (sent: {favicon[:50]}...)")
-                    return (True, False)  # Success but no favicon stored
-                else:
-                    print_info(f"✓ Link saved without favicon (none provided)")
-                    return (True, False)  # Success, no favicon attempted
-            else:
-                print_warning(f"Unexpected status code: {response.status}")
-                return (False, False)
+        status, body = pocketbase_request('POST', path, pb_data, auth_token)
+        if status in [200, 201]:
+            response_data = json.loads(body.decode('utf-8'))
+            return handle_saved_link(response_data, favicon, link_data)
+        else:
+            print_warning(f"Unexpected status code: {status}")
+            return (False, False)
     except urllib.error.HTTPError as e:
+        error_msg = e.read().decode('utf-8', errors='ignore')
         try:
-            error_msg = e.read().decode('utf-8')
             error_data = json.loads(error_msg)
-            
-            # Check for duplicate/unique constraint violations
-            if (e.code == 400 and 
-                ("not unique" in error_msg.lower() or 
-                 "already exists" in error_msg.lower() or
-                 any("unique" in str(v).lower() for v in error_data.get('data', {}).values()))):
-                print_warning(f"Link already exists: {link_data['name']} ({link_data['url']})")
-                return (True, favicon_found)  # Consider it successful since the link exists
-            else:
-                print_error(f"Failed to insert link '{link_data['name']}': {error_msg}")
-                # Print detailed error for debugging
-                if 'data' in error_data:
-                    for field, error_info in error_data['data'].items():
-                        if isinstance(error_info, dict) and 'message' in error_info:
-                            print_error(f"  {field}: {error_info['message']}")
-                        else:
-                            print_error(f"  {field}: {error_info}")
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            error_msg = e.read().decode('utf-8', errors='ignore')
-            print_error(f"Failed to insert link '{link_data['name']}': {error_msg}")
-        return (False, False)
+        except json.JSONDecodeError:
+            error_data = {}
+        return handle_insert_error(link_data, e.code, error_msg, error_data, favicon_found)
     except urllib.error.URLError as e:
-        print_error(f"Failed to insert link '{link_data['name']}': {e.reason}")
+        print_error(f"Failed to insert link '{link_data.name}': {e.reason}", detail=True)
         return (False, False)
     except ConnectionRefusedError:
         print_error("Connection refused - PocketBase server may be down")
         return (False, False)
     except Exception as e:
-        print_error(f"Failed to insert link '{link_data['name']}': {e}")
+        print_error(f"Failed to insert link '{link_data.name}': {e}", detail=True)
         return (False, False)
 
+# Function to insert several links in one PocketBase /api/batch transaction
+BATCH_MAX_ROLLBACKS = 2  # Rolled back batches before the rest are inserted one by one
+
+def insert_links_batch(batch, auth_token, user_id):
+    """
+    Create every (link, favicon, favicon_found) entry of batch in a single
+    transactional /api/batch request. Returns a list of (success, has_favicon)
+    results in the same order as batch, or None when the server does not
+    accept batch requests so the caller can fall back to per-record inserts.
+    PocketBase rolls back the whole batch at the first failing request, so
+    after a rollback the failure is recorded and the untouched links are
+    resubmitted once; if that batch is rolled back too, the rest are sent
+    one request per link instead of paying a rollback per bad record.
+    """
+    results = [None] * len(batch)
+    pending = list(range(len(batch)))
+    rollbacks = 0
+    while pending:
+        if rollbacks >= BATCH_MAX_ROLLBACKS:
+            print_info(f"Batch rolled back {rollbacks} times, inserting the remaining {len(pending)} links individually", detail=True)
+            for index in pending:
+                link, favicon, _ = batch[index]
+                results[index] = insert_link(link, auth_token, user_id, False, favicon)
+            break
+        
+        outcome = post_links_batch([batch[i] for i in pending], auth_token, user_id)
+        if outcome is None:
+            if rollbacks == 0:
+                return None
+            # Batching was refused after a rollback; finish one request per link
+            rollbacks = BATCH_MAX_ROLLBACKS
+            continue
+        batch_results, failed_items = outcome
+        if failed_items is None:
+            for index, result in zip(pending, batch_results):
+                results[index] = result
+            break
+        
+        rollbacks += 1
+        retry = []
+        for position, index in enumerate(pending):
+            item_error = failed_items.get(str(position))
+            if item_error is None:
+                retry.append(index)
+                continue
+            link, _, favicon_found = batch[index]
+            response = item_error.get('response') if isinstance(item_error, dict) else None
+            if not isinstance(response, dict):
+                response = item_error if isinstance(item_error, dict) else {}
+            results[index] = handle_insert_error(
+                link, response.get('status', 400), json.dumps(response), response, favicon_found
+            )
+        pending = retry
+    return results
+
+def post_links_batch(batch, auth_token, user_id):
+    """
+    Send one /api/batch request for batch. Returns (results, None) when it
+    was processed, (None, failed_items) when the transaction was rolled back
+    (failed_items maps request indexes to their errors), or None when the
+    server does not accept batch requests.
+    """
+    record_path = f"/api/collections/{API_COLLECTION}/records"
+    requests = [
+        {"method": "POST", "url": record_path, "body": build_link_payload(link, user_id, favicon)}
+        for link, favicon, _ in batch
+    ]
+    
+    print_info(f"Inserting batch of {len(batch)} links (original ids {batch[0][0].original_id}-{batch[-1][0].original_id})", detail=True)
+    
+    try:
+        _, body = pocketbase_request('POST', "/api/batch", {"requests": requests}, auth_token)
+        items = json.loads(body.decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        error_msg = e.read().decode('utf-8', errors='ignore')
+        if e.code in (403, 404, 405):
+            # Batch API disabled in the PocketBase settings or not available in this version
+            print_warning(f"Batch requests not supported by server ({e.code}): {error_msg[:200]}")
+            return None
+        try:
+            error_data = json.loads(error_msg)
+        except json.JSONDecodeError:
+            error_data = {}
+        failed_items = error_data.get('data', {}).get('requests') if isinstance(error_data.get('data'), dict) else None
+        if e.code != 400 or not isinstance(failed_items, dict) or not failed_items:
+            print_warning(f"Batch request failed ({e.code}), retrying links individually: {error_msg[:200]}")
+            return [insert_link(link, auth_token, user_id, False, favicon) for link, favicon, _ in batch], None
+        return None, failed_items
+    except urllib.error.URLError as e:
+        print_error(f"Failed to insert batch: {e.reason}")
+        return [(False, False)] * len(batch), None
+    except Exception as e:
+        print_error(f"Failed to insert batch: {e}")
+        return [(False, False)] * len(batch), None
+    
+    results = []
+    for (link, favicon, favicon_found), item in zip(batch, items):
+        status = item.get('status', 0)
+        body = item.get('body') or {}
+        if status in (200, 201):
+            results.append(handle_saved_link(body, favicon, link))
+        else:
+            results.append(handle_insert_error(link, status, json.dumps(body), body, favicon_found))
+    # A short response should never happen, but keep accounting aligned if it does
+    results.extend([(False, False)] * (len(batch) - len(results)))
+    return results, None
+
+# Function to insert a stream of links, optionally batched and in parallel
+def iter_insert_results(link_stream, auth_token, user_id, skip_favicons=False, batch_size=1, writers=1):
+    """
+    Yield (link, (success, has_favicon)) for every (link, favicon) pair in
+    link_stream, in order. With batch_size > 1 links are created through
+    /api/batch, falling back to one request per link if batching is refused.
+    With writers > 1 several units of work are written concurrently over the
+    shared connection pool.
+    """
+    state = {'use_batch': batch_size > 1}
+    
+    def write_unit(unit):
+        if not state['use_batch']:
+            results = [insert_link(link, auth_token, user_id, skip_favicons, favicon) for link, favicon in unit]
+        else:
+            batch = [(link,) + resolve_link_favicon(link, skip_favicons, favicon) for link, favicon in unit]
+            results = insert_links_batch(batch, auth_token, user_id)
+            if results is None:
+                state['use_batch'] = False
+                print_info("Falling back to one request per link")
+                results = [insert_link(link, auth_token, user_id, skip_favicons, favicon) for link, favicon, _ in batch]
+        return results
+    
+    def iter_units():
+        unit = []
+        for item in link_stream:
+            unit.append(item)
+            if len(unit) >= (batch_size if state['use_batch'] else 1):
+                yield unit
+                unit = []
+        if unit:
+            yield unit
+    
+    if writers > 1:
+        unit_results = iter_ordered_results(write_unit, iter_units(), writers)
+    else:
+        unit_results = ((unit, write_unit(unit)) for unit in iter_units())
+    
+    for unit, results in unit_results:
+        for (link, _), result in zip(unit, results):
+            yield link, result
+
+# Function to normalize a URL for comparing it with a link name
+def normalize_url(url):
+    """Lowercase scheme and host, drop default ports, fragments and trailing slashes"""
+    url = (url or '').strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        url = 'https://' + url
+    try:
+        parsed = urlparse(url)
+        port = parsed.port
+    except ValueError:
+        return url
+    scheme = parsed.scheme.lower()
+    netloc = (parsed.hostname or '').lower()
+    if port and not (scheme == 'http' and port == 80) and not (scheme == 'https' and port == 443):
+        netloc += f":{port}"
+    normalized = f"{scheme}://{netloc}{parsed.path.rstrip('/')}"
+    if parsed.query:
+        normalized += f"?{parsed.query}"
+    return normalized
+
+# Function to key a URL for duplicate detection
+def duplicate_url_key(url):
+    """
+    The key the app's checkDuplicateUrl() compares (link-service.ts): the URL
+    without its http:// or https:// prefix and one trailing slash. Anything
+    else, including the #fragment of hash-routed links, is significant.
+    """
+    return re.sub(r'^https?://', '', url or '').removesuffix('/')
+
+# Function to fetch the duplicate keys of every link the user already has
+def fetch_existing_urls(auth_token, user_id, per_page=1000, workers=4):
+    """
+    Page through the links collection for user_id requesting only the url
+    field. The first page reports the page count; the rest are fetched in
+    parallel over the connection pool. Returns a set of duplicate_url_key()s, or
+    None if the listing failed.
+    """
+    query = {
+        'filter': f'user = "{user_id}"',
+        'fields': 'url',
+        'perPage': per_page,
+    }
+    
+    def fetch_page(page):
+        path = f"/api/collections/{API_COLLECTION}/records?" + urllib.parse.urlencode(dict(query, page=page))
+        _, body = pocketbase_request('GET', path, auth_token=auth_token)
+        return json.loads(body.decode('utf-8'))
+    
+    try:
+        first_page = fetch_page(1)
+        existing = {duplicate_url_key(item.get('url')) for item in first_page.get('items', [])}
+        total_pages = first_page.get('totalPages', 1)
+        if total_pages > 1:
+            for _, page_data in iter_ordered_results(fetch_page, range(2, total_pages + 1), workers):
+                existing.update(duplicate_url_key(item.get('url')) for item in page_data.get('items', []))
+    except urllib.error.HTTPError as e:
+        print_warning(f"Could not list existing links ({e.code}): {e.read().decode('utf-8', errors='ignore')[:200]}")
+        return None
+    except (urllib.error.URLError, ValueError) as e:
+        print_warning(f"Could not list existing links: {e}")
+        return None
+    
+    return existing
+
+# Checkpoint journal that makes interrupted imports resumable
+# Source fields compared by --sync; a change in any of them is PATCHed
+SYNC_FIELDS = ('url', 'name', 'description', 'tags', 'visibility', 'clicks')
+
+def sync_field_value(link_data, field):
+    """A synced field as it appears in the API payload"""
+    value = getattr(link_data, field)
+    if field == 'tags':
+        return list(value)
+    if field == 'visibility':
+        return str(value)
+    return value
+
+def link_field_hashes(link_data):
+    """
+    Return a JSON object with a short content hash per synced field of a
+    link, taken from the source values (before --fill-metadata changed them)
+    """
+    source_values = link_data.source_values or {}
+    hashes = {}
+    for field in SYNC_FIELDS:
+        value = source_values[field] if field in source_values else sync_field_value(link_data, field)
+        hashes[field] = hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return json.dumps(hashes, sort_keys=True)
+
+def changed_sync_fields(old_hashes, new_hashes):
+    """Fields whose hash differs (all of them when there is no previous hash)"""
+    try:
+        old = json.loads(old_hashes) if old_hashes else {}
+    except ValueError:
+        old = {}
+    new = json.loads(new_hashes)
+    return [field for field in SYNC_FIELDS if old.get(field) != new[field]]
+
+# Function to apply changed fields to an existing record
+def update_link(record_id, link_data, fields, auth_token):
+    """PATCH only `fields` of the record; returns True on success"""
+    payload = {field: sync_field_value(link_data, field) for field in fields}
+    path = f"/api/collections/{API_COLLECTION}/records/{record_id}"
+    try:
+        pocketbase_request('PATCH', path, payload, auth_token)
+        return True
+    except urllib.error.HTTPError as e:
+        print_error(f"Failed to update {link_data.name}: HTTP {e.code}", detail=True)
+    except urllib.error.URLError as e:
+        print_error(f"Failed to update {link_data.name}: {e.reason}", detail=True)
+    return False
+
+# Function to delete a record that is no longer in the dump
+def delete_link(record_id, auth_token):
+    """Returns True if the record is gone (including when it was already deleted)"""
+    path = f"/api/collections/{API_COLLECTION}/records/{record_id}"
+    try:
+        pocketbase_request('DELETE', path, auth_token=auth_token)
+        return True
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return True
+        print_error(f"Failed to delete record {record_id}: HTTP {e.code}", detail=True)
+    except urllib.error.URLError as e:
+        print_error(f"Failed to delete record {record_id}: {e.reason}", detail=True)
+    return False
+
+# Function to apply the changes collected by --sync to existing records
+def apply_sync_changes(updates, removed, auth_token, journal, workers=1):
+    """
+    PATCH every (link, record_id, fields, field_hashes) in updates and delete
+    every (original_id, record_id) in removed, `workers` requests at a time.
+    Failed updates keep their old journal entry so the next sync retries them.
+    Returns {'updated', 'deleted', 'failed'} counts.
+    """
+    counts = {'updated': 0, 'deleted': 0, 'failed': 0}
+    
+    def patch(update):
+        link, record_id, fields, _ = update
+        return update_link(record_id, link, fields, auth_token)
+    
+    for (link, record_id, _, field_hashes), updated in iter_ordered_results(patch, updates, workers):
+        if updated:
+            journal.record(link.original_id, 'committed', record_id, field_hashes)
+            counts['updated'] += 1
+        else:
+            counts['failed'] += 1
+    
+    for (original_id, record_id), deleted in iter_ordered_results(lambda item: delete_link(item[1], auth_token), removed, workers):
+        if deleted:
+            journal.record(original_id, 'deleted', record_id)
+            counts['deleted'] += 1
+        else:
+            counts['failed'] += 1
+    return counts
+
+class ImportJournal:
+    """
+    Records the outcome of every imported row keyed by its original_id:
+    'committed' (created, with the PocketBase record id and the field hashes
+    --sync compares against), 'exists' (rejected as a duplicate), 'deleted'
+    (removed by --sync-delete) or 'failed'. Rows without an entry are still
+    pending.
+    Updates are buffered and written in one transaction every flush_every
+    rows or flush_interval seconds, with WAL journaling so the fsync cost is
+    paid per batch instead of per row.
+    """
+    
+    DONE_STATUSES = ('committed', 'exists')
+    # PRAGMA user_version: 1 once rows are keyed by '<source name>:<id>'
+    KEY_FORMAT_VERSION = 1
+    
+    def __init__(self, path, flush_every=500, flush_interval=2.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                original_id TEXT PRIMARY KEY,
+                record_id TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                field_hashes TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(journal)")}
+        if 'field_hashes' not in columns:
+            # Journals written before --sync existed
+            self._conn.execute("ALTER TABLE journal ADD COLUMN field_hashes TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+    
+    def upgrade_row_keys(self, paths):
+        """
+        Rewrite the row keys of a journal written before rows were keyed by
+        source_name(): bare ids when it was written for one input, or
+        '<path as typed>:<id>' for several. Keys that match none of paths
+        are left alone.
+        """
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.KEY_FORMAT_VERSION:
+            return
+        with self._conn:
+            if len(paths) == 1:
+                self._conn.execute("UPDATE journal SET original_id = ? || original_id", (f"{source_name(paths[0])}:",))
+            else:
+                for path in paths:
+                    self._conn.execute(
+                        "UPDATE OR IGNORE journal SET original_id = ? || substr(original_id, ?) WHERE substr(original_id, 1, ?) = ?",
+                        (f"{source_name(path)}:", len(path) + 2, len(path) + 1, f"{path}:")
+                    )
+            self._conn.execute(f"PRAGMA user_version = {self.KEY_FORMAT_VERSION}")
+    
+    def done_ids(self):
+        """Return the set of original ids that do not need to be imported again"""
+        placeholders = ', '.join('?' for _ in self.DONE_STATUSES)
+        rows = self._conn.execute(
+            f"SELECT original_id FROM journal WHERE status IN ({placeholders})", self.DONE_STATUSES
+        )
+        return {row[0] for row in rows}
+    
+    def sync_state(self, prefixes=None):
+        """
+        Return {original_id: (record_id, field_hashes)} for every created
+        record, only those whose key starts with one of prefixes if given
+        """
+        rows = self._conn.execute(
+            "SELECT original_id, record_id, field_hashes FROM journal WHERE status = 'committed' AND record_id != ''"
+        )
+        return {row[0]: (row[1], row[2]) for row in rows if prefixes is None or row[0].startswith(prefixes)}
+    
+    def record(self, original_id, status, record_id='', field_hashes=''):
+        self._buffer.append((str(original_id), record_id or '', status, time.time(), field_hashes))
+        if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO journal (original_id, record_id, status, updated_at, field_hashes) VALUES (?, ?, ?, ?, ?)",
+                    self._buffer
+                )
+            self._buffer = []
+        self._last_flush = time.monotonic()
+    
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+# PocketBase record ids are 15 random lowercase alphanumerics
+PB_ID_ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789'
+PB_ID_LENGTH = 15
+# Rows per transaction for --direct-db when --batch-size is not given
+DIRECT_DB_BATCH_SIZE = 1000
+
+def generate_record_id():
+    return ''.join(secrets.choice(PB_ID_ALPHABET) for _ in range(PB_ID_LENGTH))
+
+def pocketbase_timestamp(when=None):
+    """Format a datetime the way PocketBase stores created/updated: 2006-01-02 15:04:05.000Z"""
+    when = when or datetime.now(timezone.utc)
+    return when.strftime('%Y-%m-%d %H:%M:%S.') + f"{when.microsecond // 1000:03d}Z"
+
+class DirectDbWriter:
+    """
+    Writes links straight into the `links` table of a PocketBase data.db
+    instead of going through the HTTP API. Only for an instance that is not
+    running (fresh setup or restore). The table layout, the field types in
+    _collections and the target user are checked up front, and a ValueError
+    is raised if anything does not match.
+    """
+    
+    REQUIRED_COLUMNS = ('id', 'created', 'updated', 'url', 'name', 'description', 'tags', 'visibility', 'favicon', 'user')
+    FIELD_TYPES = {
+        'url': 'url', 'name': 'text', 'description': 'text', 'tags': 'json',
+        'visibility': 'select', 'favicon': 'text', 'user': 'relation', 'clicks': 'number',
+    }
+    
+    def __init__(self, path, user_id):
+        if not os.path.isfile(path):
+            raise ValueError(f"{path} does not exist")
+        self.path = path
+        self.user_id = user_id
+        # Opened here, written from the pipeline's write stage
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self._check_schema()
+        except (ValueError, sqlite3.Error):
+            self._conn.close()
+            raise
+        self._conn.execute("PRAGMA busy_timeout=5000")
+    
+    def _check_schema(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(links)")}
+        if not columns:
+            raise ValueError("no `links` table found")
+        missing = [c for c in self.REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"`links` table is missing columns: {', '.join(missing)}")
+        self.has_clicks = 'clicks' in columns
+        
+        tables = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if '_collections' in tables:
+            # PocketBase >= 0.23 keeps field definitions in `fields`, older versions in `schema`
+            collection_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(_collections)")}
+            fields_column = 'fields' if 'fields' in collection_columns else 'schema'
+            row = self._conn.execute(f"SELECT {fields_column} FROM _collections WHERE name = 'links'").fetchone()
+            if row is None:
+                raise ValueError("`links` is not a PocketBase collection")
+            field_types = {f.get('name'): f.get('type') for f in json.loads(row[0] or '[]')}
+            for name, expected in self.FIELD_TYPES.items():
+                if name in field_types and field_types[name] != expected:
+                    raise ValueError(f"field `{name}` is {field_types[name]}, expected {expected}")
+        
+        if 'users' in tables:
+            if self._conn.execute("SELECT 1 FROM users WHERE id = ?", (self.user_id,)).fetchone() is None:
+                raise ValueError(f"user {self.user_id} does not exist")
+    
+    def existing_urls(self):
+        """Duplicate keys (see duplicate_url_key()) of the links the user already has"""
+        rows = self._conn.execute("SELECT url FROM links WHERE user = ?", (self.user_id,))
+        return {duplicate_url_key(row[0]) for row in rows}
+    
+    def _row(self, link_data, favicon):
+        now = pocketbase_timestamp()
+        link_data.record_id = generate_record_id()
+        row = [
+            link_data.record_id, now, now, link_data.url, link_data.name,
+            link_data.description, json.dumps(list(link_data.tags)), str(link_data.visibility),
+            favicon, self.user_id,
+        ]
+        if self.has_clicks:
+            row.append(link_data.clicks)
+        return row
+    
+    def write(self, batch):
+        """
+        Insert a batch of (link, favicon, favicon_found) in one transaction and
+        return a (success, has_favicon) per link. If the batch violates a
+        constraint, its rows are retried one at a time so only the offending
+        rows fail.
+        """
+        columns = list(self.REQUIRED_COLUMNS) + (['clicks'] if self.has_clicks else [])
+        sql = (f"INSERT INTO links ({', '.join(f'[{c}]' for c in columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)})")
+        rows = [self._row(link, favicon) for link, favicon, _ in batch]
+        started = time.monotonic()
+        try:
+            with self._conn:
+                self._conn.executemany(sql, rows)
+            return [(True, found) for _, _, found in batch]
+        except sqlite3.IntegrityError:
+            pass
+        finally:
+            METRICS.observe('direct_db_write', time.monotonic() - started)
+        
+        results = []
+        for (link, _, found), row in zip(batch, rows):
+            try:
+                with self._conn:
+                    self._conn.execute(sql, row)
+                results.append((True, found))
+            except sqlite3.IntegrityError as e:
+                print_error(f"Failed to insert {link.name}: {e}", detail=True)
+                link.record_id = ''
+                results.append((False, False))
+        return results
+    
+    def close(self):
+        self._conn.close()
+
+# Function to write links straight into data.db, with the same results as iter_insert_results()
+def iter_direct_insert_results(link_stream, writer, skip_favicons=False, batch_size=DIRECT_DB_BATCH_SIZE):
+    batch = []
+    for link, favicon in itertools.chain(link_stream, [(None, None)]):
+        if link is not None:
+            batch.append((link,) + resolve_link_favicon(link, skip_favicons, favicon))
+            if len(batch) < batch_size:
+                continue
+        if batch:
+            for (link_data, _, _), result in zip(batch, writer.write(batch)):
+                yield link_data, result
+            batch = []
+
 # Function to show a progress bar
 def progress_bar(current, total, width=50):
+    if total <= 0:
+        total = current = 1
+    current = min(current, total)
     progress = int(width * current / total)
     bar = "█" * progress + "░" * (width - progress)
     percent = int(100 * current / total)
     return f"[{bar}] {percent}%"
 
+# Exporting the links collection back out of PocketBase (see export_main())
+EXPORT_PER_PAGE = 500
+EXPORT_ROWS_PER_INSERT = 250  # Rows per INSERT statement in SQL exports, like phpMyAdmin's extended inserts
+EXPORT_FIELDS = 'id,url,name,description,tags,visibility,clicks,favicon,created,updated'
+EXPORT_SQL_COLUMNS = LINKS_COLUMNS + ['favicon']
+EXPORT_SQL_HEADER = """-- LinkSync export of the PocketBase `{collection}` collection
+-- Generation Time: {generated}
+-- Readable by inseart_browser_auth.py and importable into MariaDB/MySQL
+
+SET SQL_MODE = "NO_AUTO_VALUE_ON_ZERO";
+SET AUTOCOMMIT = 0;
+START TRANSACTION;
+SET time_zone = "+00:00";
+
+/*!40101 SET NAMES utf8mb4 */;
+
+CREATE TABLE `links` (
+  `id` varchar(15) NOT NULL,
+  `url` text NOT NULL,
+  `name` varchar(255) NOT NULL,
+  `description` text DEFAULT NULL,
+  `tags` text DEFAULT NULL,
+  `username` varchar(255) DEFAULT NULL,
+  `email` varchar(255) DEFAULT NULL,
+  `added_date` timestamp NOT NULL DEFAULT current_timestamp(),
+  `visibility` enum('public','private') NOT NULL DEFAULT 'public',
+  `clicks` int(11) DEFAULT 0,
+  `favicon` text DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+"""
+SQL_QUOTE_ESCAPES = {'\\': '\\\\', "'": "\\'", '\0': '\\0', '\n': '\\n', '\r': '\\r', '\x1a': '\\Z'}
+SQL_QUOTE_RE = re.compile(r"[\\'\0\n\r\x1a]")
+
+def sql_literal(value):
+    """Format a value for an INSERT statement (the inverse of split_sql_values())"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + SQL_QUOTE_RE.sub(lambda m: SQL_QUOTE_ESCAPES[m.group(0)], str(value)) + "'"
+
+def export_row(record):
+    """Map a PocketBase links record to the source columns (plus favicon)"""
+    tags = record.get('tags') or []
+    if not isinstance(tags, list):
+        tags = [str(tags)]
+    created = (record.get('created') or '').replace('T', ' ')[:19]
+    return {
+        'id': record.get('id'),
+        'url': record.get('url') or '',
+        'name': record.get('name') or '',
+        'description': record.get('description') or '',
+        'tags': [str(tag) for tag in tags if str(tag).strip()],
+        'username': None,
+        'email': None,
+        'added_date': created or None,
+        'visibility': record.get('visibility') or str(Visibility.PUBLIC),
+        'clicks': record.get('clicks') or 0,
+        'favicon': record.get('favicon') or '',
+    }
+
+def export_list(auth_token, query):
+    """GET one page of the links collection"""
+    path = f"/api/collections/{API_COLLECTION}/records?" + urllib.parse.urlencode(query)
+    _, body = pocketbase_request('GET', path, auth_token=auth_token)
+    return json.loads(body.decode('utf-8'))
+
+def iter_export_pages(auth_token, record_filter, per_page=EXPORT_PER_PAGE, workers=4, stats=None):
+    """
+    Yield lists of records page by page in a stable order (created, id).
+    The first page reports the page count; later pages are fetched up to
+    `workers` at a time over the keep-alive pool, and only the pages in
+    that window are held in memory.
+    """
+    query = {'filter': record_filter, 'sort': 'created,id', 'fields': EXPORT_FIELDS, 'perPage': per_page}
+    first_page = export_list(auth_token, dict(query, page=1))
+    if stats is not None:
+        stats['total'] = first_page.get('totalItems', 0)
+    yield first_page.get('items', [])
+    pages = range(2, first_page.get('totalPages', 1) + 1)
+    for _, page_data in iter_ordered_results(lambda page: export_list(auth_token, dict(query, page=page)), pages, workers):
+        yield page_data.get('items', [])
+
+def iter_export_cursor(auth_token, record_filter, per_page=EXPORT_PER_PAGE, stats=None):
+    """
+    Yield lists of records by keyset pagination on (created, id): each
+    request filters for records after the last one seen, so deep pages
+    cost the same as the first and records added meanwhile are not skipped
+    or repeated. Requests are sequential; only the first one counts rows.
+    """
+    query = {'sort': 'created,id', 'fields': EXPORT_FIELDS, 'perPage': per_page}
+    cursor = None
+    while True:
+        page_filter = record_filter
+        if cursor is not None:
+            created, record_id = cursor
+            page_filter = (f'({record_filter}) && (created > "{created}" || '
+                           f'(created = "{created}" && id > "{record_id}"))')
+        page_query = dict(query, filter=page_filter, page=1)
+        if cursor is not None or stats is None:
+            page_query['skipTotal'] = 1
+        data = export_list(auth_token, page_query)
+        if cursor is None and stats is not None:
+            stats['total'] = data.get('totalItems', 0)
+        items = data.get('items', [])
+        if items:
+            yield items
+        if len(items) < per_page:
+            return
+        cursor = (items[-1].get('created'), items[-1].get('id'))
+
+def open_export_output(path, compress):
+    """Return a text stream for the export; '-' is stdout. Files are written next to path and renamed when done."""
+    if path == '-':
+        if compress:
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'), encoding='utf-8')
+        return sys.stdout
+    tmp_path = path + '.tmp'
+    if compress:
+        return gzip.open(tmp_path, 'wt', encoding='utf-8')
+    return open(tmp_path, 'w', encoding='utf-8', newline='\n')
+
+def write_export(pages, out, export_format, stats):
+    """Stream pages of records to out as JSON lines or a phpMyAdmin-style INSERT dump"""
+    if export_format == 'sql':
+        out.write(EXPORT_SQL_HEADER.format(collection=API_COLLECTION,
+                                           generated=datetime.now(timezone.utc).strftime('%b %d, %Y at %I:%M %p UTC')))
+        insert_header = "INSERT INTO `links` (" + ", ".join(f"`{column}`" for column in EXPORT_SQL_COLUMNS) + ") VALUES\n"
+        rows_in_statement = 0
+    
+    for records in pages:
+        lines = []
+        for record in records:
+            row = export_row(record)
+            if export_format == 'jsonl':
+                lines.append(json.dumps(row, ensure_ascii=False) + '\n')
+                continue
+            row['tags'] = ', '.join(row['tags'])
+            # Statements can span pages, so each row writes the separator before it
+            if rows_in_statement == EXPORT_ROWS_PER_INSERT:
+                lines.append(";\n\n")
+                rows_in_statement = 0
+            lines.append(",\n" if rows_in_statement else insert_header)
+            lines.append("(" + ", ".join(sql_literal(row[column]) for column in EXPORT_SQL_COLUMNS) + ")")
+            rows_in_statement += 1
+        out.write(''.join(lines))
+        stats['exported'] += len(records)
+        LOG.progress(f"{progress_bar(stats['exported'], stats.get('total', 0))} Exported: {stats['exported']}")
+    
+    if export_format == 'sql':
+        if rows_in_statement:
+            out.write(";\n\n")
+        out.write("COMMIT;\n")
+
+# Export subcommand: python inseart_browser_auth.py export OUTPUT [options]
+def export_main(argv=None):
+    global POCKETBASE_URL, PB_CLIENT, LOG
+    
+    parser = argparse.ArgumentParser(
+        prog='inseart_browser_auth.py export',
+        description='Export your PocketBase links as JSON lines or as a SQL dump this importer can read back'
+    )
+    parser.add_argument('output', metavar='OUTPUT', help="Output file ('-' for stdout); a .gz suffix compresses it")
+    parser.add_argument('--format', choices=['jsonl', 'sql'], help='Output format (default: sql for .sql/.sql.gz files, otherwise jsonl)')
+    parser.add_argument('--gzip', action='store_true', help='Compress the output even without a .gz suffix')
+    parser.add_argument('--url', default=POCKETBASE_URL, help='PocketBase URL')
+    parser.add_argument('--filter', metavar='EXPR', help='Extra PocketBase filter, e.g. \'visibility = "public"\'')
+    parser.add_argument('--per-page', type=int, default=EXPORT_PER_PAGE, metavar='N', help=f'Records per request (default: {EXPORT_PER_PAGE})')
+    parser.add_argument('--workers', type=int, default=4, metavar='N', help='Pages fetched concurrently (default: 4)')
+    parser.add_argument('--cursor', action='store_true', help='Page by a (created, id) cursor instead of page numbers: sequential, but constant cost per page on large collections')
+    parser.add_argument('--chrome-profile', action='append', metavar='DIR', help='Chrome/Chromium profile (or Local Storage leveldb) directory to read the login from; repeatable')
+    parser.add_argument('--auth-cache', default=AUTH_CACHE_PATH, metavar='PATH', help=f'File caching the validated auth token between runs (default: {AUTH_CACHE_PATH})')
+    parser.add_argument('--no-auth-cache', action='store_true', help='Always read the token from the browser and do not cache it')
+    parser.add_argument('--log-format', choices=Logger.FORMATS, default='pretty', help='Console output (default: pretty)')
+    args = parser.parse_args(argv)
+    
+    if not 1 <= args.per_page <= 1000:
+        parser.error("--per-page must be between 1 and 1000")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    compress = args.gzip or args.output.endswith('.gz')
+    export_format = args.format or ('sql' if args.output.removesuffix('.gz').endswith('.sql') else 'jsonl')
+    
+    # Messages go to stderr when the export itself is written to stdout
+    LOG = Logger(args.log_format, stream=sys.stderr if args.output == '-' else None)
+    atexit.register(lambda: LOG.flush())
+    POCKETBASE_URL = args.url
+    PB_CLIENT = PocketBaseClient(POCKETBASE_URL, max_connections=args.workers)
+    
+    print_header("LinkSync PocketBase Export")
+    print_info(f"PocketBase URL: {POCKETBASE_URL}")
+    print_info(f"Output: {args.output} ({export_format}{', gzip' if compress else ''})")
+    
+    auth_cache = None if args.no_auth_cache else args.auth_cache
+    auth_token, user_id = load_cached_auth(auth_cache) if auth_cache else (None, None)
+    if auth_token and user_id:
+        print_success(f"Using cached authentication for user ID: {user_id}")
+    else:
+        auth_token, user_id = get_browser_auth(args.chrome_profile)
+    if not auth_token or not user_id:
+        print_error("Failed to get authentication from browser. Exiting.")
+        sys.exit(1)
+    auth_session = AuthSession(auth_token, user_id, auth_cache)
+    auth_session.save()
+    auth_session.start_refresher()
+    
+    record_filter = f'user = "{user_id}"'
+    if args.filter:
+        record_filter += f' && ({args.filter})'
+    stats = {'exported': 0}
+    if args.cursor:
+        pages = iter_export_cursor(auth_session, record_filter, args.per_page, stats)
+    else:
+        pages = iter_export_pages(auth_session, record_filter, args.per_page, args.workers, stats)
+    
+    started = time.monotonic()
+    out = open_export_output(args.output, compress)
+    try:
+        write_export(pages, out, export_format, stats)
+        if out is not sys.stdout:
+            out.close()
+        if args.output != '-':
+            os.replace(args.output + '.tmp', args.output)
+    except (urllib.error.URLError, ValueError, OSError) as e:
+        LOG.end_progress()
+        detail = e.read().decode('utf-8', errors='ignore')[:200] if isinstance(e, urllib.error.HTTPError) else e
+        print_error(f"Export failed after {stats['exported']} records: {detail}")
+        if args.output != '-':
+            out.close()
+            os.remove(args.output + '.tmp')
+        sys.exit(1)
+    except KeyboardInterrupt:
+        LOG.end_progress()
+        print_warning("Export interrupted; no output file was written")
+        if args.output != '-':
+            out.close()
+            os.remove(args.output + '.tmp')
+        sys.exit(130)
+    finally:
+        auth_session.stop()
+        PB_CLIENT.close()
+    
+    LOG.end_progress()
+    elapsed = time.monotonic() - started
+    print_success(f"Exported {stats['exported']} links to {args.output} "
+                  f"in {elapsed:.1f}s ({stats['exported'] / elapsed if elapsed > 0 else 0:.0f} links/sec)")
+    LOG.record('summary', exported=stats['exported'], output=args.output, format=export_format, seconds=round(elapsed, 3))
+
 def main():
-    global POCKETBASE_URL
+    global POCKETBASE_URL, FAVICON_CACHE, PB_CLIENT, THROTTLE, HTML_MAX_BYTES, FETCH_SCHEDULER, FAVICON_DEADLINE, FAVICON_PROBE_WORKERS, LOG, ICON_STORE, FILL_METADATA
     
     # Get configuration from command-line arguments
     parser = argparse.ArgumentParser(description='Import links from SQL file to PocketBase using browser authentication')
-    parser.add_argument('--sql-file', default=os.path.join(os.path.dirname(__file__), "links.sql"), help='Path to SQL file')
+    parser.add_argument('inputs', nargs='*', metavar='INPUT', help='SQL dumps, CSV, JSONL or bookmark HTML exports to import; glob patterns and .gz files are accepted')
+    parser.add_argument('--sql-file', help='Path to SQL file (default: links.sql next to this script when no INPUT is given)')
+    parser.add_argument('--input-workers', type=int, default=4, metavar='N', help='Read up to N input files concurrently (default: 4)')
+    parser.add_argument('--parse-workers', type=int, default=1, metavar='N', help='Parse the SQL dump with N worker processes (default: 1)')
+    parser.add_argument('--unordered', action='store_true', help='With --parse-workers, import rows in the order blocks finish parsing instead of file order')
+    parser.add_argument('--chrome-profile', action='append', metavar='DIR', help='Chrome/Chromium profile (or Local Storage leveldb) directory to read the login from; repeatable')
+    parser.add_argument('--auth-cache', default=AUTH_CACHE_PATH, metavar='PATH', help=f'File caching the validated auth token between runs (default: {AUTH_CACHE_PATH})')
+    parser.add_argument('--no-auth-cache', action='store_true', help='Always read the token from the browser and do not cache it')
+    parser.add_argument('--direct-db', metavar='PATH', help='Write straight into a stopped PocketBase data file (e.g. pb_data/data.db) instead of using the API')
+    parser.add_argument('--user-id', metavar='ID', help='With --direct-db, owner of the imported links (skips browser authentication)')
     parser.add_argument('--skip-favicons', action='store_true', help='Skip favicon fetching (faster but links will have no icons)')
     parser.add_argument('--url', default=POCKETBASE_URL, help='PocketBase URL')
+    parser.add_argument('--fill-metadata', action='store_true',
+                        help="Fill empty descriptions and placeholder names (empty, or just the URL) from the page's title and og/meta description, using the same fetch as the favicon")
+    parser.add_argument('--self-host-icons', action='store_true',
+                        help=f'Download each favicon, dedupe by content hash and upload it once to the "{ICON_COLLECTION}" collection so links use the PocketBase file instead of an external URL')
+    parser.add_argument('--favicon-workers', type=int, default=0, metavar='N', help='Resolve favicons with N concurrent workers ahead of the writer (0 = sequential)')
+    parser.add_argument('--batch-size', type=int, default=1, metavar='N', help='Create links in PocketBase /api/batch transactions of N records (1 = one request per link)')
+    parser.add_argument('--writers', type=int, default=1, metavar='N', help='Number of parallel writer workers sending records to PocketBase (default: 1)')
+    parser.add_argument('--max-in-flight', type=int, default=0, metavar='N', help='Maximum concurrent PocketBase requests (default: number of writers)')
+    parser.add_argument('--min-rps', type=float, default=1, metavar='N', help='Lowest PocketBase request rate the adaptive throttle backs off to (default: 1)')
+    parser.add_argument('--max-rps', type=float, default=50, metavar='N', help='Highest PocketBase request rate the adaptive throttle ramps up to (default: 50)')
+    parser.add_argument('--queue-size', type=int, default=1000, metavar='N', help='Links buffered between pipeline stages (default: 1000)')
+    parser.add_argument('--journal', metavar='PATH', help='Checkpoint journal file (default: <sql-file>.journal.sqlite)')
+    parser.add_argument('--resume', action='store_true', help='Skip rows the journal marks as imported and retry only failed or pending ones')
+    parser.add_argument('--sync', action='store_true', help='Incremental sync against the journal: create new rows and PATCH changed fields of existing ones')
+    parser.add_argument('--sync-delete', action='store_true', help='With --sync, also delete records whose rows are no longer in the dump')
+    parser.add_argument('--no-dedup', action='store_true', help='Do not pre-fetch existing links; rely on PocketBase unique errors instead')
+    parser.add_argument('--html-max-bytes', type=int, default=HTML_MAX_BYTES, metavar='N', help=f'Maximum bytes of a page read while looking for icons (default: {HTML_MAX_BYTES})')
+    parser.add_argument('--favicon-deadline', type=float, default=FAVICON_DEADLINE, metavar='SECONDS', help=f'Time budget for finding one link\'s favicon; candidates are probed in parallel (default: {FAVICON_DEADLINE:g})')
+    parser.add_argument('--per-host-limit', type=int, default=2, metavar='N', help='Maximum concurrent favicon requests to one host (default: 2)')
+    parser.add_argument('--per-host-delay', type=float, default=0.1, metavar='SECONDS', help='Minimum delay between favicon requests to one host (default: 0.1)')
+    parser.add_argument('--metrics-out', metavar='PATH', help='Write per-phase timings and counters for the run to PATH')
+    parser.add_argument('--metrics-format', choices=['json', 'prometheus'], help='Format for --metrics-out (default: prometheus for .prom/.txt files, otherwise json)')
+    parser.add_argument('--log-format', choices=Logger.FORMATS, default='pretty',
+                        help='Console output: colored text with a progress bar, one JSON object per line (log messages and per-link outcomes), or errors only (default: pretty)')
+    parser.add_argument('--profile', metavar='PATH', help='Profile the run (all pipeline threads) with cProfile and write the stats to PATH')
+    parser.add_argument('--favicon-cache', metavar='PATH', help='SQLite file used to cache resolved favicons per domain between runs')
+    parser.add_argument('--favicon-cache-ttl', type=float, default=30, metavar='DAYS', help='Days before a cached favicon is re-resolved (default: 30)')
+    parser.add_argument('--favicon-miss-ttl', type=float, default=1, metavar='DAYS', help='Days before a domain without a favicon is probed again (default: 1)')
+    parser.add_argument('--favicon-cache-size', type=int, default=10000, metavar='N', help='Maximum number of domains kept in the favicon cache (default: 10000)')
     args = parser.parse_args()
     
+    LOG = Logger(args.log_format)
+    atexit.register(lambda: LOG.flush())
+    
+    if args.favicon_workers < 0:
+        parser.error("--favicon-workers must be 0 or greater")
+    if args.parse_workers < 1 or args.input_workers < 1:
+        parser.error("--parse-workers and --input-workers must be at least 1")
+    patterns = args.inputs + ([args.sql_file] if args.sql_file else [])
+    input_paths = expand_input_patterns(patterns or [os.path.join(os.path.dirname(__file__), "links.sql")])
+    if not input_paths:
+        parser.error("no input files")
+    unsupported = [path for path in input_paths if get_source_reader(path) is None]
+    if unsupported:
+        parser.error(f"unsupported input format: {', '.join(unsupported)} (expected {', '.join(sorted(SOURCE_READERS))}, optionally .gz)")
+    names = {}
+    for path in input_paths:
+        # Rows are journaled by file name, so two inputs must not share one
+        other = names.setdefault(source_name(path), path)
+        if other != path:
+            parser.error(f"inputs {other} and {path} have the same file name; rename one or import them separately")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.queue_size < 1:
+        parser.error("--queue-size must be at least 1")
+    if args.writers < 1:
+        parser.error("--writers must be at least 1")
+    if args.max_in_flight < 0:
+        parser.error("--max-in-flight must be 0 or greater")
+    if args.min_rps <= 0 or args.max_rps < args.min_rps:
+        parser.error("--min-rps must be positive and no greater than --max-rps")
+    if args.html_max_bytes < 1024:
+        parser.error("--html-max-bytes must be at least 1024")
+    if args.favicon_deadline <= 0:
+        parser.error("--favicon-deadline must be positive")
+    if args.per_host_limit < 1 or args.per_host_delay < 0:
+        parser.error("--per-host-limit must be at least 1 and --per-host-delay 0 or greater")
+    if args.favicon_cache_size < 1:
+        parser.error("--favicon-cache-size must be at least 1")
+    if args.sync_delete and not args.sync:
+        parser.error("--sync-delete requires --sync")
+    if args.sync and (args.resume or args.direct_db):
+        parser.error("--sync cannot be combined with --resume or --direct-db")
+    if args.fill_metadata and args.sync:
+        parser.error("--fill-metadata cannot be combined with --sync (filled fields would be overwritten as source changes)")
+    if args.self_host_icons and (args.skip_favicons or args.direct_db):
+        parser.error("--self-host-icons cannot be combined with --skip-favicons or --direct-db")
+    if args.user_id and not args.direct_db:
+        parser.error("--user-id can only be used with --direct-db")
+    
+    profiler = None
+    if args.profile:
+        profiler = RunProfiler()
+        profiler.start()
+    
     POCKETBASE_URL = args.url
+    HTML_MAX_BYTES = args.html_max_bytes
+    FAVICON_DEADLINE = args.favicon_deadline
+    # Every link being resolved needs its own probe threads, or its probes queue behind another link's
+    FAVICON_PROBE_WORKERS = max(1, args.favicon_workers) * FAVICON_PROBES_PER_LINK
+    FETCH_SCHEDULER = HostScheduler(max_per_host=args.per_host_limit, min_delay=args.per_host_delay)
+    PB_CLIENT = PocketBaseClient(POCKETBASE_URL, max_connections=args.max_in_flight or args.writers)
     
     print_header("LinkSync SQL to PocketBase Importer (Browser Auth)")
     print_info(f"PocketBase URL: {POCKETBASE_URL}")
-    print_info(f"SQL File: {args.sql_file}")
+    if len(input_paths) == 1:
+        print_info(f"Input File: {input_paths[0]}")
+    else:
+        print_info(f"Input Files: {len(input_paths)} ({', '.join(input_paths[:3])}{', ...' if len(input_paths) > 3 else ''})")
     print_info(f"Favicon Fetching: {'Disabled' if args.skip_favicons else 'Enabled'}")
+    FILL_METADATA = args.fill_metadata
+    if FILL_METADATA:
+        print_info("Metadata: filling empty descriptions and placeholder names from each page")
+    if args.batch_size > 1:
+        print_info(f"Batch Size: {args.batch_size}")
+    print_info(f"Request Rate: adaptive, {args.min_rps:g}-{args.max_rps:g} req/s")
+    if args.writers > 1:
+        print_info(f"Writers: {args.writers} (max {PB_CLIENT.max_connections} requests in flight)")
+    if args.favicon_workers and not args.skip_favicons:
+        print_info(f"Favicon Workers: {args.favicon_workers}")
+    if args.favicon_cache and not args.skip_favicons:
+        try:
+            FAVICON_CACHE = FaviconCache(
+                args.favicon_cache,
+                hit_ttl=args.favicon_cache_ttl * 86400,
+                miss_ttl=args.favicon_miss_ttl * 86400,
+                max_entries=args.favicon_cache_size
+            )
+            print_info(f"Favicon Cache: {args.favicon_cache}")
+        except sqlite3.Error as e:
+            print_warning(f"Could not open favicon cache {args.favicon_cache}: {e}")
     
     # Parse SQL file
-    print_header("Step 1: Parsing SQL File")
-    links = parse_sql_file(args.sql_file)
-    if not links:
-        print_error("No links found in the SQL file. Exiting.")
+    print_header("Step 1: Reading Input Files")
+    # One progress dict per input; totals are known up front so the bar does not jump
+    source_stats = [{'total_bytes': os.path.getsize(path) if os.path.isfile(path) else 0} for path in input_paths]
+    links = iter_sources(input_paths, source_stats, args.input_workers, args.parse_workers, not args.unordered)
+    # Rows are parsed lazily; peek at the first one to fail fast on empty dumps
+    first_link = next(links, None)
+    if first_link is None:
+        print_error("No links found in the input files. Exiting.")
         sys.exit(1)
+    links = itertools.chain([first_link], links)
     
     # Get browser authentication
     print_header("Step 2: Getting Browser Authentication")
-    auth_token, user_id = get_browser_auth()
-    if not auth_token or not user_id:
+    auth_cache = None if args.no_auth_cache else args.auth_cache
+    auth_token, user_id = load_cached_auth(auth_cache) if auth_cache else (None, None)
+    if args.direct_db and args.user_id:
+        auth_token, user_id = None, args.user_id
+        print_info(f"Importing for user ID: {user_id}")
+    elif auth_token and user_id:
+        print_success(f"Using cached authentication for user ID: {user_id}")
+    else:
+        auth_token, user_id = get_browser_auth(args.chrome_profile)
+    if not user_id or not (auth_token or args.user_id):
         print_error("Failed to get authentication from browser. Exiting.")
         sys.exit(1)
+    # Writers share the session so a background refresh reaches all of them
+    auth_session = AuthSession(auth_token, user_id, auth_cache)
+    if auth_token:
+        auth_session.save()
+    
+    direct_writer = None
+    if args.direct_db:
+        try:
+            direct_writer = DirectDbWriter(args.direct_db, user_id)
+        except (ValueError, sqlite3.Error) as e:
+            print_error(f"Refusing to write to {args.direct_db}: {e}")
+            sys.exit(1)
+        print_warning(f"Writing directly to {args.direct_db}; PocketBase must not be running")
+    else:
+        auth_session.start_refresher()
+    
+    if args.self_host_icons:
+        ICON_STORE = IconStore(auth_session)
+        try:
+            print_info(f"Self-hosting favicons in '{ICON_COLLECTION}' ({ICON_STORE.load_existing()} already uploaded)")
+        except urllib.error.HTTPError as e:
+            print_error(f"Could not list the '{ICON_COLLECTION}' collection ({e.code}); see POCKETBASE_SETUP.md")
+            sys.exit(1)
+        except (urllib.error.URLError, ValueError) as e:
+            print_error(f"Could not list the '{ICON_COLLECTION}' collection: {e}")
+            sys.exit(1)
     
     # Insert links into PocketBase
     print_header("Step 3: Inserting Links into PocketBase")
@@ -622,65 +3927,271 @@ def main():
     favicon_count = 0
     failed_count = 0
     
-    print_info(f"Starting import of {len(links)} links...")
+    if len(input_paths) == 1:
+        journal_path = args.journal or f"{input_paths[0]}.journal.sqlite"
+    else:
+        journal_path = args.journal or os.path.join(os.path.dirname(input_paths[0]), "import.journal.sqlite")
+    try:
+        journal = ImportJournal(journal_path)
+        journal.upgrade_row_keys(input_paths)
+    except sqlite3.Error as e:
+        print_error(f"Could not open import journal {journal_path}: {e}")
+        sys.exit(1)
+    print_info(f"Import journal: {journal_path}")
     
-    for i, link in enumerate(links):
-        progress = progress_bar(i, len(links))
+    skip_stats = {'skipped': 0, 'existing': 0, 'unchanged': 0}
+    existing_links = deque()
+    if args.resume:
+        done_ids = journal.done_ids()
+        print_info(f"Resuming: {len(done_ids)} links already imported will be skipped")
         
-        # Show more detailed progress
-        status_icon = "⚙️"
-        print(f"\r{progress} {status_icon} Processing: {link['name'][:40]}{'...' if len(link['name']) > 40 else ''}   ", end='', flush=True)
+        def skip_done(links):
+            for link in links:
+                if str(link.original_id) in done_ids:
+                    skip_stats['skipped'] += 1
+                    continue
+                yield link
         
-        result = insert_link(link, auth_token, user_id, args.skip_favicons)
-        success, has_favicon = result
+        links = skip_done(links)
+    
+    sync_state = None
+    sync_updates = []
+    sync_counts = {'updated': 0, 'deleted': 0, 'failed': 0}
+    if args.sync:
+        # Rows the journal knows are compared by hash; whatever is left afterwards was removed from the dump.
+        # Rows journaled for other inputs are never considered removed.
+        sync_state = journal.sync_state(source_row_prefixes(input_paths))
+        print_info(f"Sync: comparing against {len(sync_state)} previously imported links")
+        
+        def split_sync_changes(links):
+            for link in links:
+                state = sync_state.pop(str(link.original_id), None)
+                if state is None:
+                    yield link
+                    continue
+                record_id, old_hashes = state
+                field_hashes = link_field_hashes(link)
+                fields = changed_sync_fields(old_hashes, field_hashes)
+                if fields:
+                    sync_updates.append((link, record_id, fields, field_hashes))
+                else:
+                    skip_stats['unchanged'] += 1
         
-        if success:
-            success_count += 1
-            if has_favicon:
-                favicon_count += 1
-                status_icon = "✅"
+        links = split_sync_changes(links)
+    
+    # Pipeline: parse -> dedupe -> enrich -> write -> journal. Each stage runs in
+    # its own thread(s) behind a bounded queue, so the slowest one sets the pace
+    # and holds back the others instead of letting work pile up in memory.
+    parsed = links
+    links = iter_buffered([lambda: parsed], args.queue_size, 'parse')
+    
+    if not args.no_dedup:
+        print_info("Fetching existing links for duplicate detection...")
+        if direct_writer is not None:
+            existing_urls = direct_writer.existing_urls()
+        else:
+            existing_urls = fetch_existing_urls(auth_session, user_id, workers=PB_CLIENT.max_connections)
+        if existing_urls is None:
+            print_warning("Continuing without pre-flight duplicate detection")
+        else:
+            print_info(f"Found {len(existing_urls)} existing links")
+            
+            def skip_existing(links):
+                for link in links:
+                    url_key = duplicate_url_key(link.url)
+                    if url_key in existing_urls:
+                        skip_stats['existing'] += 1
+                        # The journal is written by the last stage only
+                        existing_links.append(link)
+                        continue
+                    # Later rows with the same URL are duplicates of this one
+                    existing_urls.add(url_key)
+                    yield link
+            
+            deduped = skip_existing(links)
+            links = iter_buffered([lambda: deduped], args.queue_size, 'dedupe')
+    
+    print_info(f"Starting import of links from {', '.join(input_paths) if len(input_paths) <= 3 else f'{len(input_paths)} files'}...")
+    
+    if args.favicon_workers and not args.skip_favicons:
+        enriched = iter_links_with_favicons(links, args.favicon_workers)
+        link_stream = iter_buffered([lambda: enriched], args.queue_size, 'enrich')
+    else:
+        link_stream = ((link, None) for link in links)
+    
+    THROTTLE = RateController(min_rps=args.min_rps, max_rps=args.max_rps)
+    import_started = time.monotonic()
+    processed_count = 0
+    if direct_writer is not None:
+        direct_batch_size = args.batch_size if args.batch_size > 1 else DIRECT_DB_BATCH_SIZE
+        results = iter_direct_insert_results(link_stream, direct_writer, args.skip_favicons, direct_batch_size)
+    else:
+        results = iter_insert_results(link_stream, auth_session, user_id, args.skip_favicons, args.batch_size, args.writers)
+    written = results
+    results = iter_buffered([lambda: written], args.queue_size, 'write')
+    try:
+        for link, result in results:
+            while existing_links:
+                existing = existing_links.popleft()
+                journal.record(existing.original_id, 'exists')
+                LOG.row(existing, 'exists')
+            # Progress is measured by how far into the dump the parser has read
+            progress = progress_bar(sum(stats.get('bytes_read', 0) for stats in source_stats),
+                                    sum(stats.get('total_bytes', 0) for stats in source_stats))
+            processed_count += 1
+            success, has_favicon = result
+            
+            if not success:
+                journal.record(link.original_id, 'failed')
+                LOG.row(link, 'failed')
+            elif link.record_id:
+                journal.record(link.original_id, 'committed', link.record_id, link_field_hashes(link))
+                LOG.row(link, 'imported', has_favicon)
+            else:
+                journal.record(link.original_id, 'exists')
+                LOG.row(link, 'exists', has_favicon)
+            
+            if success:
+                success_count += 1
+                if has_favicon:
+                    favicon_count += 1
+                    status_icon = "✅"
+                else:
+                    status_icon = "📝"
             else:
-                status_icon = "📝"
+                failed_count += 1
+                status_icon = "❌"
+                # If we have too many consecutive failures, check if server is still running
+                if direct_writer is None and failed_count > 5 and (failed_count % 5 == 0):
+                    print_warning("Multiple failures detected. Checking server status...")
+                    try:
+                        test_req = urllib.request.Request(f"{POCKETBASE_URL}/api/health")
+                        with urllib.request.urlopen(test_req, timeout=5) as test_response:
+                            if test_response.status == 200:
+                                print_info("Server is still running, continuing...")
+                            else:
+                                print_warning(f"Server returned status {test_response.status}")
+                    except Exception as e:
+                        print_error(f"Cannot reach server: {e}")
+                        print_error("Stopping import due to server connectivity issues")
+                        break
+            
+            # Update progress with status
+            LOG.progress(f"{progress} {status_icon} Processed: {link.name[:40]}{'...' if len(link.name) > 40 else ''}")
         else:
-            failed_count += 1
-            status_icon = "❌"
-            # If we have too many consecutive failures, check if server is still running
-            if failed_count > 5 and (failed_count % 5 == 0):
-                print(f"\n⚠ Multiple failures detected. Checking server status...")
-                try:
-                    test_req = urllib.request.Request(f"{POCKETBASE_URL}/api/health")
-                    with urllib.request.urlopen(test_req, timeout=5) as test_response:
-                        if test_response.status == 200:
-                            print_info("Server is still running, continuing...")
-                        else:
-                            print_warning(f"Server returned status {test_response.status}")
-                except Exception as e:
-                    print_error(f"Cannot reach server: {e}")
-                    print_error("Stopping import due to server connectivity issues")
-                    break
-        
-        # Update progress with status
-        print(f"\r{progress} {status_icon} Processed: {link['name'][:40]}{'...' if len(link['name']) > 40 else ''}   ", end='', flush=True)
-        
-        # Small delay to prevent overwhelming the server
-        time.sleep(0.2)  # Slightly longer delay to give favicon fetching time
+            # All new rows were written; now apply updates (and deletions) to existing records
+            if args.sync:
+                removed = []
+                if args.sync_delete and all(stats.get('complete') for stats in source_stats):
+                    removed = [(original_id, record_id) for original_id, (record_id, _) in sync_state.items()]
+                elif args.sync_delete:
+                    print_warning("The dump was not read completely or had rows that could not be parsed; not deleting any records")
+                print_info(f"Sync: {len(sync_updates)} links to update, {len(removed)} to delete")
+                sync_counts = apply_sync_changes(sync_updates, removed, auth_session, journal, args.writers)
+    except KeyboardInterrupt:
+        print_warning("Import interrupted; rerun with --resume to continue where it stopped")
+    finally:
+        # Stop every stage, last first, and wait for their threads before closing what they write to
+        results.close()
+        link_stream.close()
+        links.close()
+        while existing_links:
+            existing = existing_links.popleft()
+            journal.record(existing.original_id, 'exists')
+            LOG.row(existing, 'exists')
+        journal.close()
+        auth_session.stop()
+        if direct_writer is not None:
+            direct_writer.close()
     
     # Clear the progress bar line
-    print("\r" + " " * 80 + "\r", end='')
+    LOG.end_progress()
     
     # Summary
     print_header("Import Summary")
-    print_info(f"Total links processed: {len(links)}")
+    import_elapsed = time.monotonic() - import_started
+    print_info(f"Total links processed: {processed_count}")
+    if direct_writer is not None:
+        print_info(f"Import rate: {processed_count / import_elapsed if import_elapsed > 0 else 0:.1f} links/sec")
+    else:
+        print_info(f"Import rate: {processed_count / import_elapsed if import_elapsed > 0 else 0:.1f} links/sec "
+                   f"({THROTTLE.achieved_rate():.1f} req/sec, final limit {THROTTLE.rate:.1f} req/sec, {THROTTLE.backoffs} backoffs)")
+    if skip_stats['skipped']:
+        print_info(f"Skipped (already imported): {skip_stats['skipped']}")
+    if skip_stats['existing']:
+        print_info(f"Skipped (already in PocketBase): {skip_stats['existing']}")
+    if args.sync:
+        print_info(f"Sync: {skip_stats['unchanged']} unchanged, {sync_counts['updated']} updated, "
+                   f"{sync_counts['deleted']} deleted, {sync_counts['failed']} failed")
     print_success(f"Successfully imported: {success_count}")
     if not args.skip_favicons:
         print_info(f"Links with favicons: {favicon_count}")
-    if success_count < len(links):
-        print_warning(f"Failed to import: {len(links) - success_count}")
+    if not args.skip_favicons:
+        print_info(f"DNS cache hits: {FETCH_SCHEDULER.dns_hits} (lookups: {FETCH_SCHEDULER.dns_misses})")
+    if FILL_METADATA:
+        filled = {counter['labels']['field']: counter['value'] for counter in METRICS.to_json()['counters']
+                  if counter['name'] == 'metadata_filled'}
+        print_info(f"Metadata filled: {filled.get('name', 0)} names, {filled.get('description', 0)} descriptions")
+    if ICON_STORE is not None:
+        print_info(f"Self-hosted icons: {ICON_STORE.uploads} uploaded, {ICON_STORE.reused} reused "
+                   f"(from {ICON_STORE.downloads} distinct favicon URLs)")
+    if auth_session.refreshes:
+        print_info(f"Auth token refreshes: {auth_session.refreshes}")
+    if FAVICON_CACHE is not None:
+        print_info(f"Favicon cache hits: {FAVICON_CACHE.hits} (misses: {FAVICON_CACHE.misses})")
+        FAVICON_CACHE.close()
+    PB_CLIENT.close()
+    FETCH_SCHEDULER.close()
+    if PROBE_EXECUTOR is not None:
+        PROBE_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    if success_count < processed_count:
+        print_warning(f"Failed to import: {processed_count - success_count}")
+    
+    # Where the time went (summed over all workers, so phases can overlap)
+    phases = METRICS.to_json()['phases']
+    if phases:
+        print_info("Time by phase: " + ", ".join(
+            f"{phase} {data['sum']:.1f}s/{data['count']}" for phase, data in sorted(phases.items())
+        ))
+    # A stage that keeps waiting on upstream is starved; one that waits on downstream is ahead of the bottleneck
+    stage_waits = {}
+    for counter in METRICS.to_json()['counters']:
+        if counter['name'] == 'stage_blocked_seconds':
+            waits = stage_waits.setdefault(counter['labels']['stage'], {'upstream': 0, 'downstream': 0})
+            waits[counter['labels']['waiting']] = counter['value']
+    if stage_waits:
+        print_info("Stage waits (for input / for output): " + ", ".join(
+            f"{stage} {waits['upstream']:.1f}s/{waits['downstream']:.1f}s" for stage, waits in stage_waits.items()
+        ))
+    
+    if args.metrics_out:
+        METRICS.set_gauge('links', processed_count, result='processed')
+        METRICS.set_gauge('links', success_count, result='success')
+        METRICS.set_gauge('links', processed_count - success_count, result='failed')
+        METRICS.set_gauge('links', favicon_count, result='with_favicon')
+        METRICS.set_gauge('links', skip_stats['skipped'], result='skipped_journal')
+        METRICS.set_gauge('links', skip_stats['existing'], result='skipped_existing')
+        METRICS.set_gauge('duration_seconds', round(import_elapsed, 3))
+        try:
+            METRICS.write(args.metrics_out, args.metrics_format)
+            print_info(f"Metrics written to: {args.metrics_out}")
+        except OSError as e:
+            print_error(f"Could not write metrics to {args.metrics_out}: {e}")
+    
+    if profiler is not None:
+        threads = profiler.dump(args.profile)
+        print_info(f"Profile of {threads} thread(s) written to: {args.profile} (inspect with: python -m pstats {args.profile})")
     
-    print(f"\n{Colors.GREEN}{Colors.BOLD}Import process completed!{Colors.END}")
+    LOG.record('summary', processed=processed_count, imported=success_count, failed=processed_count - success_count,
+               with_favicon=favicon_count, skipped_journal=skip_stats['skipped'], skipped_existing=skip_stats['existing'],
+               seconds=round(import_elapsed, 3))
+    LOG.text(f"\n{Colors.GREEN}{Colors.BOLD}Import process completed!{Colors.END}")
     
     if success_count > 0:
         print_info(f"You can view your links at: {POCKETBASE_URL}/_/#/collections/links/records")
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ['export']:
+        export_main(sys.argv[2:])
+    else:
+        main()
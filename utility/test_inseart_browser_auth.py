@@ -0,0 +1,748 @@
+#!/usr/bin/env python3
+"""
+Unit tests for inseart_browser_auth.py
+
+Usage:
+    python -m unittest test_inseart_browser_auth
+"""
+import io
+import http.server
+import json
+import os
+import pstats
+import re
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import inseart_browser_auth as importer
+
+COLUMNS = "(`id`, `url`, `name`, `description`, `tags`, `username`, `email`, `added_date`, `visibility`, `clicks`)"
+
+def sql_row(row_id, added_date="'2024-01-01 00:00:00'", description=None):
+    description = description or f"Row; {row_id}"
+    return f"({row_id}, 'https://example{row_id}.com', 'Site {row_id}', '{description}', 'a,b', 'user', 'user@example.com', {added_date}, 'public', 0)"
+
+def sql_insert(rows):
+    return f"INSERT INTO `links` {COLUMNS} VALUES\n" + ",\n".join(rows) + ";\n"
+
+
+class QuietLogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.log, importer.LOG = importer.LOG, importer.Logger('quiet', stream=io.StringIO())
+
+    def tearDown(self):
+        importer.LOG = self.log
+
+
+class ExtractIconCandidatesTest(unittest.TestCase):
+    def test_og_image_with_either_attribute_order(self):
+        for tag in ('<meta property="og:image" content="/og.png">',
+                    '<meta content="/og.png" property="og:image">',
+                    "<META CONTENT='/og.png' PROPERTY='OG:IMAGE' />"):
+            with self.subTest(tag=tag):
+                self.assertEqual(importer.extract_icon_candidates(tag), ['/og.png'])
+
+    def test_link_icons_with_either_attribute_order(self):
+        for rel in ('apple-touch-icon', 'icon', 'shortcut icon'):
+            for tag in (f'<link rel="{rel}" href="/i.png">',
+                        f'<link href="/i.png" rel="{rel}">',
+                        f"<link type=image/png href='/i.png' rel='{rel.upper()}'/>"):
+                with self.subTest(tag=tag):
+                    self.assertEqual(importer.extract_icon_candidates(tag), ['/i.png'])
+
+    def test_apple_touch_icon_precomposed(self):
+        html = '<link href="/touch.png" rel="apple-touch-icon-precomposed" sizes="180x180">'
+        self.assertEqual(importer.extract_icon_candidates(html), ['/touch.png'])
+
+    def test_priority_order_and_duplicates(self):
+        html = """<head>
+            <link rel="shortcut icon" href="/favicon.ico">
+            <link rel="icon" href="/icon-32.png">
+            <link href="/icon-16.png" rel="icon">
+            <link rel="apple-touch-icon" href="/touch.png">
+            <meta content="/og.png" property="og:image">
+            <link rel="icon" href="/og.png">
+            <link rel="icon" href="/icon-32.png">
+            <link rel="stylesheet" href="/style.css">
+            <link rel="icon">
+        </head>"""
+        self.assertEqual(importer.extract_icon_candidates(html),
+                         ['/og.png', '/touch.png', '/icon-32.png', '/icon-16.png', '/favicon.ico'])
+
+
+class HostSchedulerDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        # Connections are accepted by the kernel but never answered
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(16)
+        self.addCleanup(self.server.close)
+        self.url = f"http://silent.test:{self.server.getsockname()[1]}/favicon.ico"
+        self.scheduler = importer.HostScheduler(max_per_host=1, min_delay=0, resolver=lambda host, port: '127.0.0.1')
+        self.addCleanup(self.scheduler.close)
+
+    def test_socket_timeout_is_cut_to_the_deadline(self):
+        started = time.monotonic()
+        with self.assertRaises(OSError):
+            self.scheduler.request('HEAD', self.url, timeout=10, deadline=started + 0.3)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_waiting_for_a_host_slot_stops_at_the_deadline(self):
+        holder = threading.Thread(target=lambda: self.assertRaises(
+            OSError, self.scheduler.request, 'HEAD', self.url, timeout=10, deadline=time.monotonic() + 0.5))
+        holder.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            self.scheduler.request('HEAD', self.url, timeout=10, deadline=started + 0.1)
+        self.assertLess(time.monotonic() - started, 0.4)
+        holder.join()
+
+
+class LocalSiteHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive test site; every request is recorded as (path, client port, start time)"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path, self.client_address[1], time.monotonic()))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path == '/slow':
+                time.sleep(0.2)
+            if self.path in ('/moved', '/see-other'):
+                self.send_response(302 if self.path == '/moved' else 303)
+                self.send_header('Location', '/page')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = b'ok'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            if self.path == '/drop':
+                # Looks reusable to the client, but the server closes it once idle
+                self.close_connection = True
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    do_HEAD = do_POST = do_GET
+
+
+class HostSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), LocalSiteHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.active = self.server.max_active = 0
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.port = self.server.server_address[1]
+        self.lookups = []
+
+    def resolve(self, host, port):
+        self.lookups.append(host)
+        if host.startswith('missing.'):
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return '127.0.0.1'
+
+    def scheduler(self, **options):
+        options = dict({'max_per_host': 2, 'min_delay': 0, 'resolver': self.resolve}, **options)
+        scheduler = importer.HostScheduler(**options)
+        self.addCleanup(scheduler.close)
+        return scheduler
+
+    def url(self, path, host='site.test'):
+        return f"http://{host}:{self.port}{path}"
+
+    def test_dns_answers_are_cached(self):
+        scheduler = self.scheduler()
+        for _ in range(3):
+            scheduler.request('GET', self.url('/page'))
+        scheduler.close()
+        scheduler.request('GET', self.url('/page'))
+        self.assertEqual(self.lookups, ['site.test'])
+        self.assertEqual((scheduler.dns_misses, scheduler.dns_hits), (1, 1))
+
+    def test_dns_failures_are_cached_for_the_negative_ttl(self):
+        scheduler = self.scheduler(negative_dns_ttl=0.2)
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                scheduler.request('GET', self.url('/page', 'missing.test'))
+        self.assertEqual(self.lookups, ['missing.test'])
+        time.sleep(0.3)
+        with self.assertRaises(socket.gaierror):
+            scheduler.request('GET', self.url('/page', 'missing.test'))
+        self.assertEqual(self.lookups, ['missing.test', 'missing.test'])
+
+    def test_keep_alive_sockets_are_reused_per_host(self):
+        scheduler = self.scheduler()
+        for host in ('site.test', 'site.test', 'other.test', 'site.test', 'other.test'):
+            self.assertEqual(scheduler.request('GET', self.url('/page', host))[:3:2], (200, b'ok'))
+        ports = [request[2] for request in self.server.requests]
+        self.assertEqual(len(set(ports)), 2)
+        self.assertEqual(ports[0], ports[1])
+        self.assertEqual(ports[0], ports[3])
+        self.assertEqual(ports[2], ports[4])
+
+    def test_concurrent_requests_per_host_are_capped(self):
+        scheduler = self.scheduler(max_per_host=2)
+        threads = [threading.Thread(target=scheduler.request, args=('GET', self.url('/slow'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(self.server.max_active, 2)
+
+    def test_request_starts_per_host_are_spaced_by_min_delay(self):
+        scheduler = self.scheduler(max_per_host=4, min_delay=0.1)
+        hosts = ['site.test'] * 3 + ['other.test']
+        threads = [threading.Thread(target=scheduler.request, args=('GET', self.url(f"/page?host={host}", host)))
+                   for host in hosts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        starts = {host: sorted(when for _, path, _, when in self.server.requests if path.endswith(host))
+                  for host in set(hosts)}
+        site = starts['site.test']
+        self.assertEqual(len(site), 3)
+        self.assertGreaterEqual(site[1] - site[0], 0.09)
+        self.assertGreaterEqual(site[2] - site[1], 0.09)
+        # Another host is not held back by site.test's spacing
+        self.assertLess(starts['other.test'][0] - site[0], 0.09)
+
+    def test_redirects_are_followed(self):
+        scheduler = self.scheduler()
+        status, _, body, final_url = scheduler.request('GET', self.url('/moved'))
+        self.assertEqual((status, body, final_url), (200, b'ok', self.url('/page')))
+        status, _, _, final_url = scheduler.request('POST', self.url('/see-other'))
+        self.assertEqual((status, final_url), (200, self.url('/page')))
+        self.assertEqual([request[:2] for request in self.server.requests],
+                         [('GET', '/moved'), ('GET', '/page'), ('POST', '/see-other'), ('GET', '/page')])
+        with self.assertRaises(importer.http.client.HTTPException):
+            scheduler.request('GET', self.url('/moved'), max_redirects=0)
+
+    def test_stale_keep_alive_connection_is_retried_once(self):
+        scheduler = self.scheduler()
+        scheduler.request('GET', self.url('/drop'))
+        time.sleep(0.1)
+        status, _, body, _ = scheduler.request('GET', self.url('/page'))
+        self.assertEqual((status, body), (200, b'ok'))
+        first, second = [request[2] for request in self.server.requests]
+        self.assertNotEqual(first, second)
+
+
+class FaviconMissCacheTest(QuietLogTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = importer.FaviconCache(os.path.join(directory.name, 'favicons.sqlite'))
+        self.addCleanup(cache.close)
+        patcher = mock.patch.object(importer, 'FAVICON_CACHE', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lookup(self, page_candidates, probe):
+        with mock.patch.object(importer, 'fetch_page_icon_candidates', lambda *args: page_candidates), \
+             mock.patch.object(importer, 'probe_favicon_candidate', probe):
+            return importer.cached_fetch_favicon('https://example.com/page')
+
+    def test_answered_miss_is_cached(self):
+        self.assertEqual(self.lookup([], lambda kind, url, deadline: False), '')
+        self.assertEqual(importer.FAVICON_CACHE.get('example.com'), '')
+
+    def test_probe_error_is_not_cached(self):
+        def probe(kind, url, deadline):
+            return None if url.endswith('/favicon.ico') else False
+        self.assertEqual(self.lookup([], probe), '')
+        self.assertIsNone(importer.FAVICON_CACHE.get('example.com'))
+
+    def test_page_fetch_error_is_not_cached(self):
+        self.assertEqual(self.lookup(None, lambda kind, url, deadline: False), '')
+        self.assertIsNone(importer.FAVICON_CACHE.get('example.com'))
+
+    def test_found_favicon_is_cached(self):
+        def probe(kind, url, deadline):
+            return url.endswith('/favicon.png')
+        self.assertEqual(self.lookup(['https://example.com/broken.png'], probe), 'https://example.com/favicon.png')
+        self.assertEqual(importer.FAVICON_CACHE.get('example.com'), 'https://example.com/favicon.png')
+
+
+class ParseSqlFileTest(QuietLogTestCase):
+    def write_dump(self, text):
+        handle, path = tempfile.mkstemp(suffix='.sql')
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            file.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def parse(self, path, **kwargs):
+        stats = {}
+        ids = [link.original_id for link in importer.parse_sql_file(path, stats, **kwargs)]
+        return ids, stats
+
+    def test_malformed_row_does_not_drop_later_rows(self):
+        path = self.write_dump(
+            sql_insert([sql_row(1), sql_row(2, 'NOW()')])
+            + sql_insert([sql_row(3), sql_row(4, "_binary 'x'"), sql_row(5)])
+        )
+        ids, stats = self.parse(path)
+        self.assertEqual(ids, ['1', '3', '5'])
+        self.assertEqual(stats['skipped_rows'], 2)
+        # Rows were lost, so --sync-delete must not treat the dump as complete
+        self.assertFalse(stats['complete'])
+
+    def test_clean_dump_is_complete(self):
+        path = self.write_dump(sql_insert([sql_row(1), sql_row(2)]))
+        ids, stats = self.parse(path)
+        self.assertEqual(ids, ['1', '2'])
+        self.assertTrue(stats['complete'])
+
+    def test_sequential_and_parallel_parse_the_same_rows(self):
+        rows = [sql_row(i, 'NOW()' if i % 7 == 0 else "'2024-01-01 00:00:00'",
+                        'Tip: INSERT INTO users VALUES (1)' if i % 5 == 0 else None)
+                for i in range(1, 200)]
+        # Another table whose strings look like links statements must be stepped over
+        other = ("INSERT INTO `users` (`id`, `note`) VALUES\n"
+                 + ",\n".join(f"({i}, 'x;\\nINSERT INTO `links` VALUES\\n(9{i}, ''u'')')" for i in range(20)) + ";\n")
+        path = self.write_dump(''.join(sql_insert(rows[i:i + 30]) + other for i in range(0, len(rows), 30)))
+
+        sequential, sequential_stats = self.parse(path)
+        block_size = importer.SQL_PARALLEL_BLOCK_SIZE
+        importer.SQL_PARALLEL_BLOCK_SIZE = 1000  # Many blocks, cut both between rows and statements
+        try:
+            parallel, parallel_stats = self.parse(path, workers=2)
+        finally:
+            importer.SQL_PARALLEL_BLOCK_SIZE = block_size
+
+        self.assertEqual(len(sequential), 199 - 199 // 7)
+        self.assertEqual(sorted(sequential, key=int), sorted(parallel, key=int))
+        self.assertEqual(sequential_stats['skipped_rows'], parallel_stats['skipped_rows'])
+
+
+
+class SourceRowKeyTest(QuietLogTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        os.mkdir(os.path.join(self.directory, 'dumps'))
+        for name in ('a.sql', 'b.sql'):
+            with open(os.path.join(self.directory, 'dumps', name), 'w', encoding='utf-8') as file:
+                file.write(sql_insert([sql_row(1), sql_row(2)]))
+
+    def read_ids(self, paths):
+        return sorted(link.original_id for link in importer.iter_sources(paths, [{} for _ in paths]))
+
+    def test_keys_do_not_depend_on_path_spelling_or_input_count(self):
+        relative = os.path.relpath(os.path.join(self.directory, 'dumps', 'a.sql'))
+        absolute = os.path.join(self.directory, 'dumps', '..', 'dumps', 'a.sql')
+        other = os.path.join(self.directory, 'dumps', 'b.sql')
+        self.assertEqual(self.read_ids([relative]), ['a.sql:1', 'a.sql:2'])
+        self.assertEqual(self.read_ids([absolute, other]), ['a.sql:1', 'a.sql:2', 'b.sql:1', 'b.sql:2'])
+
+    def journal(self, rows):
+        journal = importer.ImportJournal(os.path.join(self.directory, 'import.journal.sqlite'))
+        self.addCleanup(journal.close)
+        journal._conn.execute("PRAGMA user_version = 0")
+        for original_id in rows:
+            journal.record(original_id, 'committed', f"rec{original_id}", '{}')
+        journal.flush()
+        return journal
+
+    def test_upgrade_single_input_journal(self):
+        journal = self.journal(['1', '2'])
+        journal.upgrade_row_keys(['dumps/a.sql.gz'])
+        self.assertEqual(sorted(journal.sync_state()), ['a.sql:1', 'a.sql:2'])
+        # Upgraded once only
+        journal.upgrade_row_keys(['dumps/a.sql.gz'])
+        self.assertEqual(sorted(journal.sync_state()), ['a.sql:1', 'a.sql:2'])
+
+    def test_upgrade_multi_input_journal_and_filter_by_source(self):
+        journal = self.journal(['dumps/a.sql:1', 'dumps/b.sql:1', 'elsewhere/c.sql:1'])
+        journal.upgrade_row_keys(['dumps/a.sql', 'dumps/b.sql'])
+        self.assertEqual(sorted(journal.sync_state()), ['a.sql:1', 'b.sql:1', 'elsewhere/c.sql:1'])
+        # Syncing a.sql alone must not consider b.sql's rows removed
+        self.assertEqual(list(journal.sync_state(importer.source_row_prefixes(['x/a.sql']))), ['a.sql:1'])
+
+
+class IterBufferedTest(unittest.TestCase):
+    def test_close_stops_producers_and_waits_for_them(self):
+        produced = []
+        closed = threading.Event()
+
+        def producer():
+            try:
+                for i in range(100000):
+                    time.sleep(0.001)
+                    produced.append(i)
+                    yield i
+            finally:
+                time.sleep(0.05)
+                closed.set()
+
+        stage = importer.iter_buffered([producer], maxsize=1000)
+        self.assertEqual([next(stage), next(stage)], [0, 1])
+        stage.close()
+        # The producer's iterable was closed before close() returned and nothing is produced afterwards
+        self.assertTrue(closed.is_set())
+        count = len(produced)
+        time.sleep(0.05)
+        self.assertEqual(len(produced), count)
+        self.assertLess(count, 20)
+
+    def test_producer_error_is_raised_in_consumer(self):
+        def producer():
+            yield 1
+            raise ValueError("broken")
+
+        with self.assertRaises(ValueError):
+            list(importer.iter_buffered([producer]))
+
+
+class FakeBatchPocketBase:
+    """pocketbase_request() stand-in that, like PocketBase, rolls a batch back at its first failing request"""
+
+    def __init__(self, existing_urls):
+        self.existing = set(existing_urls)
+        self.requests = []
+
+    def error(self, body):
+        return urllib.error.HTTPError('/api/batch', 400, 'Bad Request', {}, io.BytesIO(json.dumps(body).encode()))
+
+    def __call__(self, method, path, payload=None, auth_token=None, content_type=None):
+        self.requests.append(path)
+        duplicate = {'code': 400, 'message': 'Failed to create record.',
+                     'data': {'url': {'code': 'validation_not_unique', 'message': 'Value must be unique.'}}}
+        if path == '/api/batch':
+            for index, request in enumerate(payload['requests']):
+                if request['body']['url'] in self.existing:
+                    raise self.error({'data': {'requests': {str(index): {'code': 'batch_request_failed', 'response': duplicate}}}})
+            created = []
+            for request in payload['requests']:
+                self.existing.add(request['body']['url'])
+                created.append({'status': 200, 'body': {'id': f"rec{len(self.existing)}"}})
+            return 200, json.dumps(created).encode()
+        if payload['url'] in self.existing:
+            raise self.error(duplicate)
+        self.existing.add(payload['url'])
+        return 200, json.dumps({'id': f"rec{len(self.existing)}"}).encode()
+
+
+class InsertLinksBatchTest(QuietLogTestCase):
+    def batch(self, count):
+        return [(importer.LinkRecord.from_source(str(i), f"https://example{i}.com", f"Site {i}", '', ''), '', False)
+                for i in range(count)]
+
+    def test_all_duplicate_batch_falls_back_to_single_inserts(self):
+        batch = self.batch(600)
+        server = FakeBatchPocketBase(link.url for link, _, _ in batch)
+        with mock.patch.object(importer, 'pocketbase_request', server):
+            results = importer.insert_links_batch(batch, 'token', 'user1')
+        # Existing links count as imported; two rolled back batches, then one request per remaining link
+        self.assertEqual(results, [(True, False)] * 600)
+        batches = server.requests.count('/api/batch')
+        self.assertEqual(batches, importer.BATCH_MAX_ROLLBACKS)
+        self.assertEqual(len(server.requests) - batches, 600 - importer.BATCH_MAX_ROLLBACKS)
+
+    def test_one_duplicate_is_resubmitted_as_a_batch(self):
+        batch = self.batch(10)
+        server = FakeBatchPocketBase([batch[3][0].url])
+        with mock.patch.object(importer, 'pocketbase_request', server):
+            results = importer.insert_links_batch(batch, 'token', 'user1')
+        self.assertEqual(server.requests, ['/api/batch', '/api/batch'])
+        self.assertEqual(results, [(True, False)] * 10)
+        self.assertEqual(batch[3][0].record_id, '')
+        self.assertTrue(all(link.record_id for i, (link, _, _) in enumerate(batch) if i != 3))
+
+
+class DuplicateUrlKeyTest(unittest.TestCase):
+    def test_matches_the_app_duplicate_check(self):
+        key = importer.duplicate_url_key
+        self.assertEqual(key('http://example.com/'), key('https://example.com'))
+        self.assertEqual(key('https://example.com/a/'), 'example.com/a')
+        self.assertNotEqual(key('https://app.example.com/#/a'), key('https://app.example.com/#/b'))
+        self.assertNotEqual(key('https://example.com/?q=1'), key('https://example.com/?q=2'))
+
+
+LINK_FIELDS = [
+    {'name': 'url', 'type': 'url'}, {'name': 'name', 'type': 'text'},
+    {'name': 'description', 'type': 'text'}, {'name': 'tags', 'type': 'json'},
+    {'name': 'visibility', 'type': 'select'}, {'name': 'favicon', 'type': 'text'},
+    {'name': 'user', 'type': 'relation'},
+]
+
+
+def make_data_db(path, fields_column='fields', fields=LINK_FIELDS, columns=importer.DirectDbWriter.REQUIRED_COLUMNS):
+    """A data.db with the `links` collection laid out the way POCKETBASE_SETUP.md describes it"""
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(f"CREATE TABLE _collections (id TEXT PRIMARY KEY, name TEXT UNIQUE, {fields_column} JSON)")
+        conn.execute("INSERT INTO _collections VALUES ('pbc_links', 'links', ?)", (json.dumps(fields),))
+        conn.execute("CREATE TABLE users (id TEXT PRIMARY KEY)")
+        conn.execute("INSERT INTO users VALUES ('user1')")
+        conn.execute(f"CREATE TABLE links ({', '.join(f'[{c}] TEXT' for c in columns)})")
+        if 'url' in columns:
+            conn.execute("CREATE UNIQUE INDEX idx_links_url ON links (url)")
+    conn.close()
+
+
+class DirectDbWriterTest(QuietLogTestCase):
+    def setUp(self):
+        super().setUp()
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        os.unlink(self.path)
+        self.addCleanup(lambda: os.path.exists(self.path) and os.unlink(self.path))
+
+    def writer(self, user_id='user1'):
+        writer = importer.DirectDbWriter(self.path, user_id)
+        self.addCleanup(writer.close)
+        return writer
+
+    def rows(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT id, created, updated, url, tags, visibility, favicon, user FROM links ORDER BY url").fetchall()
+        finally:
+            conn.close()
+
+    def link(self, i, tags='a, b'):
+        return importer.LinkRecord.from_source(str(i), f"https://example{i}.com", f"Site {i}", '', tags)
+
+    def test_accepts_both_collection_layouts(self):
+        for fields_column in ('fields', 'schema'):
+            with self.subTest(fields_column=fields_column):
+                make_data_db(self.path, fields_column)
+                writer = self.writer()
+                self.assertFalse(writer.has_clicks)
+                writer.close()
+                os.unlink(self.path)
+
+    def test_refuses_mismatched_schema(self):
+        wrong_tags = [dict(f, type='text') if f['name'] == 'tags' else f for f in LINK_FIELDS]
+        cases = [
+            ({'columns': [c for c in importer.DirectDbWriter.REQUIRED_COLUMNS if c not in ('tags', 'user')]},
+             'missing columns: tags, user'),
+            ({'fields': wrong_tags}, 'field `tags` is text, expected json'),
+            ({'fields_column': 'schema', 'fields': wrong_tags}, 'field `tags` is text, expected json'),
+        ]
+        for options, message in cases:
+            with self.subTest(options=options):
+                make_data_db(self.path, **options)
+                with self.assertRaisesRegex(ValueError, re.escape(message)):
+                    importer.DirectDbWriter(self.path, 'user1')
+                os.unlink(self.path)
+
+    def test_refuses_unknown_user(self):
+        make_data_db(self.path)
+        with self.assertRaisesRegex(ValueError, 'user nobody does not exist'):
+            importer.DirectDbWriter(self.path, 'nobody')
+
+    def test_encodes_ids_timestamps_and_tags(self):
+        make_data_db(self.path)
+        writer = self.writer()
+        link = self.link(1)
+        self.assertEqual(writer.write([(link, 'https://example1.com/favicon.ico', True)]), [(True, True)])
+        [(record_id, created, updated, url, tags, visibility, favicon, user)] = self.rows()
+        self.assertRegex(record_id, r'^[a-z0-9]{15}$')
+        self.assertEqual(link.record_id, record_id)
+        self.assertRegex(created, r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}Z$')
+        self.assertEqual(updated, created)
+        self.assertEqual(json.loads(tags), ['a', 'b'])
+        self.assertEqual((url, visibility, favicon, user),
+                         ('https://example1.com', 'public', 'https://example1.com/favicon.ico', 'user1'))
+        self.assertEqual(writer.existing_urls(), {importer.duplicate_url_key('https://example1.com')})
+
+    def test_constraint_violation_retries_rows_one_at_a_time(self):
+        make_data_db(self.path)
+        writer = self.writer()
+        writer.write([(self.link(2), '', False)])
+        batch = [(self.link(i), '', False) for i in range(1, 4)]
+        self.assertEqual(writer.write(batch), [(True, False), (False, False), (True, False)])
+        self.assertEqual(batch[1][0].record_id, '')
+        self.assertTrue(batch[0][0].record_id and batch[2][0].record_id)
+        self.assertEqual([row[3] for row in self.rows()],
+                         ['https://example1.com', 'https://example2.com', 'https://example3.com'])
+
+
+def profiled_stage_work():
+    return sum(i * i for i in range(10000))
+
+
+class RunProfilerTest(unittest.TestCase):
+    def test_stage_threads_are_in_the_profile(self):
+        profiler = importer.RunProfiler()
+        profiler.start()
+        threads = [threading.Thread(target=profiled_stage_work) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        handle, path = tempfile.mkstemp(suffix='.prof')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        profiler.dump(path)
+
+        calls = [stats[1] for (_, _, name), stats in pstats.Stats(path).stats.items() if name == 'profiled_stage_work']
+        self.assertEqual(calls, [3])
+
+
+class FillMetadataSyncTest(unittest.TestCase):
+    def test_filled_fields_keep_source_hashes(self):
+        link = importer.LinkRecord.from_source('1', 'https://example.com', 'example.com', '', 'a,b')
+        source_hashes = importer.link_field_hashes(link)
+        importer.apply_link_metadata(link, {'title': 'Example Domain', 'description': 'An example page'})
+
+        self.assertEqual((link.name, link.description), ('Example Domain', 'An example page'))
+        # Re-reading the unchanged source row must not look like a change
+        unchanged = importer.LinkRecord.from_source('1', 'https://example.com', 'example.com', '', 'a,b')
+        self.assertEqual(importer.changed_sync_fields(importer.link_field_hashes(link),
+                                                      importer.link_field_hashes(unchanged)), [])
+        self.assertEqual(importer.link_field_hashes(link), source_hashes)
+
+
+# LevelDB fixtures: just enough of the log and table formats for the reader
+AUTH_KEY = f"_{importer.LOCAL_STORAGE_ORIGIN}\x00\x01{importer.LOCAL_STORAGE_AUTH_KEY}".encode()
+
+def varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def auth_value(token, padding=0):
+    """A localStorage value as Chrome stores it (Latin-1 with a 1 prefix)"""
+    return b'\x01' + json.dumps({'token': token, 'record': {'id': 'user1'}, 'pad': 'x' * padding}).encode('latin-1')
+
+def write_batch(sequence, entries):
+    """Encode a write batch of (key, value) puts and (key, None) deletions"""
+    out = sequence.to_bytes(8, 'little') + len(entries).to_bytes(4, 'little')
+    for key, value in entries:
+        if value is None:
+            out += bytes([importer.LEVELDB_TYPE_DELETION]) + varint(len(key)) + key
+        else:
+            out += bytes([importer.LEVELDB_TYPE_VALUE]) + varint(len(key)) + key + varint(len(value)) + value
+    return out
+
+def log_file(records):
+    """Frame records into 32KiB log blocks, splitting them into FIRST/MIDDLE/LAST fragments"""
+    out = bytearray()
+    for record in records:
+        first = True
+        while True:
+            block_left = importer.LEVELDB_LOG_BLOCK_SIZE - len(out) % importer.LEVELDB_LOG_BLOCK_SIZE
+            if block_left < importer.LEVELDB_LOG_HEADER_SIZE:
+                out += b'\x00' * block_left
+                continue
+            room = block_left - importer.LEVELDB_LOG_HEADER_SIZE
+            fragment, record = record[:room], record[room:]
+            if first and not record:
+                record_type = importer.LEVELDB_FULL
+            elif first:
+                record_type = importer.LEVELDB_FIRST
+            elif record:
+                record_type = importer.LEVELDB_MIDDLE
+            else:
+                record_type = importer.LEVELDB_LAST
+            out += b'\x00' * 4 + len(fragment).to_bytes(2, 'little') + bytes([record_type]) + fragment
+            first = False
+            if not record:
+                break
+    return bytes(out)
+
+def snappy_literal(data):
+    """Snappy encoding of data as one literal run (valid, if not compressed)"""
+    return varint(len(data)) + bytes([61 << 2]) + (len(data) - 1).to_bytes(2, 'little') + data
+
+def table_block(entries):
+    out = b''.join(varint(0) + varint(len(key)) + varint(len(value)) + key + value for key, value in entries)
+    return out + (0).to_bytes(4, 'little') + (1).to_bytes(4, 'little')
+
+def table_file(entries):
+    """A table with one snappy-compressed data block and an uncompressed index block"""
+    internal = [(key + ((sequence << 8) | value_type).to_bytes(8, 'little'), value)
+                for key, sequence, value_type, value in entries]
+    data_block = snappy_literal(table_block(internal))
+    out = data_block + b'\x01' + b'\x00' * 4
+    data_handle = varint(0) + varint(len(data_block))
+    index_block = table_block([(internal[-1][0], data_handle)])
+    index_handle = varint(len(out)) + varint(len(index_block))
+    out += index_block + b'\x00' * 5
+    footer = varint(0) + varint(0) + index_handle
+    return out + footer + b'\x00' * (40 - len(footer)) + importer.LEVELDB_TABLE_MAGIC
+
+
+class ChromeLocalStorageTest(QuietLogTestCase):
+    def make_db(self, files):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name, data in files.items():
+            with open(os.path.join(directory.name, name), 'wb') as file:
+                file.write(data)
+        return directory.name
+
+    def test_snappy_overlapping_copy(self):
+        self.assertEqual(importer.snappy_decompress(b'\x0c\x08abc\x15\x03'), b'abcabcabcabc')
+
+    def test_full_log_record(self):
+        db = self.make_db({'000003.log': log_file([
+            write_batch(1, [(b'_http://other\x00\x01key', b'\x01other')]),
+            write_batch(2, [(AUTH_KEY, auth_value('token-a'))]),
+        ])})
+        self.assertEqual(importer.get_chrome_localStorage([db])['token'], 'token-a')
+
+    def test_record_split_across_blocks(self):
+        records = [write_batch(1, [(AUTH_KEY, auth_value('token-a'))]),
+                   write_batch(2, [(AUTH_KEY, auth_value('token-b', padding=80 * 1024))])]
+        data = log_file(records)
+        # The second record spans three blocks (FIRST, MIDDLE, LAST)
+        self.assertGreater(len(data), 2 * importer.LEVELDB_LOG_BLOCK_SIZE)
+        self.assertEqual(list(importer.iter_leveldb_log_records(data)), records)
+        self.assertEqual(importer.get_chrome_localStorage([self.make_db({'000003.log': data})])['token'], 'token-b')
+
+    def test_table_value(self):
+        db = self.make_db({'000005.ldb': table_file([
+            (b'_http://aaa\x00\x01key', 3, importer.LEVELDB_TYPE_VALUE, b'\x01aaa'),
+            (AUTH_KEY, 4, importer.LEVELDB_TYPE_VALUE, auth_value('token-table')),
+            (b'_http://zzz\x00\x01key', 2, importer.LEVELDB_TYPE_VALUE, b'\x01zzz'),
+        ])})
+        self.assertEqual(importer.get_chrome_localStorage([db])['token'], 'token-table')
+
+    def test_later_deletion_overrides_value(self):
+        table = table_file([(AUTH_KEY, 4, importer.LEVELDB_TYPE_VALUE, auth_value('token-table'))])
+        log = log_file([write_batch(9, [(b'_http://other\x00\x01key', b'\x01x'), (AUTH_KEY, None)])])
+        self.assertIsNone(importer.get_chrome_localStorage([self.make_db({'000005.ldb': table, '000007.log': log})]))
+        # An older deletion does not hide a newer value
+        log = log_file([write_batch(1, [(AUTH_KEY, None)])])
+        self.assertEqual(importer.get_chrome_localStorage([self.make_db({'000005.ldb': table, '000007.log': log})])['token'],
+                         'token-table')
+
+
+if __name__ == '__main__':
+    unittest.main()